@@ -0,0 +1,363 @@
+"""
+Versión asíncrona de DatabaseHandler (asyncio + aiomysql)
+Mismos métodos que DatabaseHandler pero como corrutinas, con su propio pool de
+conexiones: varias consultas lanzadas con asyncio.gather se ejecutan a la vez
+en lugar de una detrás de otra.
+
+Las consultas SQL y el mapeo de usuarios son los de DatabaseHandler
+(funciones de user_queries.py).
+
+Uso:
+    async with AsyncDatabaseHandler() as db:
+        users = await asyncio.gather(*(db.get_user_by_document(d) for d in docs))
+
+Prueba contra una réplica en memoria (db_standin.py, nunca la BD del .env):
+    python async_database_handler.py --replica
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+try:
+    import aiomysql
+    AIOMYSQL_AVAILABLE = True
+    # Errores de aiomysql y cursor de diccionarios (la réplica de prueba no los necesita)
+    DB_ERRORS = (aiomysql.Error,)
+    DICT_CURSOR = aiomysql.DictCursor
+except ImportError:
+    aiomysql = None
+    AIOMYSQL_AVAILABLE = False
+    DB_ERRORS = ()
+    DICT_CURSOR = None
+
+from db_pool import mysql_config
+from user_cache import UserCache
+from user_queries import (DEFAULT_PROJECTION, active_users_sql, bulk_chunks, bulk_users_sql,
+                          inactive_users_sql, map_user, match_bulk_rows, restrict_to_projection,
+                          search_users_sql, select_user_sql, statistics_sql, users_by_area_sql,
+                          users_by_role_sql)
+
+
+class AsyncDatabaseHandler:
+    def __init__(self, pool_size=None, cache=True, pool=None):
+        """
+        Inicializar handler asíncrono de base de datos SAVIA
+
+        Args:
+            pool_size (int): Conexiones máximas del pool (DB_POOL_SIZE, 5)
+            cache (bool | UserCache): True crea una caché de usuarios con la
+                                      configuración del .env; False la desactiva
+            pool: Pool ya creado con la interfaz de aiomysql (acquire, close,
+                  wait_closed); p. ej. db_standin.StandinPool para pruebas
+        """
+        if pool is None and not AIOMYSQL_AVAILABLE:
+            raise ImportError(
+                "aiomysql no está instalado. Instálalo con: pip install aiomysql"
+            )
+
+        self.config = mysql_config()
+        self.tabla_usuarios = 'gn_usuarios'
+
+        if pool_size is None:
+            pool_size = int(os.getenv('DB_POOL_SIZE', 5))
+        self.pool_size = pool_size
+        self.pool = pool
+        self.pool_lock = asyncio.Lock()
+
+        if cache is True:
+            cache = UserCache()
+        self.cache = cache or None
+
+    async def connect(self):
+        """Crear el pool de conexiones (solo la primera vez)"""
+        if self.pool is not None:
+            return True
+
+        async with self.pool_lock:
+            if self.pool is None:
+                try:
+                    self.pool = await aiomysql.create_pool(
+                        host=self.config['host'],
+                        port=self.config['port'],
+                        db=self.config['database'],
+                        user=self.config['user'],
+                        password=self.config['password'],
+                        charset=self.config['charset'],
+                        minsize=1,
+                        maxsize=self.pool_size,
+                        autocommit=self.config['autocommit']
+                    )
+                except aiomysql.Error as e:
+                    raise Exception(f"Error al conectar a MySQL: {str(e)}")
+        return True
+
+    async def disconnect(self):
+        """Cerrar el pool de conexiones"""
+        if self.pool is not None:
+            self.pool.close()
+            await self.pool.wait_closed()
+            self.pool = None
+
+    async def __aenter__(self):
+        await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.disconnect()
+
+    async def execute_query(self, query, params=None):
+        """
+        Ejecutar consulta SELECT (solo lectura) con una conexión del pool
+        """
+        try:
+            await self.connect()
+            async with self.pool.acquire() as conn:
+                async with conn.cursor(DICT_CURSOR) as cursor:
+                    await cursor.execute(query, params)
+                    return await cursor.fetchall()
+
+        except DB_ERRORS as e:
+            raise Exception(f"Error en consulta: {str(e)}")
+
+    @staticmethod
+    def _map(rows):
+        return [map_user(row) for row in rows]
+
+    # ============================================
+    # BÚSQUEDAS DE UN USUARIO
+    # ============================================
+    async def get_user_by_document(self, numero_documento, projection=DEFAULT_PROJECTION):
+        """Buscar usuario por número de documento"""
+        return await self._get_user_by_column('documento', 'documento', numero_documento, projection)
+
+    async def get_user_by_email(self, email, projection=DEFAULT_PROJECTION):
+        """Buscar usuario por email"""
+        return await self._get_user_by_column('correo', 'correo_electronico', email, projection)
+
+    async def get_user_by_username(self, username, projection=DEFAULT_PROJECTION):
+        """Buscar usuario por nombre de usuario"""
+        return await self._get_user_by_column('usuario', 'usuario', username, projection)
+
+    async def _get_user_by_column(self, kind, column, value, projection=DEFAULT_PROJECTION):
+        if self.cache is not None:
+            found, user = self.cache.get(kind, value)
+            if found:
+                return restrict_to_projection(user, projection)
+
+        query = select_user_sql(self.tabla_usuarios, projection, column, placeholder='%s')
+        results = await self.execute_query(query, (value,))
+        user = map_user(results[0]) if results else None
+
+        if projection == 'full' and self.cache is not None:
+            self.cache.put(kind, value, user)
+        return restrict_to_projection(user, projection)
+
+    async def check_user_exists(self, numero_documento=None, email=None, username=None):
+        """Verificar si existe un usuario por documento, email o usuario"""
+        if numero_documento:
+            return await self.get_user_by_document(numero_documento, projection='status') is not None
+        if email:
+            return await self.get_user_by_email(email, projection='status') is not None
+        if username:
+            return await self.get_user_by_username(username, projection='status') is not None
+        return False
+
+    async def get_user_status(self, numero_documento):
+        """Obtener solo el estado de un usuario"""
+        user = await self.get_user_by_document(numero_documento, projection='status')
+        return user['estado'] if user else None
+
+    # ============================================
+    # BÚSQUEDAS MASIVAS
+    # ============================================
+    async def get_users_by_documents(self, documentos):
+        """
+        Buscar varios usuarios por número de documento
+        Los bloques de BULK_CHUNK_SIZE valores se consultan a la vez
+
+        Returns:
+            dict: Documento → usuario (los no encontrados no aparecen)
+        """
+        return await self._get_users_by_column('documento', documentos)
+
+    async def get_users_by_emails(self, emails):
+        """Buscar varios usuarios por email (email → usuario)"""
+        return await self._get_users_by_column('correo_electronico', emails)
+
+    async def get_users_by_usernames(self, usernames):
+        """Buscar varios usuarios por nombre de usuario (usuario → usuario)"""
+        return await self._get_users_by_column('usuario', usernames)
+
+    async def _get_users_by_column(self, column, values):
+        requested, chunks = bulk_chunks(values)
+        results = await asyncio.gather(*(
+            self.execute_query(*bulk_users_sql(self.tabla_usuarios, column, chunk))
+            for chunk in chunks
+        ))
+
+        users = {}
+        for rows in results:
+            for key, row in match_bulk_rows(column, requested, rows, users):
+                users[key] = map_user(row)
+                if self.cache is not None:
+                    self.cache.put('id', row['id'], users[key])
+        return users
+
+    # ============================================
+    # LISTADOS Y ESTADÍSTICAS
+    # ============================================
+    async def search_users(self, search_term):
+        """Buscar usuarios por nombre, email, documento o usuario"""
+        return self._map(await self.execute_query(*search_users_sql(self.tabla_usuarios, search_term)))
+
+    async def get_users_by_role(self, rol):
+        """Obtener usuarios por cargo (rol)"""
+        return self._map(await self.execute_query(*users_by_role_sql(self.tabla_usuarios, rol)))
+
+    async def get_users_by_area(self, area):
+        """Obtener usuarios por área"""
+        return self._map(await self.execute_query(*users_by_area_sql(self.tabla_usuarios, area)))
+
+    async def get_active_users(self):
+        """Obtener todos los usuarios activos"""
+        return self._map(await self.execute_query(active_users_sql(self.tabla_usuarios)))
+
+    async def get_inactive_users(self):
+        """Obtener todos los usuarios inactivos"""
+        return self._map(await self.execute_query(inactive_users_sql(self.tabla_usuarios)))
+
+    async def get_statistics(self):
+        """Obtener estadísticas generales de usuarios"""
+        results = await self.execute_query(statistics_sql(self.tabla_usuarios))
+        return results[0] if results else None
+
+    # ============================================
+    # CACHÉ Y POOL
+    # ============================================
+    def invalidate_user(self, numero_documento=None, email=None, username=None):
+        """Descartar un usuario de la caché después de modificarlo"""
+        if self.cache is not None:
+            self.cache.invalidate(numero_documento, email, username)
+
+    def cache_stats(self):
+        """Aciertos y fallos de la caché de usuarios (None si está desactivada)"""
+        if self.cache is None:
+            return None
+        return self.cache.stats()
+
+    def pool_stats(self):
+        """Conexiones abiertas y libres del pool (None si no está creado)"""
+        if self.pool is None:
+            return None
+        return {
+            'pool_size': self.pool_size,
+            'open_connections': self.pool.size,
+            'free_connections': self.pool.freesize,
+            'active_connections': self.pool.size - self.pool.freesize
+        }
+
+
+# Script de prueba: consultas en secuencia vs concurrentes
+async def _demo(documentos):
+    async with AsyncDatabaseHandler(cache=False) as db:
+        stats = await db.get_statistics()
+        print(f"Total de usuarios: {stats.get('total_usuarios', 0) if stats else 0}")
+
+        start = time.perf_counter()
+        for documento in documentos:
+            await db.get_user_by_document(documento)
+        sequential = time.perf_counter() - start
+
+        start = time.perf_counter()
+        users = await asyncio.gather(*(db.get_user_by_document(d) for d in documentos))
+        concurrent = time.perf_counter() - start
+
+        found = sum(1 for user in users if user)
+        print(f"\n{len(documentos)} búsquedas por documento ({found} encontrados)")
+        print(f"   En secuencia:       {sequential * 1000:8.1f} ms")
+        print(f"   Con asyncio.gather: {concurrent * 1000:8.1f} ms")
+        print(f"   🚀 {sequential / concurrent:.1f}x")
+
+
+# Prueba contra la réplica en memoria (db_standin.py): resultados y concurrencia
+async def _replica_test(count=200, latency=0.01):
+    from db_standin import StandinPool
+
+    pool = StandinPool(users=count, latency=latency)
+    users = pool.users
+    failures = []
+
+    def check(name, condition):
+        print(f"   {'✅' if condition else '❌'} {name}")
+        if not condition:
+            failures.append(name)
+
+    async with AsyncDatabaseHandler(cache=False, pool=pool) as db:
+        first = users[0]
+        user = await db.get_user_by_document(first['documento'])
+        check("get_user_by_document mapea el usuario",
+              user is not None and user['numero_documento'] == first['documento']
+              and user['rol'] == first['mae_cargo_valor'] and user['estado'] == 'activo')
+        check("documento inexistente → None", await db.get_user_by_document('999') is None)
+
+        inactive = next(row for row in users if not row['activo'])
+        status = await db.get_user_by_document(inactive['documento'], projection='status')
+        check("proyección status solo trae el estado", status == {'estado': 'inactivo'})
+        check("get_user_status", await db.get_user_status(inactive['documento']) == 'inactivo')
+        check("check_user_exists por email", await db.check_user_exists(email=first['correo_electronico']))
+
+        requested = [users[1]['documento'], f" {users[2]['documento']} ", users[1]['documento'], '', '999']
+        found = await db.get_users_by_documents(requested)
+        check("búsqueda masiva (sin vacíos ni repetidos, claves como se pidieron)",
+              set(found) == {users[1]['documento'], f" {users[2]['documento']} "})
+
+        expected = [row for row in users if 'PEREZ' in row['nombre']][:50]
+        results = await db.search_users('PEREZ')
+        check("search_users", len(results) == len(expected))
+
+        cargo = users[0]['mae_cargo_valor']
+        check("get_users_by_role",
+              len(await db.get_users_by_role(cargo)) == sum(1 for row in users if row['mae_cargo_valor'] == cargo))
+        active = sum(1 for row in users if row['activo'])
+        check("get_active_users", len(await db.get_active_users()) == active)
+        check("get_inactive_users", len(await db.get_inactive_users()) == count - active)
+
+        stats = await db.get_statistics()
+        check("get_statistics",
+              stats['total_usuarios'] == count and stats['usuarios_activos'] == active
+              and stats['total_cargos'] == len({row['mae_cargo_valor'] for row in users}))
+
+        documentos = [row['documento'] for row in users[:20]]
+        start = time.perf_counter()
+        for documento in documentos:
+            await db.get_user_by_document(documento)
+        sequential = time.perf_counter() - start
+        start = time.perf_counter()
+        await asyncio.gather(*(db.get_user_by_document(d) for d in documentos))
+        concurrent = time.perf_counter() - start
+        check(f"consultas a la vez (máx. {pool.max_active} conexiones, {sequential / concurrent:.1f}x)",
+              pool.max_active == pool.maxsize and concurrent < sequential)
+
+    cached = AsyncDatabaseHandler(pool=StandinPool(users=10, latency=0))
+    await cached.get_user_by_document(users[0]['documento'])
+    queries = cached.pool.queries
+    await cached.get_user_by_document(users[0]['documento'])
+    check("la caché evita la segunda consulta", cached.pool.queries == queries)
+    await cached.disconnect()
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    print("=== Test de AsyncDatabaseHandler para SAVIA ===\n")
+    if '--replica' in sys.argv[1:]:
+        sys.exit(asyncio.run(_replica_test()))
+
+    documentos = sys.argv[1:] or [str(1_000_000 + i) for i in range(20)]
+    try:
+        asyncio.run(_demo(documentos))
+        print("\n✅ Conexión asíncrona y consultas funcionando")
+    except Exception as e:
+        print(f"\n❌ Error: {str(e)}")
@@ -0,0 +1,515 @@
+"""
+Versión asíncrona de WebAutomation (playwright.async_api)
+Mismas operaciones que WebAutomation pero como corrutinas: un solo navegador
+y un solo event loop manejan varias páginas a la vez (hasta
+WEB_ASYNC_CONCURRENCY), en lugar de un hilo con su navegador por acción.
+
+Todas las páginas comparten el contexto (cookies), así el login se hace una
+sola vez; las acciones sobre un mismo documento se ejecutan de a una y en
+orden. Las esperas son las mismas que en WebAutomation (respuesta JSF y
+contenido vuelto a dibujar, sin pausas fijas).
+
+Uso:
+    async with AsyncWebAutomation() as web:
+        batch = await web.run_batch([('1234567890', 'desactivar', {}), ...])
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+from dotenv import load_dotenv
+from playwright.async_api import async_playwright
+from playwright.async_api import Error as PlaywrightError, TimeoutError as PlaywrightTimeoutError
+
+from web_automation import EMPTY_RESULTS_SELECTOR, USERS_TABLE_SELECTOR
+
+load_dotenv()
+
+
+class AsyncWebAutomation:
+    def __init__(self, headless=True, concurrency=None, storage_state_path=None, slow_mo=None,
+                 platform_url=None):
+        """
+        Inicializar automatización web asíncrona
+
+        Args:
+            headless (bool): Si True, ejecuta el navegador sin interfaz gráfica
+            concurrency (int): Páginas trabajando a la vez (WEB_ASYNC_CONCURRENCY, 5)
+            storage_state_path (str): Archivo de la sesión compartida con
+                                      WebAutomation (WEB_STORAGE_STATE)
+            slow_mo (int): Milisegundos de pausa entre operaciones, solo para
+                           depurar (WEB_SLOW_MO, 0)
+            platform_url (str): URL de SAVIA (PLATFORM_URL)
+        """
+        if concurrency is None:
+            concurrency = int(os.getenv('WEB_ASYNC_CONCURRENCY', 5))
+        if storage_state_path is None:
+            storage_state_path = os.getenv('WEB_STORAGE_STATE', os.path.join('cache', 'savia_session.json'))
+        if slow_mo is None:
+            slow_mo = int(os.getenv('WEB_SLOW_MO', 0))
+
+        self.headless = headless
+        self.concurrency = max(1, concurrency)
+        self.storage_state_path = storage_state_path
+        self.slow_mo = slow_mo
+
+        # Configuración de la plataforma (la misma que WebAutomation)
+        self.platform_url = platform_url or os.getenv('PLATFORM_URL', 'http://10.250.3.66:8080/savia')
+        self.username = os.getenv('PLATFORM_USER', 'dpiedrar')
+        self.password = os.getenv('PLATFORM_PASSWORD', 'i0BnXmZr')
+
+        # Tiempos de espera máximos (milisegundos)
+        self.wait_time = int(os.getenv('WEB_TIMEOUT', 10000))
+        self.navigation_timeout = int(os.getenv('WEB_NAVIGATION_TIMEOUT', 30000))
+        self.result_timeout = int(os.getenv('WEB_RESULT_TIMEOUT', 5000))
+        self.modal_timeout = int(os.getenv('WEB_MODAL_TIMEOUT', 2000))
+
+        self.playwright = None
+        self.browser = None
+        self.context = None
+        self.start_lock = asyncio.Lock()
+
+        # Páginas libres (como máximo `concurrency`) y límite de acciones a la vez
+        self.semaphore = asyncio.Semaphore(self.concurrency)
+        self.idle_pages = []
+
+        # Un solo login aunque varias páginas encuentren la sesión vencida a la vez
+        self.login_lock = asyncio.Lock()
+        self.session_generation = 0
+
+        # Acciones en curso por documento (nunca dos sobre el mismo usuario)
+        self.document_locks = {}
+
+        # Contadores
+        self.logins = 0
+        self.pages_created = 0
+        self.completed = 0
+        self.failed = 0
+        self.active = 0
+        self.max_active = 0
+
+    async def start(self):
+        """Lanzar el navegador y crear el contexto (solo la primera vez)"""
+        if self.context is not None:
+            return self
+
+        async with self.start_lock:
+            if self.context is None:
+                try:
+                    self.playwright = await async_playwright().start()
+                    self.browser = await self.playwright.chromium.launch(
+                        headless=self.headless,
+                        slow_mo=self.slow_mo
+                    )
+
+                    context_options = {'viewport': {'width': 1920, 'height': 1080}}
+                    if os.path.exists(self.storage_state_path):
+                        context_options['storage_state'] = self.storage_state_path
+                    context = await self.browser.new_context(**context_options)
+                    context.set_default_timeout(self.wait_time)
+                    context.set_default_navigation_timeout(self.navigation_timeout)
+                    self.context = context
+
+                except Exception as e:
+                    raise Exception(f"Error al inicializar navegador: {str(e)}")
+        return self
+
+    async def close(self):
+        """Cerrar páginas, navegador y playwright"""
+        try:
+            if self.context is not None:
+                await self.context.close()
+            if self.browser is not None:
+                await self.browser.close()
+            if self.playwright is not None:
+                await self.playwright.stop()
+        except Exception as e:
+            print(f"Error al cerrar navegador: {str(e)}")
+        finally:
+            self.idle_pages = []
+            self.context = None
+            self.browser = None
+            self.playwright = None
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    # ============================================
+    # SESIÓN Y NAVEGACIÓN
+    # ============================================
+    async def login(self, page):
+        """Realizar login en la plataforma SAVIA con la página dada"""
+        try:
+            print("🔐 Realizando login...")
+            await page.goto(self.platform_url)
+
+            await page.get_by_role("textbox", name="Usuario").fill(self.username)
+            await page.get_by_role("textbox", name="Contraseña").fill(self.password)
+            await page.get_by_role("button", name="Ingresar").click()
+
+            await page.wait_for_load_state("networkidle")
+            self.logins += 1
+            await self.save_session()
+
+            print("✅ Login exitoso")
+            return {'success': True, 'message': 'Login exitoso'}
+
+        except Exception as e:
+            print(f"❌ Error en login: {str(e)}")
+            return {'success': False, 'message': f'Error en login: {str(e)}'}
+
+    async def save_session(self):
+        """Guardar la sesión en disco (la misma que usa WebAutomation)"""
+        try:
+            folder = os.path.dirname(self.storage_state_path)
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+            temp_path = f"{self.storage_state_path}.tmp"
+            await self.context.storage_state(path=temp_path)
+            os.replace(temp_path, self.storage_state_path)
+        except Exception as e:
+            print(f"⚠️ No se pudo guardar la sesión: {str(e)}")
+
+    async def is_login_page(self, page):
+        """True si la página muestra el formulario de login (sesión vencida)"""
+        try:
+            return await page.get_by_role("textbox", name="Contraseña").is_visible()
+        except Exception:
+            return False
+
+    async def navegar_a_modulo_url(self, nombre_modulo, operacion, page):
+        """Navegar directamente a un módulo (ruta y archivo .faces)"""
+        try:
+            url = f"{self.platform_url}/{nombre_modulo}/{operacion}.faces"
+            await page.goto(url)
+            await page.wait_for_load_state("networkidle")
+            return True
+
+        except Exception as e:
+            raise Exception(f"Error al navegar a URL: {str(e)}")
+
+    async def ensure_session(self, page, nombre_modulo="admin", operacion="usuarios"):
+        """
+        Dejar la página en el módulo con la sesión iniciada
+        Si varias páginas encuentran el login a la vez, solo una lo completa
+        """
+        generation = self.session_generation
+        await self.navegar_a_modulo_url(nombre_modulo, operacion, page)
+        if not await self.is_login_page(page):
+            return {'success': True, 'message': 'Sesión reutilizada'}
+
+        async with self.login_lock:
+            if self.session_generation == generation:
+                login_result = await self.login(page)
+                if not login_result['success']:
+                    return login_result
+                self.session_generation += 1
+
+        await self.navegar_a_modulo_url(nombre_modulo, operacion, page)
+        if await self.is_login_page(page):
+            return {'success': False, 'message': 'Error en login: la plataforma volvió a pedir credenciales'}
+        return {'success': True, 'message': 'Sesión iniciada'}
+
+    # ============================================
+    # ESPERAS
+    # ============================================
+    def _is_jsf_response(self, response):
+        return response.request.method == 'POST' and 'faces' in response.url
+
+    async def submit_and_wait(self, page, trigger, rerendered=None):
+        """Enviar un formulario JSF y esperar la respuesta (ver WebAutomation.submit_and_wait)"""
+        old = None
+        if rerendered is not None and await rerendered.count() > 0:
+            old = await rerendered.first.element_handle()
+
+        async with page.expect_response(self._is_jsf_response, timeout=self.navigation_timeout) as response_info:
+            await trigger()
+        response = await response_info.value
+        if response.status >= 400:
+            raise Exception(f"La plataforma respondió {response.status} {response.status_text}")
+
+        if old is not None:
+            try:
+                await page.wait_for_function(
+                    "element => !element.isConnected", arg=old, timeout=self.result_timeout
+                )
+            except PlaywrightError:
+                pass  # No se volvió a dibujar, o hubo navegación completa
+
+        await page.wait_for_load_state("domcontentloaded")
+        return response
+
+    async def _wait_success_message(self, page):
+        success_msg = page.locator(".alert-success, .mensaje-exito")
+        try:
+            await success_msg.first.wait_for(state="visible", timeout=self.result_timeout)
+            return True
+        except PlaywrightTimeoutError:
+            return False
+
+    # ============================================
+    # OPERACIONES
+    # ============================================
+    async def search_user(self, numero_documento, page):
+        """
+        Buscar usuario en el módulo abierto en la página (devuelve la fila)
+
+        run_action no recarga una página reutilizada, así que una sesión
+        vencida se nota recién al buscar: si la búsqueda terminó en el login,
+        se vuelve a entrar y se repite una vez (todavía no se envió ningún cambio)
+        """
+        try:
+            return await self._search_user(numero_documento, page)
+        except Exception:
+            if not await self.is_login_page(page):
+                raise
+
+        print("🔑 Sesión vencida durante la búsqueda")
+        session = await self.ensure_session(page, "admin", "usuarios")
+        if not session['success']:
+            raise Exception(session['message'])
+        return await self._search_user(numero_documento, page)
+
+    async def _search_user(self, numero_documento, page):
+        try:
+            search_field = page.locator("#search-user")
+            await search_field.fill(numero_documento)
+            await self.submit_and_wait(
+                page, lambda: search_field.press("Enter"),
+                rerendered=page.locator(USERS_TABLE_SELECTOR)
+            )
+
+            user_row = page.locator(f"tr:has-text('{numero_documento}')")
+            try:
+                await user_row.or_(page.locator(EMPTY_RESULTS_SELECTOR)).first.wait_for(
+                    state="visible", timeout=self.result_timeout
+                )
+            except PlaywrightTimeoutError:
+                pass
+
+            if await user_row.count() > 0:
+                return user_row.first
+            raise Exception(f"Usuario con documento {numero_documento} no encontrado")
+
+        except Exception as e:
+            raise Exception(f"Error al buscar usuario: {str(e)}")
+
+    async def change_user_role(self, numero_documento, nuevo_rol):
+        """Cambiar el rol de un usuario"""
+        return await self.run_action(numero_documento, 'cambiar_rol', {'rol': nuevo_rol})
+
+    async def deactivate_user(self, numero_documento):
+        """Desactivar un usuario en la plataforma"""
+        return await self.run_action(numero_documento, 'desactivar')
+
+    async def activate_user(self, numero_documento):
+        """Activar un usuario en la plataforma"""
+        return await self.run_action(numero_documento, 'activar')
+
+    async def _change_user_role(self, page, numero_documento, nuevo_rol):
+        user_row = await self.search_user(numero_documento, page)
+        await user_row.locator(".btn-edit").click()
+
+        role_select = page.locator("#user-role")
+        await role_select.wait_for(state="visible")
+        await role_select.select_option(label=nuevo_rol)
+
+        await self.submit_and_wait(page, page.locator("#btn-save").click, rerendered=role_select)
+        if await self._wait_success_message(page):
+            return {'success': True, 'message': f'Rol cambiado a "{nuevo_rol}" exitosamente'}
+        return {'success': False, 'message': 'No se pudo verificar el cambio de rol'}
+
+    async def _deactivate_user(self, page, numero_documento):
+        user_row = await self.search_user(numero_documento, page)
+        await user_row.locator(".btn-deactivate").click()
+
+        confirm_button = page.locator("#confirm-deactivate")
+        try:
+            await confirm_button.wait_for(state="visible", timeout=self.modal_timeout)
+            has_modal = True
+        except PlaywrightTimeoutError:
+            has_modal = False  # No hay modal de confirmación
+
+        if has_modal:
+            await self.submit_and_wait(page, confirm_button.click,
+                                       rerendered=page.locator(USERS_TABLE_SELECTOR))
+
+        if await self._wait_success_message(page):
+            return {'success': True, 'message': 'Usuario desactivado exitosamente'}
+        return {'success': False, 'message': 'No se pudo verificar la desactivación'}
+
+    async def _activate_user(self, page, numero_documento):
+        user_row = await self.search_user(numero_documento, page)
+        await self.submit_and_wait(page, user_row.locator(".btn-activate").click,
+                                   rerendered=page.locator(USERS_TABLE_SELECTOR))
+        return {'success': True, 'message': 'Usuario activado exitosamente'}
+
+    async def run_action(self, documento, accion, params=None):
+        """
+        Ejecutar una acción en una página libre (espera si hay `concurrency`
+        acciones en curso o si el mismo documento se está modificando)
+
+        Returns:
+            dict: success, message, documento, accion y duracion_ms (nunca lanza)
+        """
+        handlers = {
+            'cambiar_rol': lambda page, params: self._change_user_role(page, documento, params['rol']),
+            'desactivar': lambda page, params: self._deactivate_user(page, documento),
+            'activar': lambda page, params: self._activate_user(page, documento),
+        }
+        documento = str(documento).strip()
+
+        # [lock, acciones esperando o en curso]; se elimina al quedar sin uso
+        entry = self.document_locks.get(documento)
+        if entry is None:
+            entry = self.document_locks[documento] = [asyncio.Lock(), 0]
+        entry[1] += 1
+
+        try:
+            async with entry[0], self.semaphore:
+                start = time.perf_counter()
+                page = None
+                healthy = True
+                self.active += 1
+                self.max_active = max(self.max_active, self.active)
+                try:
+                    handler = handlers.get(accion)
+                    if handler is None:
+                        raise Exception(f"Acción no soportada: {accion}")
+
+                    page = await self._acquire_page()
+                    if not await page.locator("#search-user").is_visible():
+                        session = await self.ensure_session(page, "admin", "usuarios")
+                        if not session['success']:
+                            raise Exception(session['message'])
+
+                    result = await handler(page, params or {})
+                except Exception as e:
+                    healthy = False
+                    result = {'success': False, 'message': str(e)}
+                finally:
+                    self.active -= 1
+                    if page is not None:
+                        await self._release_page(page, healthy)
+        finally:
+            entry[1] -= 1
+            if not entry[1]:
+                del self.document_locks[documento]
+
+        if result['success']:
+            self.completed += 1
+        else:
+            self.failed += 1
+        result.update({
+            'documento': documento,
+            'accion': accion,
+            'duracion_ms': round((time.perf_counter() - start) * 1000, 1)
+        })
+        return result
+
+    async def run_batch(self, actions):
+        """
+        Ejecutar varias acciones (documento, acción, params) a la vez
+
+        Returns:
+            dict: {'success': bool, 'message': str, 'results': [...], 'total_ms': float}
+                  con los resultados en el orden de las acciones
+        """
+        start = time.perf_counter()
+        await self.start()
+        results = await asyncio.gather(*(
+            self.run_action(documento, accion, params) for documento, accion, params in actions
+        ))
+
+        failed = sum(1 for result in results if not result['success'])
+        return {
+            'success': failed == 0,
+            'message': f"{len(results) - failed} de {len(results)} acciones exitosas",
+            'results': results,
+            'total_ms': (time.perf_counter() - start) * 1000
+        }
+
+    # ============================================
+    # PÁGINAS
+    # ============================================
+    async def _acquire_page(self):
+        """Página libre (o una nueva; nunca más de `concurrency`)"""
+        await self.start()
+        while self.idle_pages:
+            page = self.idle_pages.pop()
+            if not page.is_closed():
+                return page
+        self.pages_created += 1
+        return await self.context.new_page()
+
+    async def _release_page(self, page, healthy=True):
+        """Devolver la página (se cierra si su acción falló)"""
+        if healthy and not page.is_closed():
+            self.idle_pages.append(page)
+            return
+        try:
+            await page.close()
+        except PlaywrightError:
+            pass
+
+    def stats(self):
+        """Logins, páginas creadas y acciones completadas"""
+        return {
+            'concurrency': self.concurrency,
+            'logins': self.logins,
+            'pages_created': self.pages_created,
+            'idle_pages': len(self.idle_pages),
+            'completed': self.completed,
+            'failed': self.failed,
+            'max_active': self.max_active
+        }
+
+
+# Script de prueba: concurrencia 1 vs N contra la réplica local de SAVIA
+async def _demo(concurrency, count):
+    import tempfile
+    from savia_standin import SaviaStandin
+    from web_pool import demo_actions
+
+    actions, expected = demo_actions(count)
+    timings = {}
+
+    for label, level in (('concurrencia 1', 1), (f'concurrencia {concurrency}', concurrency)):
+        with SaviaStandin(port=0, users=max(count, 10)) as standin:
+            state_path = os.path.join(tempfile.mkdtemp(prefix='savia_'), 'session.json')
+
+            async with AsyncWebAutomation(concurrency=level, storage_state_path=state_path,
+                                          platform_url=standin.url) as web:
+                batch = await web.run_batch(actions)
+                stats = web.stats()
+            timings[label] = batch['total_ms']
+
+            mismatches = [
+                documento for documento, (rol, activo) in expected.items()
+                if (standin.get_user(documento)['rol'], standin.get_user(documento)['activo']) != (rol, activo)
+            ]
+            print(f"\n📦 {label}: {batch['message']} en {batch['total_ms']:.0f} ms")
+            print(f"   {stats}")
+            if mismatches:
+                print(f"❌ Estado final distinto al esperado en {len(mismatches)} usuarios")
+                return 1
+
+    base, concurrent = timings.values()
+    print(f"\n🚀 {base / concurrent:.1f}x con concurrencia {concurrency}")
+    return 0
+
+
+if __name__ == "__main__":
+    print("=== Test de AsyncWebAutomation contra la réplica local ===")
+    concurrency = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 30
+    try:
+        sys.exit(asyncio.run(_demo(concurrency, count)))
+    except Exception as e:
+        print(f"\n❌ Error: {str(e)}")
+        sys.exit(1)
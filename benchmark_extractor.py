@@ -0,0 +1,398 @@
+"""
+Microbenchmark del extractor de campos
+Compara field_extractor.extract_fields (patrones precompilados, una pasada)
+con el extractor anterior por campo (listas de patrones reconstruidas y
+re.search sin compilar en cada llamada) sobre textos OCR sintéticos.
+
+También comprueba que los resultados coinciden con los del extractor anterior:
+- cada cambio deliberado (DELIBERATE_CHANGES) con un texto que lo muestra
+- casos que deben seguir igual (REGRESSION_CHECKS)
+- sobre textos variados, coincidencia del 100 % con el extractor anterior
+  más los cambios deliberados
+
+Uso:
+    python benchmark_extractor.py
+    python benchmark_extractor.py -n 5000 -r 10
+"""
+
+import argparse
+import random
+import re
+import sys
+import time
+
+from field_extractor import FIELDS, extract_fields
+
+FIRST_NAMES = ['Juan', 'María', 'Andrés', 'Luisa', 'Carlos', 'Ana', 'Pedro', 'Sofía', 'Jorge', 'Paula']
+LAST_NAMES = ['Pérez', 'Gómez', 'Rodríguez', 'Torres', 'Ramírez', 'Castro', 'Rojas', 'Díaz', 'Mora', 'Vargas']
+DOC_TYPES = ['CC', 'CE', 'TI', 'PA']
+ROLES = ['Administrador', 'Analista', 'Operador', 'Supervisor', 'Coordinador', 'Asistente']
+AREAS = ['Ventas', 'Finanzas', 'Sistemas', 'Contabilidad', 'Operaciones', 'Soporte', 'Compras']
+
+# Encabezado y pie que acompañan a los datos en una página escaneada completa
+PAGE_HEADER = (
+    "EPS SAVIA SALUD\nSistema de Información - Gestión de Accesos\n"
+    "Código: F-GA-017   Versión: 3   Página 1 de 1\n\n"
+)
+PAGE_FOOTER = (
+    "\nDeclaro que la información suministrada es veraz y autorizo su tratamiento\n"
+    "conforme a la política de protección de datos personales de la entidad.\n"
+    "Firma del solicitante: ______________    Fecha: 12/03/2024\n"
+    "Vo. Bo. jefe inmediato: ______________\n"
+)
+
+# Plantillas de texto parecidas a la salida de Tesseract sobre los formularios
+TEXT_LAYOUTS = [
+    "FORMULARIO DE USUARIO\n\nTipo de Documento: {tipo}\nNúmero: {numero}\n"
+    "Nombre Completo: {nombre}\nEmail: {email}\nRol: {rol}\nÁrea: {area}\n",
+
+    "SOLICITUD DE ACCESO\nNombre: {nombre}\nDocumento: {numero}\n"
+    "Correo {email}\nCargo: {rol}\nDepartamento: {area}\n",
+
+    "{nombre}\n{tipo} {numero}\n{email}\nPerfil: {rol}\nDpto. {area}\n"
+    "Observaciones: ninguna\n",
+]
+
+
+# Cambios deliberados respecto al extractor anterior (ver field_extractor.py):
+# (código, descripción, texto, campo, valor anterior, valor nuevo)
+DELIBERATE_CHANGES = [
+    ('D1', "El nombre con etiqueta no continúa en la línea siguiente",
+     "Nombre: Juan Pérez\nEmail: juan@empresa.com", 'nombre_completo',
+     'Juan Pérez\nEmail', 'Juan Pérez'),
+    ('D1', "El nombre tras el tratamiento no continúa en la línea siguiente",
+     "Sra. Ana Torres\nCargo: Analista", 'nombre_completo',
+     'Ana Torres\nCargo', 'Ana Torres'),
+    ('D2', "Un encabezado en mayúsculas no se toma como nombre",
+     "EPS SAVIA SALUD\nSistema de Información\nAna María Torres Rojas\n", 'nombre_completo',
+     'Eps Savia Salud\nSistema De', 'Ana María Torres Rojas'),
+    ('D3', "El área TI solo como palabra completa",
+     "Área: Gestión Humana", 'area', 'TI', 'Gestión Humana'),
+    ('D3', "Palabra clave de área dentro de otra que contiene 'ti'",
+     "Equipo de Logística", 'area', 'TI', 'Logística'),
+    ('D4', "La etiqueta 'no' no se busca dentro de 'Teléfono'",
+     "Teléfono: 3001234567\nNúmero: 1020304050", 'numero_documento',
+     '3001234567', '1020304050'),
+]
+
+# Casos que deben dar lo mismo que el extractor anterior: (texto, campo, valor)
+REGRESSION_CHECKS = [
+    ("número12345678", 'numero_documento', '12345678'),
+    ("Documento:98765432", 'numero_documento', '98765432'),
+    ("No. 1234567", 'numero_documento', '1234567'),
+    ("Cargo: operadora de caja", 'rol', 'Operador'),
+    ("La operadora solicita acceso", 'rol', 'Operador'),
+    ("Departamento: Contabilidad general", 'area', 'Contabilidad'),
+    ("tipodocumento:cc", 'tipo_documento', 'CC'),
+    ("Pasaporte: AB\n", 'tipo_documento', 'AB'),
+]
+
+# Fragmentos para generar textos variados (etiquetas pegadas, en minúsculas,
+# palabras clave dentro de otras palabras, valores vacíos...)
+VARIANT_FRAGMENTS = [
+    'Tipo de Documento:', 'tipo documento', 'TIPODOCUMENTO', 'Número:', 'numero',
+    'N°', 'No.', 'no', '#', 'Documento', 'documentos:', 'Cédula', 'cedula de ciudadania',
+    'Pasaporte', 'Tarjeta de Identidad', 'Nombre:', 'Nombre Completo', 'nombres',
+    'Sr.', 'Sra.', 'Srta.', 'Rol:', 'perfil', 'Cargo', 'Puesto:', 'control', 'Área:',
+    'area', 'Departamento', 'Dpto.', 'tareas', 'Teléfono:', 'operadora', 'usuarios',
+    'Administrador', 'gerente', 'Ventas', 'sistemas', 'TI', 'Gestión', 'Logística',
+    'RRHH', 'Recursos Humanos', 'CC', 'ce', 'NIT', 'DNI', 'Juan', 'Pérez', 'GÓMEZ',
+    'María', 'de', 'la', 'Analista Senior', 'Soporte', 'juan@empresa.com',
+    '1020304050', '12345678', '123', '98765432101', '3001234567', ':', '-',
+]
+VARIANT_SEPARATORS = [' ', ' ', ' ', '', '\n', '\n', '  ', '\t', ': ']
+
+
+def legacy_extract(text, changes=False):
+    """
+    Extractor anterior (un método por campo), como referencia
+
+    Args:
+        changes (bool): Aplicar los cambios deliberados (DELIBERATE_CHANGES)
+    """
+    text = text.strip()
+    name_separator = r'[ \t]+' if changes else r'\s+'
+    name_word = r'[A-ZÁÉÍÓÚÑ][a-záéíóúñ]+'
+
+    def contains(common_value, value):
+        if changes and len(common_value) <= 2:
+            return re.search(rf'\b{common_value}\b', value, re.IGNORECASE) is not None
+        return common_value.lower() in value.lower()
+
+    def doc_type():
+        patterns = [
+            r'tipo\s*(?:de\s*)?documento[:\s]*([A-Z]{2,4})',
+            r'\b(CC|CE|TI|PA|DNI|RUC|NIT)\b',
+            r'(?:Cédula|Cedula|Pasaporte|Tarjeta)[:\s]*([A-Za-z\s]+)',
+        ]
+        for pattern in patterns:
+            match = re.search(pattern, text, re.IGNORECASE)
+            if match:
+                value = match.group(1).strip().upper()
+                type_mapping = {
+                    'CEDULA': 'CC',
+                    'CÉDULA': 'CC',
+                    'CEDULA DE CIUDADANIA': 'CC',
+                    'CÉDULA DE CIUDADANÍA': 'CC',
+                    'PASAPORTE': 'PA',
+                    'TARJETA DE IDENTIDAD': 'TI',
+                }
+                return type_mapping.get(value, value)
+        return ''
+
+    def doc_number():
+        patterns = [
+            r'(?:número|numero|n°|' + (r'(?<!\w)' if changes else '') + r'no\.?|#)[:\s]*([0-9]{6,15})',
+            r'documento[:\s]*([0-9]{6,15})',
+            r'\b([0-9]{8,12})\b',
+        ]
+        for pattern in patterns:
+            match = re.search(pattern, text, re.IGNORECASE)
+            if match:
+                number = match.group(1).strip()
+                if number.isdigit() and 6 <= len(number) <= 15:
+                    return number
+        return ''
+
+    def name():
+        full_name = f'{name_word}(?:{name_separator}{name_word})+'
+        patterns = [
+            (rf'nombre\s*(?:completo)?[:\s]*({full_name})', re.MULTILINE | re.IGNORECASE),
+            (rf'(?:Sr\.|Sra\.|Srta\.)\s+({full_name})', re.MULTILINE | re.IGNORECASE),
+        ]
+        if changes:
+            patterns.append((rf'^({name_word}(?:[ \t]+{name_word}){{2,4}})[ \t]*$', re.MULTILINE))
+        else:
+            patterns.append((rf'^({name_word}(?:\s+{name_word}){{2,4}})', re.MULTILINE | re.IGNORECASE))
+        for pattern, flags in patterns:
+            match = re.search(pattern, text, flags)
+            if match:
+                value = match.group(1).strip()
+                if len(value.split()) >= 2:
+                    return value.title()
+        return ''
+
+    def email():
+        match = re.search(r'\b([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})\b', text)
+        return match.group(1).lower() if match else ''
+
+    def role():
+        patterns = [
+            r'(?:rol|perfil|cargo|puesto)[:\s]*([A-Za-záéíóúñÁÉÍÓÚÑ\s]+?)(?:\n|$|Área|Area)',
+            r'(?:administrador|usuario|operador|supervisor|gerente|analista|desarrollador)',
+        ]
+        common_roles = [
+            'Administrador', 'Usuario', 'Operador', 'Supervisor',
+            'Gerente', 'Analista', 'Desarrollador', 'Coordinador',
+            'Asistente', 'Director', 'Jefe', 'Líder', 'Especialista'
+        ]
+        for pattern in patterns:
+            match = re.search(pattern, text, re.IGNORECASE)
+            if match:
+                value = match.group(0 if 'administrador' in pattern else 1).strip()
+                for common_role in common_roles:
+                    if common_role.lower() in value.lower():
+                        return common_role
+                return value.title()
+        return ''
+
+    def area():
+        patterns = [
+            r'(?:área|area|departamento|dpto\.?)[:\s]*([A-Za-záéíóúñÁÉÍÓÚÑ\s]+?)(?:\n|$)',
+            r'(?:Ventas|Marketing|' + (r'\bTI\b' if changes else 'TI') +
+            r'|Sistemas|RRHH|Finanzas|Operaciones|Logística|Contabilidad)',
+        ]
+        common_areas = [
+            'Ventas', 'Marketing', 'TI', 'Sistemas', 'Tecnología',
+            'RRHH', 'Recursos Humanos', 'Finanzas', 'Contabilidad',
+            'Operaciones', 'Logística', 'Producción', 'Administración',
+            'Legal', 'Compras', 'Soporte'
+        ]
+        for pattern in patterns:
+            match = re.search(pattern, text, re.IGNORECASE)
+            if match:
+                value = match.group(0 if 'Ventas' in pattern else 1).strip()
+                for common_area in common_areas:
+                    if contains(common_area, value):
+                        return common_area
+                return value.title()
+        return ''
+
+    return {
+        'tipo_documento': doc_type(),
+        'numero_documento': doc_number(),
+        'nombre_completo': name(),
+        'email': email(),
+        'rol': role(),
+        'area': area()
+    }
+
+
+def generate_samples(count, seed=42):
+    """
+    Generar textos OCR sintéticos con sus datos esperados
+
+    Returns:
+        list: Tuplas (texto, datos esperados)
+    """
+    rng = random.Random(seed)
+    samples = []
+
+    for _ in range(count):
+        first = rng.choice(FIRST_NAMES)
+        last = f"{rng.choice(LAST_NAMES)} {rng.choice(LAST_NAMES)}"
+        expected = {
+            'tipo_documento': rng.choice(DOC_TYPES),
+            'numero_documento': str(rng.randint(10_000_000, 1_999_999_999)),
+            'nombre_completo': f"{first} {last}",
+            'email': f"{first[0].lower()}{rng.randint(1, 999)}@empresa.com",
+            'rol': rng.choice(ROLES),
+            'area': rng.choice(AREAS),
+        }
+        layout = rng.choice(TEXT_LAYOUTS)
+        text = PAGE_HEADER + layout.format(
+            tipo=expected['tipo_documento'],
+            numero=expected['numero_documento'],
+            nombre=expected['nombre_completo'],
+            email=expected['email'],
+            rol=expected['rol'],
+            area=expected['area']
+        ) + PAGE_FOOTER
+        if '{tipo}' not in layout:
+            expected['tipo_documento'] = ''
+        samples.append((text, expected))
+
+    return samples
+
+
+def generate_variants(count, seed=7):
+    """Generar textos variados (sin datos esperados) para comparar extractores"""
+    rng = random.Random(seed)
+    variants = []
+    for _ in range(count):
+        parts = []
+        for _ in range(rng.randint(3, 25)):
+            parts.append(rng.choice(VARIANT_FRAGMENTS))
+            parts.append(rng.choice(VARIANT_SEPARATORS))
+        variants.append(''.join(parts))
+    return variants
+
+
+def check_behavior():
+    """
+    Comprobar cambios deliberados y casos que deben seguir igual
+
+    Returns:
+        int: Número de comprobaciones fallidas
+    """
+    failures = 0
+
+    print("🧪 Cambios deliberados respecto al extractor anterior")
+    for code, description, text, field, old_value, new_value in DELIBERATE_CHANGES:
+        values = (
+            legacy_extract(text)[field],
+            legacy_extract(text, changes=True)[field],
+            extract_fields(text)[field]
+        )
+        ok = values == (old_value, new_value, new_value)
+        failures += not ok
+        print(f"   {'✅' if ok else '❌'} {code} {description}: {values[0]!r} → {values[2]!r}")
+
+    print("🧪 Casos que deben seguir igual")
+    for text, field, expected in REGRESSION_CHECKS:
+        values = (legacy_extract(text)[field], extract_fields(text)[field])
+        ok = values == (expected, expected)
+        failures += not ok
+        print(f"   {'✅' if ok else '❌'} {text!r} → {field} = {values[1]!r}")
+
+    print()
+    return failures
+
+
+def compare(texts):
+    """
+    Comparar el extractor nuevo con el anterior campo por campo
+
+    Returns:
+        tuple: (campos distintos por campo sin cambios deliberados, con ellos)
+    """
+    plain = dict.fromkeys(FIELDS, 0)
+    with_changes = dict.fromkeys(FIELDS, 0)
+    for text in texts:
+        new = extract_fields(text)
+        old = legacy_extract(text)
+        changed = legacy_extract(text, changes=True)
+        for field in FIELDS:
+            plain[field] += old[field] != new[field]
+            with_changes[field] += changed[field] != new[field]
+    return plain, with_changes
+
+
+def run(extractor, samples, repeat=5):
+    """Ejecutar un extractor sobre todas las muestras y medir tiempo (el mejor de repeat)"""
+    elapsed = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        results = [extractor(text) for text, _ in samples]
+        elapsed = min(elapsed, time.perf_counter() - start)
+
+    correct = sum(
+        1
+        for result, (_, expected) in zip(results, samples)
+        for field in FIELDS
+        if result[field].lower() == expected[field].lower()
+    )
+    return elapsed, correct, results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Microbenchmark del extractor de campos")
+    parser.add_argument('-n', '--count', type=int, default=3000,
+                        help="Número de textos sintéticos")
+    parser.add_argument('-r', '--repeat', type=int, default=5,
+                        help="Repeticiones de la medición (se toma la mejor)")
+    args = parser.parse_args(argv)
+
+    samples = generate_samples(args.count)
+    total_fields = len(samples) * len(FIELDS)
+
+    print("=" * 60)
+    print("BENCHMARK DEL EXTRACTOR DE CAMPOS")
+    print("=" * 60)
+    print(f"📄 {len(samples)} textos sintéticos\n")
+
+    timings = {}
+    results = {}
+    for label, extractor in (('anterior', legacy_extract), ('una pasada', extract_fields)):
+        elapsed, correct, results[label] = run(extractor, samples, args.repeat)
+        timings[label] = elapsed
+        print(f"⚙️  Extractor {label}")
+        print(f"   Tiempo total:        {elapsed * 1000:8.1f} ms")
+        print(f"   Por texto:           {elapsed / len(samples) * 1e6:8.1f} µs")
+        print(f"   Campos correctos:    {100 * correct / total_fields:7.1f} %\n")
+
+    print(f"🚀 Aceleración: {timings['anterior'] / timings['una pasada']:.1f}x\n")
+
+    failures = check_behavior()
+
+    variants = generate_variants(args.count)
+    texts = [text for text, _ in samples] + variants
+    plain, with_changes = compare(texts)
+    total = len(texts) * len(FIELDS)
+    print(f"🔁 Coincidencia con el extractor anterior ({len(texts)} textos, "
+          f"{len(variants)} de ellos variados)")
+    print(f"   Tal cual:                      {100 * (1 - sum(plain.values()) / total):6.2f} %")
+    for field in FIELDS:
+        if plain[field]:
+            print(f"     {field}: {plain[field]} distintos")
+    print(f"   Con los cambios deliberados:   {100 * (1 - sum(with_changes.values()) / total):6.2f} %")
+    for field in FIELDS:
+        if with_changes[field]:
+            print(f"     {field}: {with_changes[field]} distintos")
+
+    failures += sum(with_changes.values())
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
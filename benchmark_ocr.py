@@ -0,0 +1,344 @@
+"""
+Benchmark de rendimiento del OCR
+Compara la latencia por imagen de los motores OCR disponibles y, con
+--presets, el tiempo por etapa y la precisión de cada preset de preprocesamiento
+
+Uso:
+    python benchmark_ocr.py                      # Usa formularios sintéticos
+    python benchmark_ocr.py carpeta_formularios/ # Usa imágenes reales
+    python benchmark_ocr.py --presets            # Compara presets de preprocesamiento
+    python benchmark_ocr.py --templates          # Compara página completa vs plantilla
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+from form_templates import FormTemplate, FormTemplateRegistry
+from ocr_batch import collect_images
+from ocr_processor import OCRProcessor, OCR_ENGINES, PREPROCESS_PRESETS
+
+# Formularios sintéticos: mismo formato que el ejemplo de ocr_processor.py
+# (sin tildes, cv2.putText solo dibuja ASCII)
+SAMPLE_FORMS = [
+    {
+        'tipo_documento': 'CC',
+        'numero_documento': '1234567890',
+        'nombre_completo': 'Juan Carlos Perez Rodriguez',
+        'email': 'juan.perez@empresa.com',
+        'rol': 'Administrador',
+        'area': 'Sistemas'
+    },
+    {
+        'tipo_documento': 'CE',
+        'numero_documento': '52789431',
+        'nombre_completo': 'Maria Fernanda Gomez Ruiz',
+        'email': 'mfgomez@empresa.com',
+        'rol': 'Analista',
+        'area': 'Finanzas'
+    },
+    {
+        'tipo_documento': 'TI',
+        'numero_documento': '1002003004',
+        'nombre_completo': 'Andres Felipe Torres',
+        'email': 'atorres@empresa.com',
+        'rol': 'Operador',
+        'area': 'Soporte'
+    },
+]
+
+
+# Plantilla del formulario sintético: etiquetas a la izquierda, valores a
+# partir de x=1100 px, una fila cada 140 px (ver render_form)
+SAMPLE_TEMPLATE = FormTemplate(
+    name='formulario_sintetico',
+    aspect_ratio=2480 / 1200,
+    anchor={'box': [0.03, 0.05, 0.75, 0.158], 'text': 'FORMULARIO DE USUARIO'},
+    fields={
+        'tipo_documento': {'box': [0.427, 0.167, 0.98, 0.275]},
+        'numero_documento': {'box': [0.427, 0.283, 0.98, 0.392]},
+        'nombre_completo': {'box': [0.427, 0.400, 0.98, 0.508]},
+        'email': {'box': [0.427, 0.517, 0.98, 0.625]},
+        'rol': {'box': [0.427, 0.633, 0.98, 0.742]},
+        'area': {'box': [0.427, 0.750, 0.98, 0.858]},
+    }
+)
+
+
+def render_form(user_data, width=2480, height=1200):
+    """
+    Dibujar un formulario sintético (A4 a 300 DPI de ancho) con los datos dados
+    """
+    img = np.full((height, width, 3), 255, dtype=np.uint8)
+    rows = [
+        ("FORMULARIO DE USUARIO", ''),
+        ("Tipo de Documento:", user_data['tipo_documento']),
+        ("Numero:", user_data['numero_documento']),
+        ("Nombre Completo:", user_data['nombre_completo']),
+        ("Email:", user_data['email']),
+        ("Rol:", user_data['rol']),
+        ("Area:", user_data['area']),
+    ]
+    for idx, (label, value) in enumerate(rows):
+        y = 150 + idx * 140
+        for x, text in ((120, label), (1100, value)):
+            cv2.putText(
+                img, text, (x, y),
+                cv2.FONT_HERSHEY_SIMPLEX, 2.2, (0, 0, 0), 4, cv2.LINE_AA
+            )
+    return img
+
+
+def add_scan_noise(img, sigma=12, seed=0):
+    """Simular ruido de escáner (ruido gaussiano)"""
+    rng = np.random.default_rng(seed)
+    noise = rng.normal(0, sigma, img.shape)
+    return np.clip(img.astype(np.float32) + noise, 0, 255).astype(np.uint8)
+
+
+def create_sample_images(directory, copies=3):
+    """
+    Crear imágenes sintéticas en una carpeta temporal
+    La mitad de las copias lleva ruido de escáner
+
+    Returns:
+        dict: Ruta de imagen → datos esperados
+    """
+    expected = {}
+    for copy in range(copies):
+        for idx, user_data in enumerate(SAMPLE_FORMS):
+            img = render_form(user_data)
+            if copy % 2:
+                img = add_scan_noise(img, seed=copy * 10 + idx)
+            path = os.path.join(directory, f"formulario_{copy}_{idx}.png")
+            cv2.imwrite(path, img)
+            expected[path] = user_data
+    return expected
+
+
+def field_accuracy(extracted, expected):
+    """Contar campos extraídos correctamente (sin distinguir mayúsculas)"""
+    correct = 0
+    for field, value in expected.items():
+        if extracted.get(field, '').strip().lower() == value.lower():
+            correct += 1
+    return correct, len(expected)
+
+
+def benchmark_preset(preset, image_paths, expected=None):
+    """
+    Medir tiempo por etapa del preprocesamiento y precisión de campos de un preset
+
+    Returns:
+        dict: Tiempos (ms) por etapa, tiempo de OCR y campos correctos/totales
+    """
+    processor = OCRProcessor(cache=False, preset=preset, templates=FormTemplateRegistry())
+    stage_times = {}
+    ocr_times = []
+    correct = 0
+    total = 0
+
+    try:
+        for path in image_paths:
+            timings = {}
+            img = processor.preprocess_image(path, timings)
+            for stage, ms in timings.items():
+                stage_times.setdefault(stage, []).append(ms)
+
+            if expected:
+                start = time.perf_counter()
+                user_data = processor.extract_user_data(path)
+                ocr_times.append((time.perf_counter() - start) * 1000)
+                ok, count = field_accuracy(user_data, expected[path])
+                correct += ok
+                total += count
+            else:
+                start = time.perf_counter()
+                processor.engine.image_to_string(img)
+                ocr_times.append((time.perf_counter() - start) * 1000)
+    finally:
+        processor.close()
+
+    return {
+        'stages': stage_times,
+        'ocr_ms': ocr_times,
+        'correct': correct,
+        'total': total
+    }
+
+
+def print_preset_report(preset, result, image_count):
+    print(f"\n🎛️  Preset: {preset}")
+    preprocess_total = 0.0
+    for stage, times in result['stages'].items():
+        # Las etapas omitidas en algunas imágenes cuentan como 0 ms
+        avg = sum(times) / image_count
+        preprocess_total += avg
+        print(f"   {stage:<22} {avg:8.1f} ms")
+    print(f"   {'preprocesamiento':<22} {preprocess_total:8.1f} ms")
+    label = 'extracción completa' if result['total'] else 'ocr'
+    print(f"   {label:<22} {statistics.median(result['ocr_ms']):8.1f} ms (mediana)")
+    if result['total']:
+        accuracy = 100 * result['correct'] / result['total']
+        print(f"   {'precisión de campos':<22} {accuracy:7.1f} % "
+              f"({result['correct']}/{result['total']})")
+
+
+def benchmark_engine(engine_name, image_paths, repeats=1):
+    """
+    Medir latencia de OCR por imagen para un motor
+
+    Returns:
+        dict: Tiempo de inicialización y latencias (ms) de OCR y de extracción completa
+    """
+    start = time.perf_counter()
+    processor = OCRProcessor(engine=engine_name, cache=False, templates=FormTemplateRegistry())
+    init_ms = (time.perf_counter() - start) * 1000
+
+    # Preprocesar una sola vez para medir solo el motor
+    preprocessed = [processor.preprocess_image(path) for path in image_paths]
+
+    ocr_times = []
+    total_times = []
+
+    try:
+        for _ in range(repeats):
+            for img in preprocessed:
+                start = time.perf_counter()
+                processor.engine.image_to_string(img)
+                ocr_times.append((time.perf_counter() - start) * 1000)
+
+            for path in image_paths:
+                start = time.perf_counter()
+                processor.extract_user_data(path)
+                total_times.append((time.perf_counter() - start) * 1000)
+    finally:
+        processor.close()
+
+    return {
+        'init_ms': init_ms,
+        'ocr_ms': ocr_times,
+        'total_ms': total_times
+    }
+
+
+def print_engine_report(engine_name, result):
+    ocr = result['ocr_ms']
+    total = result['total_ms']
+    print(f"\n⚙️  Motor: {engine_name}")
+    print(f"   Inicialización:        {result['init_ms']:8.1f} ms")
+    print(f"   OCR por imagen (med):  {statistics.median(ocr):8.1f} ms")
+    print(f"   OCR por imagen (p95):  {sorted(ocr)[int(len(ocr) * 0.95) - 1]:8.1f} ms")
+    print(f"   Extracción completa:   {statistics.median(total):8.1f} ms (mediana)")
+
+
+def benchmark_templates(image_paths, expected):
+    """
+    Comparar la extracción por página completa con la extracción por plantilla
+
+    Returns:
+        dict: Modo → latencias (ms) y campos correctos/totales
+    """
+    modes = {
+        'página completa': FormTemplateRegistry(),
+        'plantilla': FormTemplateRegistry([SAMPLE_TEMPLATE]),
+    }
+    results = {}
+
+    for mode, registry in modes.items():
+        processor = OCRProcessor(cache=False, templates=registry)
+        times = []
+        correct = 0
+        total = 0
+        try:
+            for path in image_paths:
+                start = time.perf_counter()
+                user_data = processor.extract_user_data(path)
+                times.append((time.perf_counter() - start) * 1000)
+                ok, count = field_accuracy(user_data, expected[path])
+                correct += ok
+                total += count
+        finally:
+            processor.close()
+        results[mode] = {'ms': times, 'correct': correct, 'total': total}
+
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark del procesamiento OCR")
+    parser.add_argument('source', nargs='?', default=None,
+                        help="Carpeta o patrón glob de imágenes (por defecto, sintéticas)")
+    parser.add_argument('-r', '--repeats', type=int, default=3,
+                        help="Repeticiones por imagen")
+    parser.add_argument('--presets', action='store_true',
+                        help="Comparar presets de preprocesamiento en lugar de motores")
+    parser.add_argument('--templates', action='store_true',
+                        help="Comparar OCR de página completa con OCR por plantilla "
+                             "(solo formularios sintéticos)")
+    args = parser.parse_args(argv)
+
+    print("=" * 60)
+    print("BENCHMARK DE OCR")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        expected = None
+        if args.source:
+            image_paths = collect_images(args.source)
+        else:
+            expected = create_sample_images(tmp_dir)
+            image_paths = list(expected)
+
+        if not image_paths:
+            print(f"⚠️  No se encontraron imágenes en: {args.source}")
+            return 1
+
+        if args.templates:
+            if expected is None:
+                print("⚠️  --templates solo funciona con los formularios sintéticos")
+                return 1
+            print(f"📂 {len(image_paths)} imágenes")
+            for mode, result in benchmark_templates(image_paths, expected).items():
+                accuracy = 100 * result['correct'] / result['total']
+                print(f"\n📐 {mode}")
+                print(f"   Extracción completa:   {statistics.median(result['ms']):8.1f} ms (mediana)")
+                print(f"   Precisión de campos:   {accuracy:7.1f} % "
+                      f"({result['correct']}/{result['total']})")
+            return 0
+
+        if args.presets:
+            print(f"📂 {len(image_paths)} imágenes")
+            for preset in PREPROCESS_PRESETS:
+                result = benchmark_preset(preset, image_paths, expected)
+                print_preset_report(preset, result, len(image_paths))
+            return 0
+
+        print(f"📂 {len(image_paths)} imágenes x {args.repeats} repeticiones")
+
+        results = {}
+        for engine_name in OCR_ENGINES:
+            try:
+                results[engine_name] = benchmark_engine(engine_name, image_paths, args.repeats)
+                print_engine_report(engine_name, results[engine_name])
+            except Exception as e:
+                print(f"\n⚠️  Motor {engine_name} no disponible: {str(e)}")
+
+        if len(results) > 1:
+            base = statistics.median(results['subprocess']['ocr_ms'])
+            for engine_name, result in results.items():
+                if engine_name != 'subprocess':
+                    speedup = base / statistics.median(result['ocr_ms'])
+                    print(f"\n🚀 {engine_name} vs subprocess: {speedup:.1f}x más rápido por imagen")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,129 @@
+"""
+Benchmark de la representación de usuarios
+Compara tiempo y memoria de convertir filas de gn_usuarios a:
+- diccionarios (DatabaseHandler._map_savia_user_to_standard)
+- SaviaUser (__slots__)
+- SaviaUserBatch (una lista por campo)
+
+No necesita conexión a la base de datos: usa filas sintéticas con el mismo
+formato que devuelve el cursor.
+
+Uso:
+    python benchmark_records.py
+    python benchmark_records.py -n 500000
+"""
+
+import argparse
+import gc
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from database_handler import DatabaseHandler
+from savia_user import SaviaUser, SaviaUserBatch
+
+NOMBRES = ['JUAN', 'MARIA', 'ANDRES', 'LUISA', 'CARLOS', 'ANA', 'PEDRO', 'SOFIA']
+APELLIDOS = ['PEREZ', 'GOMEZ', 'RODRIGUEZ', 'TORRES', 'RAMIREZ', 'CASTRO', 'ROJAS']
+CARGOS = ['AUXILIAR ADMINISTRATIVO', 'ANALISTA', 'MEDICO AUDITOR', 'COORDINADOR', None]
+AREAS = ['SISTEMAS', 'FINANZAS', 'AUDITORIA MEDICA', 'ATENCION AL USUARIO', None]
+
+
+def generate_rows(count, seed=42):
+    """Filas sintéticas de gn_usuarios (como dicts del cursor)"""
+    rng = random.Random(seed)
+    base = datetime(2020, 1, 1)
+    rows = []
+
+    for idx in range(1, count + 1):
+        nombre = f"{rng.choice(NOMBRES)} {rng.choice(APELLIDOS)} {rng.choice(APELLIDOS)}"
+        usuario = f"{nombre.split()[0][0].lower()}{nombre.split()[1].lower()}{idx}"
+        rows.append({
+            'id': idx,
+            'gn_empresas_id': 1,
+            'au_grupos_id': rng.randint(1, 40),
+            'nombre': nombre,
+            'usuario': usuario,
+            'correo_electronico': f"{usuario}@saviasalud.com",
+            'mae_tipo_documento_codigo': rng.choice(['CC', 'CE', 'TI']),
+            'documento': str(rng.randint(10_000_000, 1_999_999_999)),
+            'mae_area_valor': rng.choice(AREAS),
+            'mae_cargo_valor': rng.choice(CARGOS),
+            'telefono': None,
+            'celular': f"3{rng.randint(100_000_000, 199_999_999)}",
+            'activo': rng.choice([b'\x01', b'\x01', b'\x00']),
+            'bloqueado': b'\x00',
+            'fecha_ultimo_ingreso': base + timedelta(minutes=rng.randint(0, 2_000_000)),
+            'fecha_hora_crea': base + timedelta(minutes=idx),
+            'fecha_hora_modifica': None,
+        })
+
+    return rows
+
+
+def measure(convert, rows):
+    """
+    Convertir todas las filas midiendo tiempo y memoria retenida
+
+    Returns:
+        tuple: (resultado, segundos, bytes retenidos)
+    """
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = convert(rows)
+    elapsed = time.perf_counter() - start
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, retained
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de la representación de usuarios")
+    parser.add_argument('-n', '--count', type=int, default=100_000,
+                        help="Número de filas sintéticas")
+    args = parser.parse_args(argv)
+
+    rows = generate_rows(args.count)
+    db = DatabaseHandler(cache=False, mirror=False)
+
+    modes = {
+        'diccionarios': lambda rows: [db._map_savia_user_to_standard(row) for row in rows],
+        'SaviaUser': lambda rows: [SaviaUser.from_row(row) for row in rows],
+        'SaviaUserBatch': SaviaUserBatch.from_rows,
+    }
+
+    print("=" * 60)
+    print("BENCHMARK DE REPRESENTACIÓN DE USUARIOS")
+    print("=" * 60)
+    print(f"📄 {len(rows)} filas sintéticas\n")
+
+    results = {}
+    for mode, convert in modes.items():
+        result, elapsed, retained = measure(convert, rows)
+        results[mode] = (elapsed, retained)
+        print(f"📦 {mode}")
+        print(f"   Tiempo:            {elapsed * 1000:8.1f} ms")
+        print(f"   Memoria retenida:  {retained / 1024 / 1024:8.1f} MB\n")
+
+        # Verificar que todas las formas dan los mismos datos
+        if mode == 'diccionarios':
+            expected = result
+        else:
+            users = result.to_dicts() if mode == 'SaviaUserBatch' else [u.to_dict() for u in result]
+            if users != expected:
+                print(f"❌ {mode} no coincide con los diccionarios")
+                return 1
+        del result
+
+    base_time, base_memory = results['diccionarios']
+    for mode, (elapsed, retained) in results.items():
+        if mode != 'diccionarios':
+            print(f"🚀 {mode}: {base_time / elapsed:.1f}x más rápido, "
+                  f"{base_memory / retained:.1f}x menos memoria")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,278 @@
+"""
+Benchmark de la automatización web
+Compara el tiempo por acción de WebAutomation:
+- sin sesión: cada acción lanza el navegador, hace login y lo cierra
+- con sesión: el navegador queda abierto y el login se hace una sola vez
+- reinicio con sesión guardada: un WebAutomation nuevo que carga el
+  storage_state del modo anterior (no pasa por el formulario de login)
+
+La acción medida es de solo lectura: abrir el módulo de usuarios y buscar un
+documento (no modifica usuarios). Usa PLATFORM_URL / PLATFORM_USER /
+PLATFORM_PASSWORD del .env.
+
+Con --replica se usa la réplica local (savia_standin.py) y además se mide la
+latencia de extremo a extremo de cada acción (cambiar rol, desactivar,
+activar) con la sesión abierta, sin pausa (slow_mo=0) y con la pausa de
+depuración que antes era fija (slow_mo=50). También se compara cada acción
+por el navegador contra la ruta rápida HTTP (jsf_http.py, requiere requests)
+y se verifica en la réplica que el usuario quedó como se esperaba, y el
+tiempo de carga del módulo de usuarios con el perfil completo y el liviano
+(WEB_LEAN_PROFILE), con un contexto de navegador nuevo en cada carga.
+
+Uso:
+    python benchmark_web.py 1234567890
+    python benchmark_web.py 1234567890 -n 10 --headless
+    python benchmark_web.py --replica --headless --latencia 50
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from web_automation import ResourceCache, WebAutomation
+
+# Pausa entre operaciones que antes se aplicaba siempre (ahora WEB_SLOW_MO)
+LEGACY_SLOW_MO = 50
+
+
+def consult_user(automation, numero_documento):
+    """Acción de solo lectura: sesión + módulo de usuarios + búsqueda"""
+    try:
+        session = automation.ensure_session("admin", "usuarios")
+        if not session['success']:
+            raise Exception(session['message'])
+        automation.search_user(numero_documento)
+    finally:
+        automation.finish_action()
+
+
+def run_mode(name, automation, numero_documento, repetitions, launch_time=0.0):
+    """
+    Ejecutar la acción varias veces con la misma instancia
+
+    Returns:
+        list: Milisegundos por acción (la primera incluye lanzar el navegador)
+    """
+    times = []
+    for attempt in range(repetitions):
+        start = time.perf_counter()
+        try:
+            consult_user(automation, numero_documento)
+        except Exception as e:
+            print(f"   ⚠️ {str(e)}")
+        elapsed = time.perf_counter() - start
+        if attempt == 0:
+            elapsed += launch_time
+        times.append(elapsed * 1000)
+
+    print(f"\n📦 {name}")
+    print(f"   Primera acción:     {times[0]:8.0f} ms")
+    if len(times) > 1:
+        print(f"   Siguientes (media): {statistics.mean(times[1:]):8.0f} ms")
+    print(f"   Media por acción:   {statistics.mean(times):8.0f} ms")
+    print(f"   {automation.stats()}")
+    return times
+
+
+def run_action_latency(headless, repetitions, slow_mo, state_path, http_fast_path=False,
+                       standin=None):
+    """
+    Latencia de cada tipo de acción con la sesión abierta (réplica local)
+
+    Returns:
+        dict: Acción → milisegundos por repetición
+    """
+    from savia_standin import ROLES
+
+    automation = WebAutomation(headless=headless, persistent=True,
+                               storage_state_path=state_path, slow_mo=slow_mo,
+                               http_fast_path=http_fast_path)
+    times = {'cambiar_rol': [], 'desactivar': [], 'activar': []}
+    try:
+        # Abrir sesión y módulo antes de medir
+        automation.ensure_session("admin", "usuarios")
+
+        for attempt in range(repetitions):
+            documento = str(1_000_001 + attempt)
+            rol = ROLES[(attempt + int(http_fast_path)) % len(ROLES)]
+            for accion, params, expected in (
+                ('cambiar_rol', {'rol': rol}, (rol, True)),
+                ('desactivar', {}, (rol, False)),
+                ('activar', {}, (rol, True)),
+            ):
+                result = automation.run_action(documento, accion, params)
+                if not result['success']:
+                    print(f"   ⚠️ {accion} {documento}: {result['message']}")
+                elif standin is not None:
+                    user = standin.get_user(documento)
+                    if (user['rol'], user['activo']) != expected:
+                        print(f"   ❌ {accion} {documento}: la réplica quedó con {user}")
+                times[accion].append(result['duracion_ms'])
+        if http_fast_path:
+            print(f"\n   {automation.stats()}")
+    finally:
+        automation.close()
+    return times
+
+
+def run_page_load(headless, repetitions, lean, state_path, standin):
+    """
+    Tiempo de carga del módulo de usuarios, con un navegador nuevo en cada carga
+    
+    Returns:
+        tuple: (milisegundos por carga, recursos pedidos a la réplica)
+    """
+    times = []
+    resources = standin.stats()['resource_requests']
+    resource_cache = ResourceCache()
+    for _ in range(repetitions):
+        automation = WebAutomation(headless=headless, persistent=True,
+                                   storage_state_path=state_path, lean=lean,
+                                   resource_cache=resource_cache)
+        try:
+            start = time.perf_counter()
+            automation.navegar_a_modulo_url("admin", "usuarios")
+            times.append((time.perf_counter() - start) * 1000)
+        finally:
+            automation.close()
+    return times, standin.stats()['resource_requests'] - resources
+
+
+def print_latency(label, times):
+    print(f"\n⏱️  {label}")
+    for accion, values in times.items():
+        ordered = sorted(values)
+        p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+        print(f"   {accion:<12} media {statistics.mean(values):7.0f} ms   "
+              f"p50 {statistics.median(values):7.0f} ms   p95 {p95:7.0f} ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de sesión de WebAutomation")
+    parser.add_argument('documento', nargs='?', help="Número de documento a buscar (solo lectura)")
+    parser.add_argument('-n', '--repeticiones', type=int, default=5,
+                        help="Acciones por modo")
+    parser.add_argument('--headless', action='store_true',
+                        help="Ejecutar el navegador sin interfaz gráfica")
+    parser.add_argument('--replica', action='store_true',
+                        help="Usar la réplica local de SAVIA y medir cada acción")
+    parser.add_argument('--latencia', type=float, default=50,
+                        help="Milisegundos de espera por página de la réplica")
+    args = parser.parse_args(argv)
+
+    standin = None
+    if args.replica:
+        from savia_standin import SaviaStandin
+        standin = SaviaStandin(port=0, latency=args.latencia / 1000,
+                               users=max(100, args.repeticiones)).start()
+        os.environ['PLATFORM_URL'] = standin.url
+        args.documento = args.documento or '1000001'
+    elif not args.documento:
+        parser.error("indica el documento a buscar o usa --replica")
+
+    try:
+        return run_benchmark(args, standin)
+    finally:
+        if standin is not None:
+            standin.stop()
+
+
+def run_benchmark(args, standin=None):
+    state_path = os.path.join(tempfile.mkdtemp(prefix='savia_'), 'session.json')
+
+    print("=" * 60)
+    print("BENCHMARK DE SESIÓN WEB")
+    print("=" * 60)
+    print(f"🌐 {os.getenv('PLATFORM_URL', 'http://10.250.3.66:8080/savia')}")
+    print(f"🔁 {args.repeticiones} acciones por modo")
+
+    results = {}
+    try:
+        # Sin sesión: el navegador se cierra y se vuelve a lanzar en cada acción
+        start = time.perf_counter()
+        automation = WebAutomation(headless=args.headless, persistent=False)
+        launch = time.perf_counter() - start
+        results['sin sesión'] = run_mode(
+            'Sin sesión', automation, args.documento, args.repeticiones, launch
+        )
+
+        # Con sesión: un solo navegador y un solo login
+        start = time.perf_counter()
+        automation = WebAutomation(headless=args.headless, persistent=True,
+                                   storage_state_path=state_path)
+        launch = time.perf_counter() - start
+        try:
+            results['con sesión'] = run_mode(
+                'Con sesión', automation, args.documento, args.repeticiones, launch
+            )
+        finally:
+            automation.close()
+
+        # Reinicio: nueva instancia con la sesión guardada en disco
+        start = time.perf_counter()
+        automation = WebAutomation(headless=args.headless, persistent=True,
+                                   storage_state_path=state_path)
+        launch = time.perf_counter() - start
+        try:
+            results['reinicio'] = run_mode(
+                'Reinicio con sesión guardada', automation, args.documento, 1, launch
+            )
+        finally:
+            automation.close()
+
+    except Exception as e:
+        print(f"❌ Error: {str(e)}")
+        return 1
+
+    base = statistics.mean(results['sin sesión'])
+    for mode in ('con sesión', 'reinicio'):
+        print(f"🚀 {mode}: {base / statistics.mean(results[mode]):.1f}x más rápido por acción")
+
+    if standin is not None:
+        try:
+            page_loads = {
+                'completo': run_page_load(args.headless, args.repeticiones, False, state_path, standin),
+                'liviano': run_page_load(args.headless, args.repeticiones, True, state_path, standin),
+            }
+        except Exception as e:
+            print(f"❌ Error: {str(e)}")
+            return 1
+        print("\n📄 Carga del módulo de usuarios (navegador nuevo en cada carga)")
+        for profile, (times, resources) in page_loads.items():
+            print(f"   {profile:<9} media {statistics.mean(times):7.0f} ms   "
+                  f"máx {max(times):7.0f} ms   recursos pedidos {resources}")
+        full, lean = (statistics.mean(times) for times, _ in page_loads.values())
+        print(f"🚀 perfil liviano: {full / lean:.1f}x más rápido por carga")
+
+        try:
+            fast = run_action_latency(args.headless, args.repeticiones, 0, state_path)
+            slow = run_action_latency(args.headless, args.repeticiones, LEGACY_SLOW_MO, state_path)
+        except Exception as e:
+            print(f"❌ Error: {str(e)}")
+            return 1
+        print_latency("Latencia por acción (slow_mo=0)", fast)
+        print_latency(f"Latencia por acción (slow_mo={LEGACY_SLOW_MO}, antes fijo)", slow)
+
+        from jsf_http import REQUESTS_AVAILABLE
+        if REQUESTS_AVAILABLE:
+            try:
+                http = run_action_latency(args.headless, args.repeticiones, 0, state_path,
+                                          http_fast_path=True, standin=standin)
+            except Exception as e:
+                print(f"❌ Error: {str(e)}")
+                return 1
+            print_latency("Latencia por acción (ruta rápida HTTP)", http)
+            for accion in fast:
+                print(f"🚀 {accion}: HTTP {statistics.mean(fast[accion]) / statistics.mean(http[accion]):.1f}x "
+                      f"más rápido que el navegador")
+        else:
+            print("\n⚠️ requests no está instalado: se omite la ruta rápida HTTP")
+        print(f"\n🌐 Réplica: {standin.stats()}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+"""
+Feed de cambios de usuarios de SAVIA
+Emite (JSON Lines) solo los usuarios modificados desde la última ejecución,
+en lugar de leer get_active_users y get_inactive_users completos. La marca
+(fecha_hora_modifica, id) del último usuario emitido se guarda en un archivo
+para continuar desde ahí la próxima vez.
+
+Uso:
+    python change_feed.py                         # Cambios desde la última marca
+    python change_feed.py -o cambios.jsonl        # Agregar a un archivo
+    python change_feed.py --desde "2024-03-01"    # Cambios desde una fecha
+    python change_feed.py --reiniciar             # Toda la tabla
+"""
+
+import argparse
+import json
+import os
+import sys
+
+from database_handler import DatabaseHandler
+
+# Archivo donde se guarda la marca del último cambio emitido
+DEFAULT_STATE_PATH = os.getenv('DB_CHANGE_FEED_STATE', 'cache/change_feed.json')
+
+
+def load_mark(path):
+    """
+    Leer la marca guardada
+
+    Returns:
+        tuple | None: (fecha, id) o None si no hay marca
+    """
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        state = json.load(f)
+    return state['fecha'], state['id']
+
+
+def save_mark(path, mark):
+    """Guardar la marca (escritura atómica para no dejar el archivo a medias)"""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+
+    fecha, last_id = mark
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'fecha': str(fecha), 'id': last_id}, f)
+    os.replace(tmp_path, path)
+
+
+def later_mark(mark, other):
+    """La mayor de dos marcas (la fecha puede ser datetime o texto)"""
+    if mark is None or (str(other[0]), other[1]) > (str(mark[0]), mark[1]):
+        return other
+    return mark
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Feed de cambios de usuarios de SAVIA")
+    parser.add_argument('-o', '--output', default=None,
+                        help="Archivo JSON Lines de salida (se agrega al final; por defecto la consola)")
+    parser.add_argument('--estado', default=DEFAULT_STATE_PATH,
+                        help="Archivo de la marca (por defecto DB_CHANGE_FEED_STATE)")
+    parser.add_argument('--desde', default=None,
+                        help="Ignorar la marca y emitir los cambios desde esta fecha")
+    parser.add_argument('--reiniciar', action='store_true',
+                        help="Ignorar la marca y emitir toda la tabla")
+    parser.add_argument('--lote', type=int, default=None,
+                        help="Usuarios por consulta (por defecto DB_PAGE_SIZE)")
+    args = parser.parse_args(argv)
+
+    if args.reiniciar:
+        mark = None
+    elif args.desde:
+        mark = (args.desde, 0)
+    else:
+        mark = load_mark(args.estado)
+
+    db = DatabaseHandler(cache=False, mirror=False)
+    save_every = args.lote or 1000
+    output = open(args.output, 'a', encoding='utf-8') if args.output else sys.stdout
+    count = 0
+    # La tabla completa no llega ordenada: la marca es la mayor y solo se
+    # guarda si se leyó todo
+    full = mark is None
+    finished = False
+
+    try:
+        for user in db.iter_changes(mark, args.lote):
+            output.write(json.dumps(user, ensure_ascii=False, default=str) + '\n')
+            count += 1
+
+            if full:
+                mark = later_mark(mark, db.change_mark(user))
+                continue
+
+            # Guardar la marca cada bloque (y al final, aunque falle): la
+            # marca nunca queda después de un usuario sin escribir
+            mark = db.change_mark(user)
+            if count % save_every == 0:
+                output.flush()
+                save_mark(args.estado, mark)
+        finished = True
+
+    except Exception as e:
+        print(f"❌ Error: {str(e)}", file=sys.stderr)
+        return 1
+
+    finally:
+        output.flush()
+        if mark is not None and count and (finished or not full):
+            save_mark(args.estado, mark)
+        if output is not sys.stdout:
+            output.close()
+        db.disconnect()
+
+    print(f"✅ {count} usuarios modificados. Marca: {mark}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,36 +3,86 @@ Módulo para manejar conexiones y consultas a la base de datos SAVIA
 MODO SOLO LECTURA - Adaptado para tabla gn_usuarios
 """
 
+import heapq
 import mysql.connector
 from mysql.connector import Error
 import os
 from dotenv import load_dotenv
 
+from db_pool import ConnectionPool, mysql_config
+from user_cache import UserCache
+from savia_user import SaviaUser, SaviaUserBatch
+from user_mirror import UserMirror
+from user_queries import (DEFAULT_PROJECTION, USER_COLUMNS, PreparedStatements,
+                          active_users_sql, bit_to_bool, bulk_chunks, bulk_users_sql,
+                          inactive_users_sql, map_user, match_bulk_rows, restrict_to_projection,
+                          search_users_sql, select_user_sql, statistics_sql, users_by_area_sql,
+                          users_by_role_sql)
+
 # Cargar variables de entorno
 load_dotenv()
 
+# Filas por bloque al recorrer resultados grandes y usuarios por página
+STREAM_BATCH_SIZE = int(os.getenv('DB_STREAM_BATCH_SIZE', 500))
+PAGE_SIZE = int(os.getenv('DB_PAGE_SIZE', 1000))
+
+# Marca inicial del recorrido de cambios (anterior a cualquier fecha de SAVIA)
+CHANGE_MARK_START = '1970-01-01 00:00:00'
+
 class DatabaseHandler:
-    def __init__(self):
-        """Inicializar handler de base de datos SAVIA"""
+    def __init__(self, pooled=None, cache=True, mirror=None, connector=None):
+        """
+        Inicializar handler de base de datos SAVIA
+
+        Args:
+            pooled (bool): Usar pool de conexiones (una conexión por consulta).
+                           Por defecto DB_POOL_ENABLED del .env (false)
+            cache (bool | UserCache): True crea una caché de usuarios con la
+                                      configuración del .env; False la desactiva
+            mirror (bool | UserMirror): Copia local para search_users. Por
+                                        defecto se usa si DB_MIRROR_PATH está definido
+            connector (callable): Abre una conexión con los parámetros de
+                                  mysql_config (mysql.connector.connect por
+                                  defecto; p. ej. db_standin.StandinDatabase.connect)
+        """
+        if pooled is None:
+            pooled = os.getenv('DB_POOL_ENABLED', 'false').lower() in ('1', 'true', 'yes', 'si')
+
+        self.pooled = pooled
+        self.pool = None
+        self.prepared = PreparedStatements()
+
+        if cache is True:
+            cache = UserCache()
+        self.cache = cache or None
+
+        if mirror is None:
+            mirror = bool(os.getenv('DB_MIRROR_PATH'))
+        if mirror is True:
+            mirror = UserMirror()
+        self.mirror = mirror or None
         self.connection = None
-        self.config = {
-            'host': os.getenv('DB_HOST', 'localhost'),
-            'port': int(os.getenv('DB_PORT', 3306)),
-            'database': os.getenv('DB_NAME', 'system_savia'),
-            'user': os.getenv('DB_USER', 'root'),
-            'password': os.getenv('DB_PASSWORD', ''),
-            'charset': 'utf8mb4',
-            'collation': 'utf8mb4_unicode_ci'
-        }
+        self.connector = connector or mysql.connector.connect
+        self.config = mysql_config()
         
         # Tabla de usuarios en SAVIA
         self.tabla_usuarios = 'gn_usuarios'
     
     def connect(self):
-        """Establecer conexión con la base de datos"""
+        """Establecer conexión (o crear el pool) con la base de datos"""
         try:
+            if self.pooled:
+                if self.pool is None:
+                    self.pool = ConnectionPool(self.config, on_reconnect=self.prepared.forget,
+                                               connector=self.connector)
+                    self.prepared.max_connections = self.pool.pool_size
+                return True
+
             if self.connection is None or not self.connection.is_connected():
-                self.connection = mysql.connector.connect(**self.config)
+                # Los cursores preparados de la conexión anterior ya no sirven
+                if self.connection is not None:
+                    self.prepared.forget(self.connection.connection_id)
+                self.connection = self.connector(**self.config)
                 if self.connection.is_connected():
                     return True
             return True
@@ -40,206 +90,191 @@ class DatabaseHandler:
             raise Exception(f"Error al conectar a MySQL: {str(e)}")
     
     def disconnect(self):
-        """Cerrar conexión con la base de datos"""
+        """Cerrar conexión (o el pool) con la base de datos"""
+        self.prepared.clear()
+        if self.mirror is not None:
+            self.mirror.close()
+            self.mirror = None
+        if self.pool is not None:
+            self.pool.close()
+            self.pool = None
         if self.connection and self.connection.is_connected():
             self.connection.close()
     
     def execute_query(self, query, params=None):
         """
         Ejecutar consulta SELECT (solo lectura)
+        En modo pool cada consulta usa su propia conexión
         """
         try:
             self.connect()
-            cursor = self.connection.cursor(dictionary=True)
-            
+
+            if self.pooled:
+                with self.pool.connection() as conn:
+                    return self._fetch_all(conn, query, params)
+
+            return self._fetch_all(self.connection, query, params)
+        
+        except Error as e:
+            raise Exception(f"Error en consulta: {str(e)}")
+
+    def _fetch_all(self, connection, query, params=None):
+        """Ejecutar consulta en una conexión y obtener todas las filas"""
+        cursor = connection.cursor(dictionary=True)
+        try:
             if params:
                 cursor.execute(query, params)
             else:
                 cursor.execute(query)
-            
-            results = cursor.fetchall()
+            return cursor.fetchall()
+        finally:
             cursor.close()
-            
-            return results
-        
+
+    def execute_prepared(self, query, params):
+        """
+        Ejecutar consulta SELECT como sentencia preparada en el servidor
+        La sentencia se prepara una vez por conexión y se reutiliza
+        (los parámetros van como ? en la consulta)
+        """
+        try:
+            self.connect()
+
+            if self.pooled:
+                with self.pool.connection() as conn:
+                    return self.prepared.execute(conn, query, params)
+
+            return self.prepared.execute(self.connection, query, params)
+
         except Error as e:
             raise Exception(f"Error en consulta: {str(e)}")
+
+    def prepared_stats(self):
+        """Sentencias preparadas en el servidor y ejecuciones"""
+        return self.prepared.stats()
+
+    def pool_stats(self):
+        """
+        Métricas del pool de conexiones
+
+        Returns:
+            dict | None: Tiempo de espera, conexiones activas, etc. (None sin pool)
+        """
+        if self.pool is None:
+            return None
+        return self.pool.stats()
     
     def _convert_bit_to_bool(self, bit_value):
         """Convertir bit(1) a booleano"""
-        if bit_value is None:
-            return None
-        if isinstance(bit_value, (bytes, bytearray)):
-            return bit_value != b'\x00'
-        return bool(bit_value)
+        return bit_to_bool(bit_value)
     
     def _map_savia_user_to_standard(self, savia_user):
-        """
-        Mapear usuario de SAVIA al formato estándar del sistema
-        
-        Mapeo:
-        - documento → numero_documento
-        - mae_tipo_documento_codigo → tipo_documento
-        - nombre → nombre_completo
-        - correo_electronico → email
-        - mae_cargo_valor → rol
-        - mae_area_valor → area
-        - activo (bit) → estado (texto)
-        """
-        if not savia_user:
-            return None
-        
-        # Convertir activo de bit a booleano
-        activo = self._convert_bit_to_bool(savia_user.get('activo'))
-        
-        return {
-            'id': savia_user.get('id'),
-            'tipo_documento': savia_user.get('mae_tipo_documento_codigo', ''),
-            'numero_documento': savia_user.get('documento', ''),
-            'nombre_completo': savia_user.get('nombre', ''),
-            'email': savia_user.get('correo_electronico', ''),
-            'usuario': savia_user.get('usuario', ''),
-            'rol': savia_user.get('mae_cargo_valor', 'Sin cargo'),
-            'area': savia_user.get('mae_area_valor', 'Sin área'),
-            'estado': 'activo' if activo else 'inactivo',
-            'fecha_creacion': savia_user.get('fecha_hora_crea'),
-            'fecha_modificacion': savia_user.get('fecha_hora_modifica'),
-            # Campos adicionales de SAVIA
-            'telefono': savia_user.get('telefono'),
-            'celular': savia_user.get('celular'),
-            'empresa_id': savia_user.get('gn_empresas_id'),
-            'grupo_id': savia_user.get('au_grupos_id'),
-            'bloqueado': self._convert_bit_to_bool(savia_user.get('bloqueado')),
-            'fecha_ultimo_ingreso': savia_user.get('fecha_ultimo_ingreso')
-        }
+        """Mapear usuario de SAVIA al formato estándar del sistema (user_queries.map_user)"""
+        return map_user(savia_user)
     
-    def get_user_by_document(self, numero_documento):
+    def get_user_by_document(self, numero_documento, projection=DEFAULT_PROJECTION):
         """
         Buscar usuario por número de documento
+
+        Args:
+            projection (str): Columnas a traer: 'status', 'minimal' o 'full'
         """
-        query = f"""
-            SELECT 
-                id,
-                gn_empresas_id,
-                au_grupos_id,
-                nombre,
-                usuario,
-                correo_electronico,
-                mae_tipo_documento_id,
-                mae_tipo_documento_codigo,
-                mae_tipo_documento_valor,
-                documento,
-                mae_area_id,
-                mae_area_codigo,
-                mae_area_valor,
-                mae_cargo_id,
-                mae_cargo_codigo,
-                mae_cargo_valor,
-                telefono,
-                celular,
-                activo,
-                bloqueado,
-                fecha_ultimo_ingreso,
-                fecha_hora_crea,
-                fecha_hora_modifica
-            FROM {self.tabla_usuarios}
-            WHERE documento = %s
-            LIMIT 1
-        """
-        
-        results = self.execute_query(query, (numero_documento,))
-        
-        if results:
-            return self._map_savia_user_to_standard(results[0])
-        return None
+        return self._get_user_by_column('documento', 'documento', numero_documento, projection)
     
-    def get_user_by_email(self, email):
+    def get_user_by_email(self, email, projection=DEFAULT_PROJECTION):
         """
         Buscar usuario por email
         """
-        query = f"""
-            SELECT 
-                id,
-                gn_empresas_id,
-                au_grupos_id,
-                nombre,
-                usuario,
-                correo_electronico,
-                mae_tipo_documento_codigo,
-                documento,
-                mae_area_valor,
-                mae_cargo_valor,
-                activo,
-                bloqueado,
-                fecha_hora_crea,
-                fecha_hora_modifica
-            FROM {self.tabla_usuarios}
-            WHERE correo_electronico = %s
-            LIMIT 1
-        """
-        
-        results = self.execute_query(query, (email,))
-        
-        if results:
-            return self._map_savia_user_to_standard(results[0])
-        return None
+        return self._get_user_by_column('correo', 'correo_electronico', email, projection)
     
-    def get_user_by_username(self, username):
+    def get_user_by_username(self, username, projection=DEFAULT_PROJECTION):
         """
         Buscar usuario por nombre de usuario
         """
-        query = f"""
-            SELECT 
-                id,
-                nombre,
-                usuario,
-                correo_electronico,
-                mae_tipo_documento_codigo,
-                documento,
-                mae_area_valor,
-                mae_cargo_valor,
-                activo,
-                bloqueado,
-                fecha_hora_crea,
-                fecha_hora_modifica
-            FROM {self.tabla_usuarios}
-            WHERE usuario = %s
-            LIMIT 1
+        return self._get_user_by_column('usuario', 'usuario', username, projection)
+
+    def _get_user_by_column(self, kind, column, value, projection=DEFAULT_PROJECTION):
         """
-        
-        results = self.execute_query(query, (username,))
-        
-        if results:
-            return self._map_savia_user_to_standard(results[0])
-        return None
+        Buscar un usuario por una columna, pasando por la caché
+        La caché guarda usuarios completos: sirve para cualquier proyección,
+        pero solo se llena con búsquedas 'full'
+        """
+        if self.cache is not None:
+            found, user = self.cache.get(kind, value)
+            if found:
+                return restrict_to_projection(user, projection)
+
+        query = select_user_sql(self.tabla_usuarios, projection, column)
+        results = self.execute_prepared(query, (value,))
+        user = self._map_savia_user_to_standard(results[0]) if results else None
+
+        if projection == 'full' and self.cache is not None:
+            self.cache.put(kind, value, user)
+        return restrict_to_projection(user, projection)
     
+    def get_users_by_documents(self, documentos, as_records=False):
+        """
+        Buscar varios usuarios por número de documento
+        (consultas WHERE documento IN (...) de hasta BULK_CHUNK_SIZE valores)
+
+        Args:
+            as_records (bool): Devolver SaviaUser en lugar de diccionarios
+                               (menos memoria para muchos usuarios)
+
+        Returns:
+            dict: Documento → usuario (los no encontrados no aparecen)
+        """
+        return self._get_users_by_column('documento', documentos, as_records)
+
+    def get_users_by_emails(self, emails, as_records=False):
+        """
+        Buscar varios usuarios por email
+
+        Returns:
+            dict: Email → usuario (los no encontrados no aparecen)
+        """
+        return self._get_users_by_column('correo_electronico', emails, as_records)
+
+    def get_users_by_usernames(self, usernames, as_records=False):
+        """
+        Buscar varios usuarios por nombre de usuario
+
+        Returns:
+            dict: Usuario → usuario (los no encontrados no aparecen)
+        """
+        return self._get_users_by_column('usuario', usernames, as_records)
+
+    def _get_users_by_column(self, column, values, as_records=False):
+        """
+        Buscar usuarios por una columna con consultas IN por bloques
+        Las claves del resultado son los valores tal como se pidieron; la
+        comparación no distingue mayúsculas ni espacios (como la collation)
+        """
+        requested, chunks = bulk_chunks(values)
+        users = {}
+
+        for chunk in chunks:
+            rows = self.execute_query(*bulk_users_sql(self.tabla_usuarios, column, chunk))
+            for key, row in match_bulk_rows(column, requested, rows, users):
+                if as_records:
+                    users[key] = SaviaUser.from_row(row)
+                else:
+                    users[key] = self._map_savia_user_to_standard(row)
+                    if self.cache is not None:
+                        self.cache.put('id', row['id'], users[key])
+
+        return users
+
     def search_users(self, search_term):
         """
         Buscar usuarios por nombre, email, documento o usuario
+        Con copia local (DB_MIRROR_PATH) la búsqueda es por prefijo y ordenada
+        por relevancia, sin consultar SAVIA
         """
-        query = f"""
-            SELECT 
-                id,
-                nombre,
-                usuario,
-                correo_electronico,
-                mae_tipo_documento_codigo,
-                documento,
-                mae_area_valor,
-                mae_cargo_valor,
-                activo
-            FROM {self.tabla_usuarios}
-            WHERE 
-                nombre LIKE %s
-                OR correo_electronico LIKE %s
-                OR documento LIKE %s
-                OR usuario LIKE %s
-            ORDER BY nombre
-            LIMIT 50
-        """
-        
-        search_pattern = f"%{search_term}%"
-        results = self.execute_query(query, (search_pattern, search_pattern, search_pattern, search_pattern))
+        if self.mirror is not None:
+            self.mirror.refresh_if_stale(self)
+            return [self._map_savia_user_to_standard(user) for user in self.mirror.search(search_term)]
+
+        results = self.execute_query(*search_users_sql(self.tabla_usuarios, search_term))
         
         return [self._map_savia_user_to_standard(user) for user in results]
     
@@ -247,104 +282,281 @@ class DatabaseHandler:
         """
         Obtener usuarios por cargo (rol)
         """
-        query = f"""
-            SELECT 
-                id,
-                nombre,
-                usuario,
-                correo_electronico,
-                documento,
-                mae_area_valor,
-                mae_cargo_valor,
-                activo
-            FROM {self.tabla_usuarios}
-            WHERE mae_cargo_valor = %s
-            ORDER BY nombre
-        """
-        
-        results = self.execute_query(query, (rol,))
+        results = self.execute_query(*users_by_role_sql(self.tabla_usuarios, rol))
         return [self._map_savia_user_to_standard(user) for user in results]
-    
+
+    def iter_users_by_role(self, rol, batch_size=None, as_records=False):
+        """
+        Recorrer usuarios por cargo (rol) sin cargarlos todos en memoria
+        """
+        return self._stream_users(*users_by_role_sql(self.tabla_usuarios, rol), batch_size=batch_size, as_records=as_records)
+
     def get_users_by_area(self, area):
         """
         Obtener usuarios por área
         """
-        query = f"""
-            SELECT 
-                id,
-                nombre,
-                usuario,
-                correo_electronico,
-                documento,
-                mae_area_valor,
-                mae_cargo_valor,
-                activo
-            FROM {self.tabla_usuarios}
-            WHERE mae_area_valor = %s
-            ORDER BY nombre
-        """
-        
-        results = self.execute_query(query, (area,))
+        results = self.execute_query(*users_by_area_sql(self.tabla_usuarios, area))
         return [self._map_savia_user_to_standard(user) for user in results]
-    
+
+    def iter_users_by_area(self, area, batch_size=None, as_records=False):
+        """
+        Recorrer usuarios por área sin cargarlos todos en memoria
+        """
+        return self._stream_users(*users_by_area_sql(self.tabla_usuarios, area), batch_size=batch_size, as_records=as_records)
+
     def get_active_users(self):
         """
         Obtener todos los usuarios activos
         """
-        query = f"""
-            SELECT 
-                id,
-                nombre,
-                usuario,
-                correo_electronico,
-                mae_tipo_documento_codigo,
-                documento,
-                mae_area_valor,
-                mae_cargo_valor
-            FROM {self.tabla_usuarios}
-            WHERE activo = 1
-            ORDER BY nombre
-        """
-        
-        results = self.execute_query(query)
+        results = self.execute_query(active_users_sql(self.tabla_usuarios))
         return [self._map_savia_user_to_standard(user) for user in results]
-    
+
+    def iter_active_users(self, batch_size=None, as_records=False):
+        """
+        Recorrer los usuarios activos sin cargarlos todos en memoria
+        """
+        return self._stream_users(active_users_sql(self.tabla_usuarios), batch_size=batch_size, as_records=as_records)
+
     def get_inactive_users(self):
         """
         Obtener todos los usuarios inactivos
         """
+        results = self.execute_query(inactive_users_sql(self.tabla_usuarios))
+        return [self._map_savia_user_to_standard(user) for user in results]
+
+    def iter_inactive_users(self, batch_size=None, as_records=False):
+        """
+        Recorrer los usuarios inactivos sin cargarlos todos en memoria
+        """
+        return self._stream_users(inactive_users_sql(self.tabla_usuarios), batch_size=batch_size, as_records=as_records)
+
+    def get_users_page(self, after_id=0, limit=None, activo=None, rol=None, area=None,
+                       as_records=False):
+        """
+        Obtener una página de usuarios ordenados por id (paginación por clave)
+        La siguiente página empieza después del id del último usuario, así
+        cada página cuesta lo mismo sin importar cuántas se hayan leído
+
+        Args:
+            after_id (int): Id del último usuario de la página anterior (0 = inicio)
+            limit (int): Usuarios por página (DB_PAGE_SIZE, 1000)
+            activo (bool): Filtrar por estado (None = todos)
+            rol (str): Filtrar por cargo
+            area (str): Filtrar por área
+            as_records (bool): Devolver SaviaUser en lugar de diccionarios
+
+        Returns:
+            list: Usuarios de la página (vacía al terminar)
+        """
+        rows = self._users_page_rows(after_id, limit, activo, rol, area)
+        if as_records:
+            return [SaviaUser.from_row(row) for row in rows]
+        return [self._map_savia_user_to_standard(row) for row in rows]
+
+    def _users_page_rows(self, after_id, limit, activo, rol, area):
+        """Filas (sin mapear) de una página por id"""
+        conditions = ["id > %s"]
+        params = [after_id]
+
+        if activo is not None:
+            conditions.append("activo = %s")
+            params.append(1 if activo else 0)
+        if rol:
+            conditions.append("mae_cargo_valor = %s")
+            params.append(rol)
+        if area:
+            conditions.append("mae_area_valor = %s")
+            params.append(area)
+        params.append(limit or PAGE_SIZE)
+
         query = f"""
-            SELECT 
-                id,
-                nombre,
-                usuario,
-                correo_electronico,
-                documento,
-                mae_area_valor,
-                mae_cargo_valor,
-                fecha_hora_modifica
+            SELECT {USER_COLUMNS}
             FROM {self.tabla_usuarios}
-            WHERE activo = 0
-            ORDER BY fecha_hora_modifica DESC
+            WHERE {' AND '.join(conditions)}
+            ORDER BY id
+            LIMIT %s
         """
-        
-        results = self.execute_query(query)
-        return [self._map_savia_user_to_standard(user) for user in results]
+
+        return self.execute_query(query, tuple(params))
+
+    def iter_users_by_id(self, page_size=None, after_id=0, activo=None, rol=None, area=None,
+                         as_records=False):
+        """
+        Recorrer toda la tabla en páginas por id (exportaciones, conciliaciones)
+        Memoria constante y sin conexiones abiertas entre páginas; se puede
+        reanudar desde el último id procesado con after_id
+        """
+        to_user = SaviaUser.from_row if as_records else self._map_savia_user_to_standard
+        for rows in self._iter_page_rows(page_size, after_id, activo, rol, area):
+            for row in rows:
+                yield to_user(row)
+
+    def iter_user_batches(self, page_size=None, after_id=0, activo=None, rol=None, area=None):
+        """
+        Recorrer toda la tabla en páginas por id, cada una como SaviaUserBatch
+        (una lista por campo): la forma más compacta para procesar por columnas
+        """
+        for rows in self._iter_page_rows(page_size, after_id, activo, rol, area):
+            yield SaviaUserBatch.from_rows(rows)
+
+    def _iter_page_rows(self, page_size, after_id, activo, rol, area):
+        while True:
+            rows = self._users_page_rows(after_id, page_size, activo, rol, area)
+            if not rows:
+                return
+            yield rows
+            after_id = rows[-1]['id']
+
+    def iter_changed_rows(self, since=None, batch_size=None):
+        """
+        Recorrer las filas modificadas después de una marca (sin mapear)
+
+        La marca es (fecha, id) de una fila: la fecha es fecha_hora_modifica (o
+        fecha_hora_crea si nunca se modificó) y el id desempata filas con la
+        misma fecha.
+
+        - Sin marca (carga inicial) lee toda la tabla en una sola consulta
+          con stream_query, SIN ORDEN: la marca para continuar es la mayor de
+          las filas leídas, y solo vale si se leyeron todas
+        - Con marca hace dos recorridos por bloques, cada uno sobre una sola
+          columna (índices en fecha_hora_modifica y fecha_hora_crea): los
+          modificados después de la marca y los creados después de ella que
+          nunca se modificaron. Se intercalan, así las filas llegan ordenadas
+          por marca
+
+        Args:
+            since (tuple): (fecha, id) de la última fila procesada; None = todas
+            batch_size (int): Filas por consulta (DB_PAGE_SIZE, 1000)
+
+        Returns:
+            generator: Filas con una columna extra 'marca'
+        """
+        if since is None:
+            marca = f"COALESCE(fecha_hora_modifica, fecha_hora_crea, CAST('{CHANGE_MARK_START}' AS DATETIME))"
+            query = f"SELECT {USER_COLUMNS}, {marca} AS marca FROM {self.tabla_usuarios}"
+            yield from self.stream_query(query)
+            return
+
+        yield from heapq.merge(
+            self._iter_rows_after(since, 'fecha_hora_modifica', batch_size),
+            self._iter_rows_after(since, 'fecha_hora_crea', batch_size,
+                                  'fecha_hora_modifica IS NULL'),
+            key=lambda row: (row['marca'], row['id'])
+        )
+
+    def _iter_rows_after(self, since, column, batch_size=None, condition=None):
+        """Filas con (column, id) después de la marca, por bloques ordenados (keyset)"""
+        fecha, last_id = since
+        batch_size = batch_size or PAGE_SIZE
+        extra = f"AND {condition}" if condition else ""
+
+        # El rango sobre la columna sola (sin OR en la condición principal) usa su índice
+        query = f"""
+            SELECT {USER_COLUMNS}, {column} AS marca
+            FROM {self.tabla_usuarios}
+            WHERE {column} >= %s
+              AND ({column} > %s OR id > %s)
+              {extra}
+            ORDER BY {column}, id
+            LIMIT %s
+        """
+
+        while True:
+            rows = self.execute_query(query, (fecha, fecha, last_id, batch_size))
+            yield from rows
+            if len(rows) < batch_size:
+                return
+            fecha, last_id = rows[-1]['marca'], rows[-1]['id']
+
+    def iter_changes(self, since=None, batch_size=None, as_records=False):
+        """
+        Recorrer los usuarios modificados después de una marca (mapeados)
+        La marca de cada usuario se obtiene con change_mark(user); sin marca
+        los usuarios no vienen ordenados (ver iter_changed_rows)
+        """
+        to_user = SaviaUser.from_row if as_records else self._map_savia_user_to_standard
+        for row in self.iter_changed_rows(since, batch_size):
+            yield to_user(row)
+
+    @staticmethod
+    def change_mark(user):
+        """
+        Marca (fecha, id) de un usuario mapeado, para continuar el recorrido
+        de iter_changes después de él
+        """
+        if isinstance(user, SaviaUser):
+            user = user.to_dict()
+        fecha = user.get('fecha_modificacion') or user.get('fecha_creacion') or CHANGE_MARK_START
+        return fecha, user['id']
+
+    def _stream_users(self, query, params=None, batch_size=None, as_records=False):
+        """Mapear al vuelo las filas de stream_query (a SaviaUser si as_records)"""
+        to_user = SaviaUser.from_row if as_records else self._map_savia_user_to_standard
+        for row in self.stream_query(query, params, batch_size):
+            yield to_user(row)
+
+    def stream_query(self, query, params=None, batch_size=None):
+        """
+        Ejecutar consulta SELECT devolviendo las filas de a poco
+        Usa un cursor sin búfer (el servidor envía las filas a medida que se
+        leen) y fetchmany por bloques. La conexión queda ocupada hasta terminar
+        de recorrer: en modo pool se toma una del pool y si no, se abre una
+        conexión aparte para no bloquear las demás consultas
+
+        Args:
+            batch_size (int): Filas por bloque (DB_STREAM_BATCH_SIZE, 500)
+        """
+        batch_size = batch_size or STREAM_BATCH_SIZE
+
+        try:
+            self.connect()
+            if self.pooled:
+                with self.pool.connection() as conn:
+                    yield from self._stream_rows(conn, query, params, batch_size)
+            else:
+                conn = self.connector(**self.config)
+                try:
+                    yield from self._stream_rows(conn, query, params, batch_size)
+                finally:
+                    conn.close()
+
+        except Error as e:
+            raise Exception(f"Error en consulta: {str(e)}")
+
+    def _stream_rows(self, connection, query, params, batch_size):
+        cursor = connection.cursor(dictionary=True, buffered=False)
+        try:
+            if params:
+                cursor.execute(query, params)
+            else:
+                cursor.execute(query)
+
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            # Si se dejó de recorrer antes del final hay que descartar el
+            # resto de filas antes de reutilizar la conexión
+            if connection.unread_result:
+                connection.consume_results()
+            cursor.close()
     
     def check_user_exists(self, numero_documento=None, email=None, username=None):
         """
         Verificar si existe un usuario por documento, email o usuario
         """
         if numero_documento:
-            user = self.get_user_by_document(numero_documento)
+            user = self.get_user_by_document(numero_documento, projection='status')
             return user is not None
         
         if email:
-            user = self.get_user_by_email(email)
+            user = self.get_user_by_email(email, projection='status')
             return user is not None
         
         if username:
-            user = self.get_user_by_username(username)
+            user = self.get_user_by_username(username, projection='status')
             return user is not None
         
         return False
@@ -353,40 +565,53 @@ class DatabaseHandler:
         """
         Obtener solo el estado de un usuario
         """
-        query = f"""
-            SELECT activo
-            FROM {self.tabla_usuarios}
-            WHERE documento = %s
-            LIMIT 1
-        """
-        
-        results = self.execute_query(query, (numero_documento,))
+        if self.cache is not None:
+            # Una sola consulta: la clave 'estado' guarda el usuario completo o solo su estado
+            found, cached = self.cache.get('estado', numero_documento)
+            if found:
+                return cached['estado'] if isinstance(cached, dict) else cached
+
+        query = select_user_sql(self.tabla_usuarios, 'status', 'documento')
+        results = self.execute_prepared(query, (numero_documento,))
         
+        status = None
         if results:
             activo = self._convert_bit_to_bool(results[0]['activo'])
-            return 'activo' if activo else 'inactivo'
-        return None
+            status = 'activo' if activo else 'inactivo'
+
+        if self.cache is not None:
+            self.cache.put('estado', numero_documento, status)
+        return status
+
+    def invalidate_user(self, numero_documento=None, email=None, username=None):
+        """
+        Descartar un usuario de la caché (llamar después de modificarlo en la
+        plataforma web, así la siguiente consulta lee el dato nuevo de MySQL)
+        """
+        if self.cache is not None:
+            self.cache.invalidate(numero_documento, email, username)
+
+    def cache_stats(self):
+        """
+        Obtener aciertos y fallos de la caché de usuarios
+
+        Returns:
+            dict | None: None si la caché está desactivada
+        """
+        if self.cache is None:
+            return None
+        return self.cache.stats()
     
     def get_statistics(self):
         """
         Obtener estadísticas generales de usuarios
         """
-        query = f"""
-            SELECT 
-                COUNT(*) as total_usuarios,
-                SUM(CASE WHEN activo = 1 THEN 1 ELSE 0 END) as usuarios_activos,
-                SUM(CASE WHEN activo = 0 THEN 1 ELSE 0 END) as usuarios_inactivos,
-                COUNT(DISTINCT mae_cargo_valor) as total_cargos,
-                COUNT(DISTINCT mae_area_valor) as total_areas
-            FROM {self.tabla_usuarios}
-        """
-        
-        results = self.execute_query(query)
+        results = self.execute_query(statistics_sql(self.tabla_usuarios))
         
         if results:
             return results[0]
         return None
-    
+
     def __del__(self):
         """Destructor - cerrar conexión al eliminar objeto"""
         self.disconnect()
@@ -404,6 +629,7 @@ if __name__ == "__main__":
     print(f"Base de datos: {db.config['database']}")
     print(f"Usuario: {db.config['user']}")
     print(f"Tabla: {db.tabla_usuarios}")
+    print(f"Pool de conexiones: {'sí' if db.pooled else 'no'}")
     
     try:
         # Obtener estadísticas
@@ -438,6 +664,12 @@ if __name__ == "__main__":
             print(f"  Área: {user.get('area')}")
             print(f"  Estado: {user.get('estado')}")
         
+        pool_stats = db.pool_stats()
+        if pool_stats:
+            print(f"\nPool: {pool_stats['checkouts']} consultas, "
+                  f"espera media {pool_stats['avg_wait_ms']:.1f} ms, "
+                  f"máxima {pool_stats['max_wait_ms']:.1f} ms")
+        
         print("\n✅ Conexión exitosa y consultas funcionando")
     
     except Exception as e:
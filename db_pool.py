@@ -0,0 +1,249 @@
+"""
+Pool de conexiones MySQL para DatabaseHandler
+Cada consulta toma su propia conexión del pool y la devuelve al terminar, así
+los hilos de la interfaz y los procesos por lotes no comparten una conexión.
+
+Las conexiones son de mysql.connector.connect y el pool las administra
+directamente (MySQLConnectionPool no tiene un cierre público):
+- Se abren a medida que hacen falta, hasta DB_POOL_SIZE
+- Espera con tiempo límite cuando todas las conexiones están en uso
+- Verificación de salud (ping) solo de las conexiones inactivas por más de
+  DB_POOL_HEALTH_CHECK segundos, en lugar de una ida y vuelta por consulta
+- Las conexiones cuya consulta lanzó un error se cierran en lugar de volver
+  al pool (pueden haber quedado rotas y el ping no las revisaría)
+- Aviso (on_reconnect) cuando una conexión se reconecta, para descartar lo que
+  dependía de la conexión anterior (sentencias preparadas)
+- Métricas de tiempo de espera y conexiones activas
+
+Configuración (.env):
+    DB_POOL_SIZE=5              # Conexiones del pool
+    DB_POOL_HEALTH_CHECK=30     # Segundos de inactividad antes de hacer ping
+    DB_POOL_TIMEOUT=10          # Segundos máximos esperando una conexión libre
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import mysql.connector
+from mysql.connector import Error
+
+
+def mysql_config():
+    """
+    Parámetros de conexión a SAVIA del .env (los mismos para el pool y aiomysql)
+
+    Con autocommit cada consulta es su propia transacción: una conexión que
+    vive mucho tiempo (pool, conexión única, tablero de estadísticas) ve los
+    cambios de otras sesiones en lugar de la instantánea REPEATABLE READ de
+    su primer SELECT.
+    """
+    return {
+        'host': os.getenv('DB_HOST', 'localhost'),
+        'port': int(os.getenv('DB_PORT', 3306)),
+        'database': os.getenv('DB_NAME', 'system_savia'),
+        'user': os.getenv('DB_USER', 'root'),
+        'password': os.getenv('DB_PASSWORD', ''),
+        'charset': 'utf8mb4',
+        'collation': 'utf8mb4_unicode_ci',
+        'autocommit': True
+    }
+
+
+class ConnectionPool:
+    def __init__(self, config, pool_size=None, health_check_interval=None, checkout_timeout=None,
+                 on_reconnect=None, connector=None):
+        """
+        Crear el pool (las conexiones se abren con el primer uso)
+
+        Args:
+            config (dict): Parámetros de mysql.connector.connect
+            pool_size (int): Número de conexiones (DB_POOL_SIZE, 5)
+            health_check_interval (float): Segundos de inactividad antes de
+                                           verificar la conexión (DB_POOL_HEALTH_CHECK, 30)
+            checkout_timeout (float): Segundos máximos de espera (DB_POOL_TIMEOUT, 10)
+            on_reconnect (callable): Se llama con el id de conexión anterior cuando
+                                     una conexión se reconecta o se cierra
+            connector (callable): Abre una conexión con config
+                                  (mysql.connector.connect por defecto)
+        """
+        if pool_size is None:
+            pool_size = int(os.getenv('DB_POOL_SIZE', 5))
+        if health_check_interval is None:
+            health_check_interval = float(os.getenv('DB_POOL_HEALTH_CHECK', 30))
+        if checkout_timeout is None:
+            checkout_timeout = float(os.getenv('DB_POOL_TIMEOUT', 10))
+
+        self.config = config
+        self.pool_size = pool_size
+        self.health_check_interval = health_check_interval
+        self.checkout_timeout = checkout_timeout
+        self.on_reconnect = on_reconnect
+        self.connector = connector or mysql.connector.connect
+
+        # Conexiones libres (la última devuelta sale primero) y todas las abiertas.
+        # Sin reinicio de sesión al devolverlas (descartaría las sentencias
+        # preparadas): las conexiones usan autocommit (mysql_config), así que
+        # no queda ninguna transacción abierta con una instantánea vieja
+        self.idle = deque()
+        self.connections = set()
+        self.closed = False
+        self.available = threading.BoundedSemaphore(pool_size)
+        self.lock = threading.Lock()
+
+        # Última vez que se usó cada conexión
+        self.last_used = {}
+
+        # Métricas
+        self.checkouts = 0
+        self.timeouts = 0
+        self.health_checks = 0
+        self.reconnects = 0
+        self.discarded = 0
+        self.active = 0
+        self.peak_active = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def _checkout(self):
+        """Tomar una conexión libre, esperando hasta checkout_timeout"""
+        start = time.perf_counter()
+        if not self.available.acquire(timeout=self.checkout_timeout):
+            with self.lock:
+                self.timeouts += 1
+            raise Error(
+                msg=f"No hay conexiones libres en el pool tras {self.checkout_timeout:.0f} s"
+            )
+        wait = time.perf_counter() - start
+
+        try:
+            conn = self._take_connection()
+        except Exception:
+            self.available.release()
+            raise
+
+        with self.lock:
+            self.checkouts += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+            self.active += 1
+            self.peak_active = max(self.peak_active, self.active)
+
+        return conn
+
+    def _take_connection(self):
+        """Una conexión libre verificada, o una nueva si no hay libres"""
+        with self.lock:
+            conn = self.idle.pop() if self.idle else None
+
+        if conn is None:
+            conn = self.connector(**self.config)
+            with self.lock:
+                self.connections.add(conn)
+            return conn
+
+        try:
+            self._health_check(conn)
+        except Exception:
+            self._discard(conn)
+            raise
+        return conn
+
+    def _health_check(self, conn):
+        """Hacer ping solo si la conexión lleva inactiva más del intervalo"""
+        last_used = self.last_used.get(conn)
+        if last_used is not None and time.monotonic() - last_used < self.health_check_interval:
+            return
+
+        with self.lock:
+            self.health_checks += 1
+        try:
+            conn.ping(reconnect=False)
+        except Error:
+            previous_id = conn.connection_id
+            conn.ping(reconnect=True, attempts=2, delay=0)
+            with self.lock:
+                self.reconnects += 1
+            if self.on_reconnect is not None:
+                self.on_reconnect(previous_id)
+
+    def _discard(self, conn):
+        """Cerrar una conexión y sacarla del pool"""
+        with self.lock:
+            self.connections.discard(conn)
+            self.last_used.pop(conn, None)
+        if self.on_reconnect is not None:
+            self.on_reconnect(conn.connection_id)
+        try:
+            conn.close()
+        except Error:
+            pass
+
+    def _release(self, conn, failed=False):
+        """
+        Devolver la conexión al pool
+
+        Args:
+            failed (bool): La consulta lanzó un error: la conexión se cierra
+        """
+        try:
+            if failed:
+                with self.lock:
+                    self.discarded += 1
+                self._discard(conn)
+            elif self.closed:
+                self._discard(conn)
+            else:
+                with self.lock:
+                    self.last_used[conn] = time.monotonic()
+                    self.idle.append(conn)
+        finally:
+            with self.lock:
+                self.active -= 1
+            self.available.release()
+
+    @contextmanager
+    def connection(self):
+        """
+        Conexión del pool para una consulta
+
+        with pool.connection() as conn:
+            cursor = conn.cursor(dictionary=True)
+        """
+        conn = self._checkout()
+        failed = False
+        try:
+            yield conn
+        except Exception:
+            failed = True
+            raise
+        finally:
+            self._release(conn, failed)
+
+    def stats(self):
+        """Obtener métricas de espera y uso del pool"""
+        with self.lock:
+            return {
+                'pool_size': self.pool_size,
+                'open_connections': len(self.connections),
+                'active_connections': self.active,
+                'peak_active_connections': self.peak_active,
+                'checkouts': self.checkouts,
+                'timeouts': self.timeouts,
+                'avg_wait_ms': 1000 * self.total_wait / self.checkouts if self.checkouts else 0.0,
+                'max_wait_ms': 1000 * self.max_wait,
+                'health_checks': self.health_checks,
+                'reconnects': self.reconnects,
+                'discarded': self.discarded
+            }
+
+    def close(self):
+        """Cerrar las conexiones libres del pool (las que están en uso se cierran al devolverse)"""
+        with self.lock:
+            self.closed = True
+            idle = list(self.idle)
+            self.idle.clear()
+        for conn in idle:
+            self._discard(conn)
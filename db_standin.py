@@ -0,0 +1,283 @@
+"""
+Réplica de gn_usuarios para probar los handlers sin la BD del .env
+- StandinPool: pool con la interfaz de aiomysql (acquire, cursor, execute,
+  fetchall, close, wait_closed, size, freesize) sobre una base SQLite en
+  memoria, con latencia configurable por consulta (AsyncDatabaseHandler)
+- StandinDatabase: base SQLite en un archivo temporal con conexiones de la
+  interfaz de mysql.connector (DatabaseHandler y ConnectionPool). Como MySQL
+  con REPEATABLE READ, una conexión sin autocommit ve la instantánea de su
+  primer SELECT hasta commit o rollback; update() cambia filas desde otra
+  sesión, como lo haría la plataforma web
+
+Las consultas de user_queries.py son SQL estándar: solo cambia el placeholder
+(%s de aiomysql y mysql.connector → ? de SQLite).
+
+Uso:
+    pool = StandinPool(users=200, latency=0.01)
+    db = AsyncDatabaseHandler(cache=False, pool=pool)
+
+    database = StandinDatabase(users=50)
+    db = DatabaseHandler(cache=False, mirror=False, connector=database.connect)
+    database.update(documento, activo=0)
+"""
+
+import asyncio
+import itertools
+import os
+import shutil
+import sqlite3
+import tempfile
+from datetime import datetime, timedelta
+
+from user_queries import PROJECTIONS
+
+COLUMNS = PROJECTIONS['full']
+
+CARGOS = ['Analista', 'Auxiliar administrativo', 'Coordinador', 'Médico auditor', 'Administrador']
+AREAS = ['Autorizaciones', 'Cuentas médicas', 'Sistemas', None]
+NOMBRES = ['JUAN', 'MARIA', 'ANDRES', 'LUISA', 'CARLOS', 'ANA', 'PEDRO', 'SOFIA']
+APELLIDOS = ['PEREZ', 'GOMEZ', 'RODRIGUEZ', 'TORRES', 'RAMIREZ', 'CASTRO', 'ROJAS']
+
+
+def make_users(count):
+    """Usuarios de prueba (siempre los mismos para la misma cantidad)"""
+    start = datetime(2024, 1, 1)
+    users = []
+    for index in range(count):
+        nombre = f"{NOMBRES[index % len(NOMBRES)]} {APELLIDOS[index % len(APELLIDOS)]}"
+        usuario = f"usuario{index + 1}"
+        users.append({
+            'id': index + 1,
+            'gn_empresas_id': 1,
+            'au_grupos_id': index % 3 + 1,
+            'nombre': nombre,
+            'usuario': usuario,
+            'correo_electronico': f"{usuario}@savia.test",
+            'mae_tipo_documento_codigo': 'CC',
+            'documento': str(1_000_001 + index),
+            'mae_area_valor': AREAS[index % len(AREAS)],
+            'mae_cargo_valor': CARGOS[index % len(CARGOS)],
+            'telefono': None,
+            'celular': f"300{index:07d}",
+            'activo': 0 if index % 4 == 3 else 1,
+            'bloqueado': 0,
+            'fecha_ultimo_ingreso': None,
+            'fecha_hora_crea': start + timedelta(days=index),
+            'fecha_hora_modifica': start + timedelta(days=index, hours=1) if index % 2 else None,
+        })
+    return users
+
+
+def _column_sql(column):
+    if column == 'id':
+        return 'id INTEGER PRIMARY KEY'
+    if column.startswith('fecha'):
+        return f'{column} TIMESTAMP'
+    return column
+
+
+def _create_table(conn, users):
+    """Crear gn_usuarios con los usuarios de prueba"""
+    conn.execute(f"CREATE TABLE gn_usuarios ({', '.join(_column_sql(c) for c in COLUMNS)})")
+    conn.executemany(
+        f"INSERT INTO gn_usuarios ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})",
+        [tuple(user[column] for column in COLUMNS) for user in users]
+    )
+    conn.commit()
+
+
+class _Cursor:
+    def __init__(self, pool):
+        self.pool = pool
+        self.rows = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+    async def execute(self, query, params=None):
+        await asyncio.sleep(self.pool.latency)
+        self.rows = self.pool.run(query.replace('%s', '?'), params or ())
+
+    async def fetchall(self):
+        return self.rows
+
+
+class _Connection:
+    def __init__(self, pool):
+        self.pool = pool
+
+    def cursor(self, cursor_class=None):
+        # Las filas siempre son diccionarios (como aiomysql.DictCursor)
+        return _Cursor(self.pool)
+
+
+class _Acquire:
+    def __init__(self, pool):
+        self.pool = pool
+
+    async def __aenter__(self):
+        await self.pool.semaphore.acquire()
+        self.pool.active += 1
+        self.pool.max_active = max(self.pool.max_active, self.pool.active)
+        return _Connection(self.pool)
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.pool.active -= 1
+        self.pool.semaphore.release()
+        return False
+
+
+class StandinPool:
+    def __init__(self, users=100, latency=0.005, maxsize=5):
+        """
+        Args:
+            users (int): Usuarios de prueba (make_users)
+            latency (float): Segundos de espera por consulta (simula la red)
+            maxsize (int): Conexiones a la vez, como el pool de aiomysql
+        """
+        self.users = make_users(users)
+        self.latency = latency
+        self.maxsize = maxsize
+        self.semaphore = asyncio.Semaphore(maxsize)
+        self.closed = False
+
+        self.conn = sqlite3.connect(':memory:', detect_types=sqlite3.PARSE_DECLTYPES)
+        self.conn.row_factory = sqlite3.Row
+        _create_table(self.conn, self.users)
+
+        # Contadores
+        self.queries = 0
+        self.active = 0
+        self.max_active = 0
+
+    def run(self, query, params):
+        if self.closed:
+            raise Exception("La réplica está cerrada")
+        self.queries += 1
+        return [dict(row) for row in self.conn.execute(query, tuple(params))]
+
+    def acquire(self):
+        return _Acquire(self)
+
+    @property
+    def size(self):
+        return self.maxsize
+
+    @property
+    def freesize(self):
+        return self.maxsize - self.active
+
+    def close(self):
+        self.closed = True
+
+    async def wait_closed(self):
+        self.conn.close()
+
+
+class _SyncCursor:
+    def __init__(self, conn, prepared):
+        self.conn = conn
+        self.prepared = prepared
+        self.rows = []
+
+    def execute(self, query, params=None):
+        if not self.prepared:
+            query = query.replace('%s', '?')
+        self.rows = self.conn.run(query, params or ())
+
+    def fetchall(self):
+        rows, self.rows = self.rows, []
+        return rows
+
+    def fetchmany(self, size=1):
+        rows, self.rows = self.rows[:size], self.rows[size:]
+        return rows
+
+    def close(self):
+        self.rows = []
+
+
+class StandinConnection:
+    """Conexión con la interfaz de mysql.connector sobre StandinDatabase"""
+
+    def __init__(self, database, connection_id, autocommit=False):
+        self.database = database
+        self.connection_id = connection_id
+        self.autocommit = autocommit
+        self.unread_result = False
+        self.conn = sqlite3.connect(database.path, isolation_level=None, check_same_thread=False,
+                                    detect_types=sqlite3.PARSE_DECLTYPES)
+        self.conn.row_factory = sqlite3.Row
+        self.open = True
+
+    def run(self, query, params):
+        # Sin autocommit la primera lectura abre una transacción y fija la
+        # instantánea (modo WAL), como REPEATABLE READ en MySQL
+        if not self.autocommit and not self.conn.in_transaction:
+            self.conn.execute('BEGIN')
+        self.database.queries += 1
+        return [dict(row) for row in self.conn.execute(query, tuple(params))]
+
+    def cursor(self, dictionary=False, prepared=False, buffered=None):
+        return _SyncCursor(self, prepared)
+
+    def commit(self):
+        if self.conn.in_transaction:
+            self.conn.execute('COMMIT')
+
+    def rollback(self):
+        if self.conn.in_transaction:
+            self.conn.execute('ROLLBACK')
+
+    def is_connected(self):
+        return self.open
+
+    def ping(self, reconnect=False, attempts=1, delay=0):
+        pass
+
+    def consume_results(self):
+        pass
+
+    def close(self):
+        if self.open:
+            self.open = False
+            self.conn.close()
+
+
+class StandinDatabase:
+    def __init__(self, users=100):
+        """
+        Args:
+            users (int): Usuarios de prueba (make_users)
+        """
+        self.users = make_users(users)
+        self.directory = tempfile.mkdtemp(prefix='savia_standin_')
+        self.path = os.path.join(self.directory, 'gn_usuarios.db')
+        self.ids = itertools.count(1)
+        self.queries = 0
+
+        conn = sqlite3.connect(self.path)
+        conn.execute('PRAGMA journal_mode=WAL')
+        _create_table(conn, self.users)
+        conn.close()
+
+    def connect(self, **config):
+        """Abrir una conexión (acepta los parámetros de mysql_config; usa autocommit)"""
+        return StandinConnection(self, next(self.ids), config.get('autocommit', False))
+
+    def update(self, documento, **values):
+        """Cambiar columnas de un usuario desde otra sesión (con commit)"""
+        conn = sqlite3.connect(self.path)
+        with conn:
+            conn.execute(
+                f"UPDATE gn_usuarios SET {', '.join(f'{column} = ?' for column in values)} "
+                "WHERE documento = ?",
+                (*values.values(), documento)
+            )
+        conn.close()
+
+    def close(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
@@ -0,0 +1,389 @@
+"""
+Extractor de campos de usuario a partir del texto OCR
+Todos los patrones se compilan una sola vez al importar el módulo y el texto
+se recorre una sola vez con una expresión maestra que localiza las etiquetas
+de los seis campos. Los patrones sin etiqueta (correo, códigos de documento,
+palabras clave) solo se buscan si el campo no apareció con etiqueta. Los roles
+y áreas comunes se reconocen con un autómata Aho-Corasick en lugar de buscar
+cada valor por separado.
+
+Da los mismos resultados que el extractor anterior (un método por campo con
+re.search), salvo estos cambios deliberados (comprobados en
+benchmark_extractor.py):
+- D1: el nombre con etiqueta o tratamiento no continúa en la línea siguiente
+- D2: el nombre sin etiqueta es una línea completa de palabras capitalizadas
+  (no un encabezado en mayúsculas)
+- D3: el área "TI" solo se reconoce como palabra completa (no dentro de
+  "Gestión" o "Logística")
+- D4: la etiqueta "no" del número no se busca dentro de otra palabra
+  ("Teléfono")
+"""
+
+import re
+from collections import deque
+from functools import lru_cache
+
+# ============================================
+# DATOS DE REFERENCIA
+# ============================================
+# Normalización de tipos de documento
+DOC_TYPE_MAPPING = {
+    'CEDULA': 'CC',
+    'CÉDULA': 'CC',
+    'CEDULA DE CIUDADANIA': 'CC',
+    'CÉDULA DE CIUDADANÍA': 'CC',
+    'PASAPORTE': 'PA',
+    'TARJETA DE IDENTIDAD': 'TI',
+}
+
+# Roles comunes (en orden de preferencia)
+COMMON_ROLES = [
+    'Administrador', 'Usuario', 'Operador', 'Supervisor',
+    'Gerente', 'Analista', 'Desarrollador', 'Coordinador',
+    'Asistente', 'Director', 'Jefe', 'Líder', 'Especialista'
+]
+
+# Áreas comunes (en orden de preferencia)
+COMMON_AREAS = [
+    'Ventas', 'Marketing', 'TI', 'Sistemas', 'Tecnología',
+    'RRHH', 'Recursos Humanos', 'Finanzas', 'Contabilidad',
+    'Operaciones', 'Logística', 'Producción', 'Administración',
+    'Legal', 'Compras', 'Soporte'
+]
+
+# Palabras que por sí solas indican un rol o un área aunque no haya etiqueta
+ROLE_KEYWORDS = [
+    'administrador', 'usuario', 'operador', 'supervisor',
+    'gerente', 'analista', 'desarrollador'
+]
+AREA_KEYWORDS = [
+    'Ventas', 'Marketing', 'TI', 'Sistemas', 'RRHH',
+    'Finanzas', 'Operaciones', 'Logística', 'Contabilidad'
+]
+
+DOC_CODES = ['CC', 'CE', 'TI', 'PA', 'DNI', 'RUC', 'NIT']
+
+_EMAIL = r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}'
+EMAIL_PATTERN = r'\b(' + _EMAIL + r')\b'
+
+FIELDS = [
+    'tipo_documento',
+    'numero_documento',
+    'nombre_completo',
+    'email',
+    'rol',
+    'area'
+]
+
+# ============================================
+# PATRONES COMPILADOS
+# ============================================
+# Palabras del nombre separadas por espacios o tabuladores, sin saltar de línea (D1)
+_NAME = r'[A-ZÁÉÍÓÚÑ][a-záéíóúñ]+(?:[ \t]+[A-ZÁÉÍÓÚÑ][a-záéíóúñ]+)+'
+_TEXT_VALUE = r'[A-Za-záéíóúñÁÉÍÓÚÑ\s]+?'
+
+
+# Valores de hasta dos letras ("TI") solo cuentan como palabra completa (D3)
+SHORT_WORD = 2
+
+
+def _alternation(words):
+    # Las palabras más largas primero para que ganen sobre sus prefijos
+    return '|'.join(
+        rf'\b{re.escape(word)}\b' if len(word) <= SHORT_WORD else re.escape(word)
+        for word in sorted(words, key=len, reverse=True)
+    )
+
+
+# Expresión maestra de etiquetas: cada alternativa es un grupo con nombre que
+# indica qué etiqueta se encontró. Se aplica al texto en minúsculas (más
+# rápido que IGNORECASE) y el valor se lee después en el texto original con
+# un patrón anclado al final de la etiqueta. Todo va dentro de un lookahead
+# para probar cada posición aunque caiga dentro de otra etiqueta
+# ("numerol" → "rol"); el primer lookahead (primeras letras de las
+# etiquetas) descarta rápido las demás posiciones. Como en el extractor
+# anterior, las etiquetas se reconocen también pegadas a otras palabras
+# ("número12345678"), salvo "no" (D4).
+LABEL_PATTERN = re.compile(
+    r'(?=[tndc\#psraá])(?='
+    r'(?P<tipo>tipo)'
+    r'|(?P<nombre>nombre)'
+    r'|(?P<documento>documento)'
+    r'|(?P<numero>n[úu]mero|n°|(?<!\w)no\.?|\#)'
+    r'|(?P<doc_palabra>c[ée]dula|pasaporte|tarjeta)'
+    r'|(?P<tratamiento>(?:srta|sra|sr)\.)'
+    r'|(?P<rol>rol|perfil|cargo|puesto)'
+    r'|(?P<area>[áa]rea|departamento|dpto\.?)'
+    r')'
+)
+
+# Patrones sin etiqueta: solo se buscan si el campo no apareció con etiqueta
+DOC_CODE_REGEX = re.compile(r'\b(' + '|'.join(DOC_CODES) + r')\b', re.IGNORECASE)
+LONG_NUMBER_REGEX = re.compile(r'\b([0-9]{8,12})\b')
+ROLE_WORD_REGEX = re.compile(_alternation(ROLE_KEYWORDS), re.IGNORECASE)
+AREA_WORD_REGEX = re.compile(_alternation(AREA_KEYWORDS), re.IGNORECASE)
+
+# Valores que siguen a cada etiqueta (se aplican con .match en la posición)
+TIPO_VALUE = re.compile(r'\s*(?:de\s*)?documento[:\s]*([A-Z]{2,4})', re.IGNORECASE)
+NUMBER_VALUE = re.compile(r'[:\s]*([0-9]{6,15})')
+DOC_WORD_VALUE = re.compile(r'[:\s]*([A-Za-z\s]+)', re.IGNORECASE)
+NAME_VALUE = re.compile(r'\s*(?:completo)?[:\s]*(' + _NAME + r')', re.IGNORECASE)
+HONORIFIC_VALUE = re.compile(r'\s+(' + _NAME + r')', re.IGNORECASE)
+ROLE_VALUE = re.compile(r'[:\s]*(' + _TEXT_VALUE + r')(?:\n|$|Área|Area)', re.IGNORECASE)
+AREA_VALUE = re.compile(r'[:\s]*(' + _TEXT_VALUE + r')(?:\n|$)', re.IGNORECASE)
+
+# Último recurso para el nombre: línea formada solo por 3 a 5 palabras
+# capitalizadas (sin IGNORECASE, para no tomar encabezados en mayúsculas; D2)
+NAME_LINE = re.compile(
+    r'^([A-ZÁÉÍÓÚÑ][a-záéíóúñ]+(?:[ \t]+[A-ZÁÉÍÓÚÑ][a-záéíóúñ]+){2,4})[ \t]*$',
+    re.MULTILINE
+)
+
+EMAIL_REGEX = re.compile(EMAIL_PATTERN)
+
+
+# ============================================
+# AHO-CORASICK
+# ============================================
+def _is_word_char(char):
+    # Igual que \w en las expresiones regulares
+    return char.isalnum() or char == '_'
+
+
+class KeywordMatcher:
+    """
+    Autómata Aho-Corasick sobre una lista de valores canónicos
+    Encuentra en una sola pasada todos los valores que aparecen dentro de un
+    texto (sin distinguir mayúsculas, como subcadena; los de hasta SHORT_WORD
+    letras solo como palabra completa)
+    """
+
+    def __init__(self, values):
+        self.values = list(values)
+        # Nodo: transiciones, enlace de fallo, salidas (índices de valores)
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [[]]
+
+        for index, value in enumerate(self.values):
+            node = 0
+            for char in value.lower():
+                if char not in self.goto[node]:
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append([])
+                    self.goto[node][char] = len(self.goto) - 1
+                node = self.goto[node][char]
+            self.output[node].append(index)
+
+        # Enlaces de fallo por recorrido en anchura
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self.goto[node].items():
+                queue.append(child)
+                fallback = self.fail[node]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(char, 0)
+                self.output[child] = self.output[child] + self.output[self.fail[child]]
+
+    def find_all(self, text):
+        """
+        Buscar valores en el texto
+
+        Returns:
+            list: Índices (en la lista de valores) encontrados
+        """
+        lowered = text.lower()
+        found = []
+        node = 0
+
+        for position, char in enumerate(lowered):
+            while node and char not in self.goto[node]:
+                node = self.fail[node]
+            node = self.goto[node].get(char, 0)
+
+            for index in self.output[node]:
+                length = len(self.values[index])
+                start = position - length + 1
+                end = position + 1
+                if length > SHORT_WORD or (
+                        (start == 0 or not _is_word_char(lowered[start - 1])) and
+                        (end == len(lowered) or not _is_word_char(lowered[end]))):
+                    found.append(index)
+
+        return found
+
+    def canonical(self, text):
+        """
+        Valor canónico presente en el texto (el primero según el orden de la lista)
+
+        Returns:
+            str | None
+        """
+        found = self.find_all(text)
+        return self.values[min(found)] if found else None
+
+
+ROLE_MATCHER = KeywordMatcher(COMMON_ROLES)
+AREA_MATCHER = KeywordMatcher(COMMON_AREAS)
+
+# Palabra clave (minúsculas) → valor canónico
+_ROLE_BY_KEYWORD = {keyword.lower(): ROLE_MATCHER.canonical(keyword) for keyword in ROLE_KEYWORDS}
+_AREA_BY_KEYWORD = {keyword.lower(): AREA_MATCHER.canonical(keyword) for keyword in AREA_KEYWORDS}
+
+
+def normalize_doc_type(text):
+    """Normalizar tipo de documento (ej: 'Cédula de ciudadanía' → 'CC')"""
+    doc_type = ' '.join(text.split()).upper()
+    return DOC_TYPE_MAPPING.get(doc_type, doc_type)
+
+
+@lru_cache(maxsize=1024)
+def normalize_role(text):
+    """Rol común presente en el texto o el texto en formato título"""
+    text = text.strip()
+    return ROLE_MATCHER.canonical(text) or text.title()
+
+
+@lru_cache(maxsize=1024)
+def normalize_area(text):
+    """Área común presente en el texto o el texto en formato título"""
+    text = text.strip()
+    return AREA_MATCHER.canonical(text) or text.title()
+
+
+# ============================================
+# EXTRACCIÓN
+# ============================================
+# Lectores del valor que sigue a cada etiqueta.
+# Devuelven None si el patrón completo no coincide en esta posición, o una
+# tupla (valor,) con el valor del campo. Como en el extractor anterior, la
+# primera coincidencia decide el campo aunque el valor quede vacío.
+def _read_tipo(text, end):
+    value = TIPO_VALUE.match(text, end)
+    return (normalize_doc_type(value.group(1)),) if value else None
+
+
+def _read_doc_palabra(text, end):
+    value = DOC_WORD_VALUE.match(text, end)
+    if not value:
+        return None
+    doc_type = value.group(1).strip().upper()
+    return (DOC_TYPE_MAPPING.get(doc_type, doc_type),)
+
+
+def _read_value(pattern, normalize):
+    def reader(text, end):
+        value = pattern.match(text, end)
+        return (normalize(value.group(1)),) if value else None
+    return reader
+
+
+# Etiqueta → lector de su valor
+_LABEL_READERS = {
+    'tipo': _read_tipo,
+    'doc_palabra': _read_doc_palabra,
+    'numero': _read_value(NUMBER_VALUE, str),
+    'documento': _read_value(NUMBER_VALUE, str),
+    'nombre': _read_value(NAME_VALUE, str.title),
+    'tratamiento': _read_value(HONORIFIC_VALUE, str.title),
+    'rol': _read_value(ROLE_VALUE, normalize_role),
+    'area': _read_value(AREA_VALUE, normalize_area),
+}
+
+
+# Búsquedas sin etiqueta (se ejecutan solo si hacen falta)
+def _search_doc_code(text):
+    match = DOC_CODE_REGEX.search(text)
+    return match.group(1).upper() if match else None
+
+
+def _search_long_number(text):
+    match = LONG_NUMBER_REGEX.search(text)
+    return match.group(1) if match else None
+
+
+def _search_email(text):
+    if '@' not in text:
+        return None
+    match = EMAIL_REGEX.search(text)
+    return match.group(1).lower() if match else None
+
+
+def _search_role_word(text):
+    match = ROLE_WORD_REGEX.search(text)
+    return _ROLE_BY_KEYWORD[match.group(0).lower()] if match else None
+
+
+def _search_area_word(text):
+    match = AREA_WORD_REGEX.search(text)
+    return _AREA_BY_KEYWORD[match.group(0).lower()] if match else None
+
+
+def _search_name_line(text):
+    match = NAME_LINE.search(text)
+    return match.group(1).strip().title() if match else None
+
+
+# Fuentes de cada campo en orden de prioridad (el mismo orden de patrones
+# del extractor original). Un nombre es una etiqueta de LABEL_PATTERN; una
+# función es una búsqueda sin etiqueta.
+FIELD_SOURCES = {
+    'tipo_documento': ['tipo', _search_doc_code, 'doc_palabra'],
+    'numero_documento': ['numero', 'documento', _search_long_number],
+    'nombre_completo': ['nombre', 'tratamiento', _search_name_line],
+    'email': [_search_email],
+    'rol': ['rol', _search_role_word],
+    'area': ['area', _search_area_word],
+}
+
+# Etiquetas de máxima prioridad: encontradas todas, no hace falta seguir
+_TOP_LABELS = {
+    sources[0] for sources in FIELD_SOURCES.values() if isinstance(sources[0], str)
+}
+
+
+def extract_fields(text):
+    """
+    Extraer los seis campos del texto OCR en una sola pasada
+
+    Returns:
+        dict: tipo_documento, numero_documento, nombre_completo, email, rol, area
+    """
+    text = text.strip()
+    lowered = text.lower()
+    if len(lowered) != len(text):
+        # Algún carácter cambia de longitud en minúsculas: conservar posiciones
+        lowered = ''.join(char.lower() if len(char.lower()) == 1 else char for char in text)
+
+    # Etiqueta → valor de su primera coincidencia (como re.search)
+    labels = {}
+    pending = len(_TOP_LABELS)
+
+    for match in LABEL_PATTERN.finditer(lowered):
+        kind = match.lastgroup
+        if kind in labels:
+            continue
+
+        result = _LABEL_READERS[kind](text, match.end(kind))
+        if result is None:
+            continue
+
+        labels[kind] = result[0]
+        if kind in _TOP_LABELS:
+            pending -= 1
+            if not pending:
+                break
+
+    user_data = {}
+    for field, sources in FIELD_SOURCES.items():
+        user_data[field] = ''
+        for source in sources:
+            value = labels.get(source) if isinstance(source, str) else source(text)
+            if value is not None:
+                user_data[field] = value
+                break
+
+    return user_data
@@ -0,0 +1,195 @@
+"""
+Plantillas de formularios para OCR por regiones
+Cada plantilla describe un formato de formulario conocido: una zona ancla que
+lo identifica y la caja de cada campo. Así solo se procesa con Tesseract la
+zona de cada dato, con el modo PSM y la lista de caracteres adecuados.
+
+Las plantillas se cargan de archivos JSON en la carpeta OCR_TEMPLATES_DIR
+(por defecto `plantillas_formularios/`). Las cajas son relativas al tamaño de
+la imagen ([x0, y0, x1, y1] entre 0 y 1), así sirven a cualquier resolución:
+
+{
+    "name": "formulario_usuario",
+    "aspect_ratio": 2.067,
+    "anchor": {"box": [0.03, 0.06, 0.60, 0.17], "text": "FORMULARIO DE USUARIO"},
+    "fields": {
+        "numero_documento": {"box": [0.44, 0.20, 0.97, 0.29]},
+        "rol": {"box": [0.44, 0.55, 0.97, 0.64], "psm": 7}
+    }
+}
+"""
+
+import glob
+import hashlib
+import json
+import os
+import unicodedata
+
+# Carpeta de plantillas por defecto (junto a este módulo)
+DEFAULT_TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'plantillas_formularios')
+
+# Tolerancia relativa al comparar la proporción ancho/alto de la imagen
+ASPECT_RATIO_TOLERANCE = 0.05
+
+# Margen (fracción del tamaño de la caja) añadido al recortar cada campo
+BOX_PADDING = 0.05
+
+UPPERCASE = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+DIGITS = '0123456789'
+
+# Modo PSM y caracteres permitidos por defecto para cada campo
+# (psm 7 = una línea de texto, psm 8 = una palabra)
+FIELD_DEFAULTS = {
+    'tipo_documento': {'psm': 8, 'whitelist': UPPERCASE},
+    'numero_documento': {'psm': 7, 'whitelist': DIGITS},
+    'nombre_completo': {'psm': 7, 'whitelist': None},
+    'email': {'psm': 7, 'whitelist': UPPERCASE + UPPERCASE.lower() + DIGITS + '@._-+'},
+    'rol': {'psm': 7, 'whitelist': None},
+    'area': {'psm': 7, 'whitelist': None},
+}
+
+
+def normalize_text(text):
+    """Pasar a mayúsculas sin tildes y con espacios simples"""
+    text = unicodedata.normalize('NFKD', text)
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return ' '.join(text.upper().split())
+
+
+def crop_box(image, box, padding=BOX_PADDING):
+    """
+    Recortar una caja relativa de una imagen (array de numpy)
+
+    Args:
+        image (numpy.ndarray): Imagen completa
+        box (list): [x0, y0, x1, y1] entre 0 y 1
+        padding (float): Margen adicional relativo al tamaño de la caja
+    """
+    height, width = image.shape[:2]
+    x0, y0, x1, y1 = box
+    pad_x = (x1 - x0) * padding
+    pad_y = (y1 - y0) * padding
+
+    left = max(0, int((x0 - pad_x) * width))
+    top = max(0, int((y0 - pad_y) * height))
+    right = min(width, int((x1 + pad_x) * width))
+    bottom = min(height, int((y1 + pad_y) * height))
+
+    return image[top:bottom, left:right]
+
+
+class FormTemplate:
+    def __init__(self, name, fields, anchor=None, aspect_ratio=None):
+        """
+        Args:
+            name (str): Nombre de la plantilla
+            fields (dict): Campo → {'box': [...], 'psm': int, 'whitelist': str}
+            anchor (dict): {'box': [...], 'text': str} zona que identifica el formato
+            aspect_ratio (float): Proporción ancho/alto esperada de la imagen
+        """
+        unknown = set(fields) - set(FIELD_DEFAULTS)
+        if unknown:
+            raise ValueError(f"Plantilla {name}: campos desconocidos {', '.join(sorted(unknown))}")
+
+        self.name = name
+        self.anchor = anchor
+        self.aspect_ratio = aspect_ratio
+        self.fields = {}
+
+        for field, spec in fields.items():
+            merged = dict(FIELD_DEFAULTS[field])
+            merged.update(spec)
+            if 'box' not in merged:
+                raise ValueError(f"Plantilla {name}: el campo {field} no tiene caja")
+            self.fields[field] = merged
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            name=data['name'],
+            fields=data['fields'],
+            anchor=data.get('anchor'),
+            aspect_ratio=data.get('aspect_ratio')
+        )
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'aspect_ratio': self.aspect_ratio,
+            'anchor': self.anchor,
+            'fields': self.fields
+        }
+
+    def matches_shape(self, image):
+        """Comprobar que la proporción de la imagen corresponde a la plantilla"""
+        if not self.aspect_ratio:
+            return True
+        height, width = image.shape[:2]
+        ratio = width / height
+        return abs(ratio - self.aspect_ratio) <= self.aspect_ratio * ASPECT_RATIO_TOLERANCE
+
+    def matches_anchor(self, image, engine):
+        """OCR de la zona ancla y comparación con el texto esperado"""
+        if not self.anchor:
+            return True
+        region = crop_box(image, self.anchor['box'])
+        if region.size == 0:
+            return False
+        text = engine.image_to_string(region, psm=7)
+        return normalize_text(self.anchor['text']) in normalize_text(text)
+
+
+class FormTemplateRegistry:
+    def __init__(self, templates=None):
+        """
+        Registro de plantillas de formularios conocidos
+
+        Args:
+            templates (list): Plantillas iniciales (FormTemplate)
+        """
+        self.templates = []
+        for template in templates or []:
+            self.register(template)
+
+    @classmethod
+    def from_directory(cls, directory=None):
+        """
+        Cargar todas las plantillas JSON de una carpeta
+        (por defecto OCR_TEMPLATES_DIR o plantillas_formularios/)
+        """
+        directory = directory or os.getenv('OCR_TEMPLATES_DIR', DEFAULT_TEMPLATES_DIR)
+        registry = cls()
+
+        for path in sorted(glob.glob(os.path.join(directory, '*.json'))):
+            with open(path, 'r', encoding='utf-8') as f:
+                try:
+                    registry.register(FormTemplate.from_dict(json.load(f)))
+                except (ValueError, KeyError) as e:
+                    print(f"⚠️  Plantilla ignorada {os.path.basename(path)}: {str(e)}")
+
+        return registry
+
+    def register(self, template):
+        """Registrar (o reemplazar por nombre) una plantilla"""
+        self.templates = [t for t in self.templates if t.name != template.name]
+        self.templates.append(template)
+
+    def signature(self):
+        """Firma de las plantillas registradas (forma parte de la clave de la caché OCR)"""
+        data = json.dumps([t.to_dict() for t in self.templates], sort_keys=True)
+        return hashlib.sha1(data.encode('utf-8')).hexdigest()[:12]
+
+    def match(self, image, engine):
+        """
+        Identificar la plantilla que corresponde a una imagen preprocesada
+
+        Returns:
+            FormTemplate | None: None si el formato no es conocido
+        """
+        for template in self.templates:
+            if template.matches_shape(image) and template.matches_anchor(image, engine):
+                return template
+        return None
+
+    def __len__(self):
+        return len(self.templates)
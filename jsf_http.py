@@ -0,0 +1,428 @@
+"""
+Ruta rápida HTTP para las acciones del módulo de usuarios (JSF)
+En lugar de manejar un navegador completo, repite los envíos de formulario que
+hace la página (búsqueda, editar/guardar rol, desactivar, activar) con un
+cliente HTTP con pool de conexiones, usando las cookies de una sesión iniciada
+con Playwright y el javax.faces.ViewState de cada respuesta.
+
+Los botones se buscan con los mismos selectores que usa web_automation.py
+(.btn-edit, .btn-deactivate, .btn-activate, #confirm-deactivate, #user-role,
+#btn-save) y el éxito con el mensaje .alert-success / .mensaje-exito, que
+como en el navegador debe estar visible y tener texto (las plantillas JSF
+suelen dibujar el contenedor del mensaje oculto y vacío). Una
+respuesta inesperada antes del envío que modifica al usuario (login,
+ViewExpired, botón ausente) lanza una excepción para que WebAutomation repita
+la acción con el navegador. Desde ese envío en adelante lanza
+SubmittedActionError: la plataforma pudo aplicar el cambio y repetirlo lo
+aplicaría dos veces.
+
+Requiere requests (pip install requests).
+"""
+
+import json
+import os
+import re
+import threading
+from html.parser import HTMLParser
+from urllib.parse import urljoin
+
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+    REQUESTS_AVAILABLE = True
+except ImportError:
+    requests = None
+    REQUESTS_AVAILABLE = False
+
+VIEW_STATE_FIELD = 'javax.faces.ViewState'
+
+# Clases de los mensajes de éxito (las mismas que busca WebAutomation)
+SUCCESS_CLASSES = {'alert-success', 'mensaje-exito'}
+
+# Marcas de un elemento oculto (además de display:none / visibility:hidden en style)
+HIDDEN_CLASSES = {'ui-helper-hidden', 'hidden', 'd-none'}
+HIDDEN_STYLE_PATTERN = re.compile(r'display\s*:\s*none|visibility\s*:\s*hidden', re.IGNORECASE)
+
+# Elementos sin etiqueta de cierre
+VOID_TAGS = {
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta',
+    'param', 'source', 'track', 'wbr'
+}
+
+# Argumento del onclick que abre el modal (confirmarDesactivar('123'))
+ONCLICK_ARGUMENT_PATTERN = re.compile(r"\(\s*['\"]([^'\"]*)['\"]")
+
+
+class SubmittedActionError(Exception):
+    """El envío que modifica al usuario ya se hizo: no repetir la acción"""
+
+
+def _is_hidden(attrs, classes):
+    """El elemento está oculto por sí mismo (atributo hidden, style o clase)"""
+    return ('hidden' in attrs or bool(classes & HIDDEN_CLASSES)
+            or bool(HIDDEN_STYLE_PATTERN.search(attrs.get('style', ''))))
+
+
+class _Element:
+    __slots__ = ('tag', 'attrs', 'row', 'text')
+
+    def __init__(self, tag, attrs, row):
+        self.tag = tag
+        self.attrs = attrs
+        self.row = row
+        self.text = ''
+
+    @property
+    def classes(self):
+        return set((self.attrs.get('class') or '').split())
+
+
+class JsfPage(HTMLParser):
+    """Página JSF analizada: formulario, campos, filas de la tabla y mensajes"""
+
+    def __init__(self, content, url):
+        super().__init__(convert_charrefs=True)
+        self.url = url
+        self.form_action = None
+        self.fields = {}        # name → valor (campos hidden y de texto)
+        self.field_ids = {}     # id → name de los campos
+        self.selects = {}       # name → opciones (id del select → name en select_ids)
+        self.select_ids = {}
+        self.buttons = []       # _Element de cada botón
+        self.rows = []          # texto de cada fila <tr>
+        self.cells = []         # textos de las celdas <td> de cada fila
+        self.has_password = False
+        self.has_success = False
+
+        self._row = None
+        self._cell = None
+        self._select = None
+        self._option = None
+        # Elementos abiertos: (tag, oculto él o un ancestro)
+        self._open = []
+        # Mensajes de éxito visibles abiertos: [profundidad, texto]
+        self._messages = []
+        self.feed(content)
+        self.close()
+        for _, text in self._messages:
+            self.has_success = self.has_success or bool(text.strip())
+
+    def handle_starttag(self, tag, attrs):
+        attrs = {name: value or '' for name, value in attrs}
+        classes = set(attrs.get('class', '').split())
+        if tag not in VOID_TAGS:
+            hidden = self._hidden or _is_hidden(attrs, classes)
+            self._open.append((tag, hidden))
+            if classes & SUCCESS_CLASSES and not hidden:
+                self._messages.append([len(self._open), ''])
+
+        if tag == 'form' and self.form_action is None:
+            self.form_action = attrs.get('action')
+        elif tag == 'tr':
+            self._row = len(self.rows)
+            self.rows.append('')
+            self.cells.append([])
+        elif tag == 'td' and self._row is not None:
+            self._cell = len(self.cells[self._row])
+            self.cells[self._row].append('')
+        elif tag == 'input':
+            kind = attrs.get('type', 'text').lower()
+            if kind == 'password':
+                self.has_password = True
+            elif kind in ('submit', 'button', 'image'):
+                self.buttons.append(_Element(tag, attrs, self._row))
+            elif attrs.get('name') and kind in ('hidden', 'text', 'search'):
+                self.fields[attrs['name']] = attrs.get('value', '')
+                if attrs.get('id'):
+                    self.field_ids[attrs['id']] = attrs['name']
+        elif tag == 'button':
+            self.buttons.append(_Element(tag, attrs, self._row))
+        elif tag == 'select' and attrs.get('name'):
+            self._select = attrs['name']
+            self.selects[self._select] = []
+            if attrs.get('id'):
+                self.select_ids[attrs['id']] = self._select
+        elif tag == 'option' and self._select is not None:
+            self._option = attrs.get('value')
+            self.selects[self._select].append([self._option, ''])
+
+    def handle_endtag(self, tag):
+        # Cerrar hasta la última apertura de tag (tolera HTML mal anidado)
+        for depth in range(len(self._open), 0, -1):
+            if self._open[depth - 1][0] == tag:
+                del self._open[depth - 1:]
+                while self._messages and self._messages[-1][0] >= depth:
+                    _, text = self._messages.pop()
+                    self.has_success = self.has_success or bool(text.strip())
+                break
+
+        if tag == 'tr':
+            self._row = None
+            self._cell = None
+        elif tag == 'td':
+            self._cell = None
+        elif tag == 'select':
+            self._select = None
+
+    def handle_data(self, data):
+        if self._messages and not self._hidden:
+            for message in self._messages:
+                message[1] += data
+        if self._row is not None:
+            self.rows[self._row] += data
+            if self._cell is not None:
+                self.cells[self._row][self._cell] += data
+        if self._select is not None and self.selects[self._select]:
+            self.selects[self._select][-1][1] += data
+
+    @property
+    def _hidden(self):
+        return bool(self._open) and self._open[-1][1]
+
+    @property
+    def view_state(self):
+        return self.fields.get(VIEW_STATE_FIELD)
+
+    def button(self, css_class=None, element_id=None, row=None):
+        """Primer botón con la clase o el id dados (opcionalmente dentro de una fila)"""
+        for button in self.buttons:
+            if row is not None and button.row != row:
+                continue
+            if css_class and css_class in button.classes:
+                return button
+            if element_id and button.attrs.get('id') == element_id:
+                return button
+        return None
+
+    def find_row(self, numero_documento):
+        """
+        Índice de la fila con una celda igual al documento (None si no está);
+        la búsqueda de la plataforma también devuelve documentos que lo contienen
+        """
+        for index, cells in enumerate(self.cells):
+            if any(cell.strip() == numero_documento for cell in cells):
+                return index
+        return None
+
+
+class JsfUserClient:
+    def __init__(self, platform_url=None, pool_size=None, timeout=None):
+        """
+        Cliente HTTP del módulo de usuarios
+
+        Args:
+            platform_url (str): URL base de la plataforma (PLATFORM_URL)
+            pool_size (int): Conexiones reutilizables (WEB_HTTP_POOL_SIZE, 4)
+            timeout (float): Segundos por petición (WEB_HTTP_TIMEOUT, 30)
+        """
+        if not REQUESTS_AVAILABLE:
+            raise ImportError(
+                "requests no está instalado. Instálalo con: pip install requests"
+            )
+        if platform_url is None:
+            platform_url = os.getenv('PLATFORM_URL', 'http://10.250.3.66:8080/savia')
+        if pool_size is None:
+            pool_size = int(os.getenv('WEB_HTTP_POOL_SIZE', 4))
+        if timeout is None:
+            timeout = float(os.getenv('WEB_HTTP_TIMEOUT', 30))
+
+        self.platform_url = platform_url.rstrip('/')
+        self.module_url = f"{self.platform_url}/admin/usuarios.faces"
+        self.timeout = timeout
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.has_cookies = False
+
+        # Última vista del módulo (su ViewState sirve para el siguiente envío)
+        self.view = None
+        self.lock = threading.Lock()
+
+        # Contadores
+        self.requests = 0
+        self.actions = 0
+        self.view_reloads = 0
+
+    # ============================================
+    # SESIÓN
+    # ============================================
+    def set_cookies(self, cookies):
+        """
+        Usar las cookies de una sesión de Playwright
+        (context.cookies() o la lista 'cookies' de un storage_state)
+        """
+        self.session.cookies.clear()
+        for cookie in cookies:
+            self.session.cookies.set(
+                cookie['name'], cookie['value'],
+                domain=cookie.get('domain', ''), path=cookie.get('path', '/')
+            )
+        self.view = None
+        self.has_cookies = bool(cookies)
+
+    def load_storage_state(self, path):
+        """Cargar las cookies de un archivo storage_state"""
+        with open(path, encoding='utf-8') as f:
+            self.set_cookies(json.load(f).get('cookies', []))
+
+    # ============================================
+    # PETICIONES
+    # ============================================
+    def _request(self, method, url, data=None):
+        response = self.session.request(method, url, data=data, timeout=self.timeout)
+        self.requests += 1
+        if response.status_code >= 400:
+            raise Exception(f"La plataforma respondió {response.status_code}")
+
+        page = JsfPage(response.text, response.url)
+        if page.has_password:
+            raise Exception("Sesión vencida (la plataforma pidió credenciales)")
+        return page
+
+    def open_module(self):
+        """Cargar el módulo de usuarios (nueva vista y ViewState)"""
+        self.view = self._request('GET', self.module_url)
+        self.view_reloads += 1
+        if not self.view.view_state:
+            raise Exception("La página no tiene javax.faces.ViewState")
+        return self.view
+
+    def submit(self, fields, button=None, value=None, mutating=False):
+        """
+        Enviar el formulario de la vista actual con los campos dados y el
+        botón pulsado (name=value); la respuesta pasa a ser la vista actual
+
+        Args:
+            mutating (bool): El envío modifica al usuario; si falla lanza
+                             SubmittedActionError (la plataforma pudo aplicarlo)
+        """
+        view = self.view or self.open_module()
+        data = dict(view.fields)
+        data.update(fields)
+        if button is not None:
+            name = button.attrs.get('name')
+            if not name:
+                raise Exception("El botón no tiene name (no se puede repetir el envío)")
+            data[name] = button.attrs.get('value', '') if value is None else value
+
+        action = urljoin(view.url, view.form_action or view.url)
+        try:
+            self.view = self._request('POST', action, data)
+        except Exception as e:
+            if mutating:
+                self.view = None
+                raise SubmittedActionError(str(e)) from e
+            raise
+        return self.view
+
+    def search(self, numero_documento):
+        """
+        Buscar un usuario (repite la búsqueda con Enter en #search-user)
+
+        Returns:
+            tuple: (vista con los resultados, índice de la fila del usuario)
+        """
+        for attempt in range(2):
+            try:
+                view = self.view or self.open_module()
+                # AJUSTA: id del campo de búsqueda (el mismo de WebAutomation.search_user)
+                search_name = view.field_ids.get('search-user')
+                if search_name is None:
+                    raise Exception("No se encontró el campo de búsqueda")
+                view = self.submit({search_name: numero_documento})
+                break
+            except Exception:
+                # ViewState vencido u otra vista (formulario de edición): recargar una vez
+                self.view = None
+                if attempt:
+                    raise
+
+        row = view.find_row(numero_documento)
+        if row is None:
+            raise Exception(f"Usuario con documento {numero_documento} no encontrado")
+        return view, row
+
+    # ============================================
+    # ACCIONES
+    # ============================================
+    def change_user_role(self, numero_documento, nuevo_rol):
+        view, row = self.search(numero_documento)
+        edit_button = view.button(css_class='btn-edit', row=row)
+        if edit_button is None:
+            raise Exception("No se encontró el botón Editar")
+
+        view = self.submit({}, edit_button)
+        select_name = view.select_ids.get('user-role')
+        save_button = view.button(element_id='btn-save')
+        if select_name is None or save_button is None:
+            raise Exception("No se encontró el formulario de edición")
+
+        value = None
+        for option_value, label in view.selects[select_name]:
+            if label.strip() == nuevo_rol:
+                value = label.strip() if option_value is None else option_value
+        if value is None:
+            raise Exception(f"Rol no disponible: {nuevo_rol}")
+
+        view = self.submit({select_name: value}, save_button, mutating=True)
+        return self._result(view, f'Rol cambiado a "{nuevo_rol}" exitosamente',
+                            'No se pudo verificar el cambio de rol')
+
+    def deactivate_user(self, numero_documento):
+        view, row = self.search(numero_documento)
+        button = view.button(css_class='btn-deactivate', row=row)
+        if button is None:
+            raise Exception("No se encontró el botón Desactivar")
+
+        # Sin name, el botón abre el modal: el envío lo hace #confirm-deactivate
+        # con el valor que le asigna el onclick del botón de la fila
+        if not button.attrs.get('name'):
+            confirm = view.button(element_id='confirm-deactivate')
+            if confirm is None:
+                raise Exception("No se encontró el botón de confirmación")
+            argument = ONCLICK_ARGUMENT_PATTERN.search(button.attrs.get('onclick', ''))
+            if argument is None:
+                raise Exception("No se pudo leer el valor de confirmación del botón Desactivar")
+            view = self.submit({}, confirm, argument.group(1), mutating=True)
+        else:
+            view = self.submit({}, button, mutating=True)
+        return self._result(view, 'Usuario desactivado exitosamente',
+                            'No se pudo verificar la desactivación')
+
+    def activate_user(self, numero_documento):
+        view, row = self.search(numero_documento)
+        button = view.button(css_class='btn-activate', row=row)
+        if button is None:
+            raise Exception("No se encontró el botón Activar")
+        view = self.submit({}, button, mutating=True)
+        return self._result(view, 'Usuario activado exitosamente',
+                            'No se pudo verificar la activación')
+
+    def _result(self, view, success, failure):
+        if not view.has_success:
+            # El envío ya se hizo: no se repite con el navegador
+            raise SubmittedActionError(failure)
+        self.actions += 1
+        return {'success': True, 'message': success}
+
+    def run(self, accion, numero_documento, params=None):
+        """Ejecutar una acción ('cambiar_rol', 'desactivar' o 'activar')"""
+        params = params or {}
+        with self.lock:
+            if accion == 'cambiar_rol':
+                return self.change_user_role(numero_documento, params['rol'])
+            if accion == 'desactivar':
+                return self.deactivate_user(numero_documento)
+            if accion == 'activar':
+                return self.activate_user(numero_documento)
+        raise Exception(f"Acción no soportada por la ruta HTTP: {accion}")
+
+    def stats(self):
+        """Peticiones, acciones y recargas de la vista"""
+        return {
+            'requests': self.requests,
+            'actions': self.actions,
+            'view_reloads': self.view_reloads
+        }
@@ -0,0 +1,307 @@
+"""
+Procesamiento OCR por lotes
+Procesa una carpeta (o patrón glob) de formularios escaneados en paralelo
+usando un pool de procesos, y guarda los seis campos extraídos en JSONL o CSV.
+
+Si un proceso del pool muere (segfault u OOM en Tesseract/OpenCV) el pool
+queda inservible: se crea uno nuevo para las imágenes que faltaban y las que
+estaban en curso se reintentan de a una en un proceso aparte, así solo la
+imagen que tumba el proceso se informa como fallida.
+
+Uso:
+    python ocr_batch.py carpeta_formularios/ -o resultados.jsonl
+    python ocr_batch.py "escaneos/*.png" -o resultados.csv --workers 4
+    python ocr_batch.py --crash-test    # Prueba: un proceso muere a mitad del lote
+"""
+
+import argparse
+import csv
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+# Extensiones de imagen aceptadas (las mismas que ofrece la interfaz gráfica)
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.tiff', '.tif')
+
+# Campos que extrae OCRProcessor.extract_user_data
+USER_FIELDS = [
+    'tipo_documento',
+    'numero_documento',
+    'nombre_completo',
+    'email',
+    'rol',
+    'area'
+]
+
+# Procesador OCR propio de cada proceso del pool (se crea en el initializer)
+_worker_processor = None
+
+
+def _init_worker(engine=None):
+    """
+    Inicializar un OCRProcessor por proceso (evita re-crearlo por imagen)
+    Con el motor tesserocr el modelo queda cargado durante todo el lote
+    """
+    global _worker_processor
+    from ocr_processor import OCRProcessor
+    _worker_processor = OCRProcessor(engine=engine)
+
+
+def _process_image(image_path):
+    """
+    Procesar una imagen dentro de un proceso del pool
+    Nunca lanza excepciones: los errores se devuelven en el resultado
+    """
+    start = time.perf_counter()
+    try:
+        user_data = _worker_processor.extract_user_data(image_path)
+        return {
+            'archivo': image_path,
+            'success': True,
+            'datos': user_data,
+            'error': '',
+            'duracion_ms': round((time.perf_counter() - start) * 1000, 1)
+        }
+    except Exception as e:
+        return _failure(image_path, str(e), round((time.perf_counter() - start) * 1000, 1))
+
+
+def _failure(image_path, error, duration_ms=None):
+    """Resultado de una imagen que no se pudo procesar"""
+    return {
+        'archivo': image_path,
+        'success': False,
+        'datos': {field: '' for field in USER_FIELDS},
+        'error': error,
+        'duracion_ms': duration_ms
+    }
+
+
+def collect_images(source):
+    """
+    Obtener lista ordenada de imágenes a partir de una carpeta o un patrón glob
+    """
+    if os.path.isdir(source):
+        paths = [
+            os.path.join(source, name)
+            for name in os.listdir(source)
+        ]
+    else:
+        paths = glob.glob(source, recursive=True)
+
+    return sorted(
+        path for path in paths
+        if os.path.isfile(path) and path.lower().endswith(IMAGE_EXTENSIONS)
+    )
+
+
+def process_batch(source, max_workers=None, engine=None):
+    """
+    Procesar un lote de imágenes en paralelo
+
+    Args:
+        source (str | list): Carpeta, patrón glob o lista de rutas
+        max_workers (int): Procesos del pool (por defecto, núcleos disponibles)
+        engine (str): Motor OCR de cada proceso ('subprocess', 'tesserocr', 'auto')
+
+    Yields:
+        dict: Resultado por imagen, en el orden en que van terminando
+    """
+    image_paths = collect_images(source) if isinstance(source, str) else list(source)
+
+    if not image_paths:
+        return
+
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    max_workers = max(1, min(max_workers, len(image_paths)))
+
+    yield from _run_batch(image_paths, max_workers, _process_image, _init_worker, (engine,))
+
+
+def _run_batch(image_paths, max_workers, task, initializer=None, initargs=()):
+    """
+    Ejecutar task sobre cada imagen en un pool de procesos, sobreviviendo a
+    los procesos que mueren
+
+    Cuando un proceso muere el pool se rompe y todas las imágenes sin
+    terminar fallan con BrokenProcessPool. El pool reparte en orden de envío
+    y como mucho tiene max_workers en ejecución más max_workers + 1 en cola,
+    así que la culpable está entre las primeras 2 * max_workers + 1 sin
+    terminar: esas se reintentan de a una en un proceso aparte y el resto
+    vuelve a un pool nuevo.
+    """
+    order = {path: index for index, path in enumerate(image_paths)}
+    pending = list(image_paths)
+
+    while pending:
+        broken = []
+        yield from _run_pool(pending, max_workers, task, initializer, initargs, broken)
+        broken.sort(key=order.get)
+        suspects, pending = broken[:2 * max_workers + 1], broken[2 * max_workers + 1:]
+        for path in suspects:
+            yield _run_alone(path, task, initializer, initargs)
+
+
+def _run_pool(image_paths, max_workers, task, initializer, initargs, broken):
+    """Una pasada del pool; las imágenes que no terminaron porque el pool se rompió van a broken"""
+    with ProcessPoolExecutor(
+        max_workers=min(max_workers, len(image_paths)),
+        initializer=initializer,
+        initargs=initargs
+    ) as executor:
+        futures = {
+            executor.submit(task, path): path
+            for path in image_paths
+        }
+
+        for future in as_completed(futures):
+            try:
+                yield future.result()
+            except BrokenProcessPool:
+                broken.append(futures[future])
+            except Exception as e:
+                yield _failure(futures[future], f"Fallo del proceso: {str(e)}")
+
+
+def _run_alone(image_path, task, initializer, initargs):
+    """Procesar una imagen sola en un proceso nuevo (si muere, la culpable es ella)"""
+    with ProcessPoolExecutor(max_workers=1, initializer=initializer, initargs=initargs) as executor:
+        try:
+            return executor.submit(task, image_path).result()
+        except BrokenProcessPool:
+            return _failure(image_path, "Fallo del proceso: terminó inesperadamente con esta imagen")
+        except Exception as e:
+            return _failure(image_path, f"Fallo del proceso: {str(e)}")
+
+
+class ResultWriter:
+    """Escritor incremental de resultados en formato JSONL o CSV"""
+
+    def __init__(self, output_path, output_format=None):
+        if output_format is None:
+            output_format = 'csv' if output_path.lower().endswith('.csv') else 'jsonl'
+        self.output_format = output_format
+        self.file = open(output_path, 'w', encoding='utf-8', newline='')
+        self.csv_writer = None
+
+        if self.output_format == 'csv':
+            self.csv_writer = csv.DictWriter(
+                self.file,
+                fieldnames=['archivo'] + USER_FIELDS + ['success', 'error', 'duracion_ms']
+            )
+            self.csv_writer.writeheader()
+
+    def write(self, result):
+        """Escribir un resultado y forzar el volcado a disco"""
+        if self.csv_writer:
+            row = {
+                'archivo': result['archivo'],
+                'success': result['success'],
+                'error': result['error'],
+                'duracion_ms': result['duracion_ms']
+            }
+            row.update(result['datos'])
+            self.csv_writer.writerow(row)
+        else:
+            self.file.write(json.dumps(result, ensure_ascii=False) + '\n')
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+# Prueba sin OCR: la tarea mata su propio proceso con las imágenes "crash"
+def _crash_test_task(image_path):
+    if 'crash' in os.path.basename(image_path):
+        os._exit(1)
+    time.sleep(0.02)
+    return {
+        'archivo': image_path,
+        'success': True,
+        'datos': {field: '' for field in USER_FIELDS},
+        'error': '',
+        'duracion_ms': 20.0
+    }
+
+
+def _crash_test():
+    failures = []
+
+    def check(name, condition):
+        print(f"   {'✅' if condition else '❌'} {name}")
+        if not condition:
+            failures.append(name)
+
+    for crashes in ([7], [3, 20]):
+        paths = [f"form_{index:02d}{'_crash' if index in crashes else ''}.png" for index in range(30)]
+        results = list(_run_batch(paths, 3, _crash_test_task))
+        failed = sorted(result['archivo'] for result in results if not result['success'])
+
+        check(f"{len(crashes)} proceso(s) muerto(s): cada imagen se informa una vez",
+              sorted(result['archivo'] for result in results) == sorted(paths))
+        check(f"{len(crashes)} proceso(s) muerto(s): solo fallan las imágenes que los tumban",
+              failed == sorted(paths[index] for index in crashes))
+
+    return 1 if failures else 0
+
+
+def main(argv=None):
+    if '--crash-test' in (sys.argv[1:] if argv is None else argv):
+        return _crash_test()
+
+    parser = argparse.ArgumentParser(
+        description="Extraer datos de usuarios de un lote de imágenes con OCR"
+    )
+    parser.add_argument('source', help="Carpeta o patrón glob de imágenes")
+    parser.add_argument('-o', '--output', default='resultados_ocr.jsonl',
+                        help="Archivo de salida (.jsonl o .csv)")
+    parser.add_argument('--format', choices=['jsonl', 'csv'], default=None,
+                        help="Formato de salida (por defecto según la extensión)")
+    parser.add_argument('-w', '--workers', type=int, default=None,
+                        help="Número de procesos (por defecto, núcleos disponibles)")
+    parser.add_argument('--engine', choices=['auto', 'subprocess', 'tesserocr'], default=None,
+                        help="Motor OCR (por defecto OCR_ENGINE o 'auto')")
+    args = parser.parse_args(argv)
+
+    image_paths = collect_images(args.source)
+    total = len(image_paths)
+
+    if total == 0:
+        print(f"⚠️  No se encontraron imágenes en: {args.source}")
+        return 1
+
+    print(f"📂 {total} imágenes encontradas")
+    print(f"💾 Resultados en: {args.output}\n")
+
+    ok = 0
+    start = time.perf_counter()
+
+    with ResultWriter(args.output, args.format) as writer:
+        for idx, result in enumerate(process_batch(image_paths, args.workers, args.engine), 1):
+            writer.write(result)
+            name = os.path.basename(result['archivo'])
+            if result['success']:
+                ok += 1
+                print(f"[{idx}/{total}] ✅ {name} ({result['duracion_ms']} ms)")
+            else:
+                print(f"[{idx}/{total}] ❌ {name}: {result['error']}")
+
+    elapsed = time.perf_counter() - start
+    print(f"\n✅ {ok}/{total} imágenes procesadas en {elapsed:.1f} s "
+          f"({total / elapsed:.1f} imágenes/s)")
+    return 0 if ok == total else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
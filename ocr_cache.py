@@ -0,0 +1,198 @@
+"""
+Caché de resultados OCR por contenido de imagen
+La clave es un hash de los bytes de la imagen más la configuración de
+preprocesamiento y de Tesseract, así una misma imagen (aunque tenga otro
+nombre) no se vuelve a procesar.
+
+Dos niveles:
+- Memoria: LRU con número máximo de entradas
+- Disco (opcional): SQLite con expulsión por tamaño total (el menos usado primero)
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+def compute_cache_key(image_bytes, config_signature):
+    """
+    Calcular la clave de caché
+
+    Args:
+        image_bytes (bytes): Contenido del archivo de imagen
+        config_signature (str): Configuración de preprocesamiento + Tesseract
+    """
+    digest = hashlib.sha256()
+    digest.update(config_signature.encode('utf-8'))
+    digest.update(b'\x00')
+    digest.update(image_bytes)
+    return digest.hexdigest()
+
+
+class OCRResultCache:
+    def __init__(self, max_entries=None, disk_path=None, max_disk_bytes=None):
+        """
+        Inicializar caché de resultados OCR
+
+        Args:
+            max_entries (int): Entradas máximas en memoria (OCR_CACHE_MAX_ENTRIES, 256)
+            disk_path (str): Archivo SQLite del nivel en disco (OCR_CACHE_PATH);
+                             si es None no se usa disco
+            max_disk_bytes (int): Tamaño máximo en disco (OCR_CACHE_MAX_MB, 50 MB)
+        """
+        if max_entries is None:
+            max_entries = int(os.getenv('OCR_CACHE_MAX_ENTRIES', 256))
+        if disk_path is None:
+            disk_path = os.getenv('OCR_CACHE_PATH') or None
+        if max_disk_bytes is None:
+            max_disk_bytes = int(float(os.getenv('OCR_CACHE_MAX_MB', 50)) * 1024 * 1024)
+
+        self.max_entries = max_entries
+        self.max_disk_bytes = max_disk_bytes
+        self.memory = OrderedDict()
+        self.lock = threading.Lock()
+
+        # Contadores
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        self.disk = None
+        self.disk_bytes = 0
+        if disk_path:
+            self._open_disk(disk_path)
+
+    def _open_disk(self, disk_path):
+        """Abrir (o crear) el nivel en disco"""
+        directory = os.path.dirname(os.path.abspath(disk_path))
+        os.makedirs(directory, exist_ok=True)
+
+        self.disk = sqlite3.connect(disk_path, timeout=30, check_same_thread=False)
+        self.disk.execute("""
+            CREATE TABLE IF NOT EXISTS ocr_cache (
+                cache_key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                accessed REAL NOT NULL
+            )
+        """)
+        self.disk.execute(
+            "CREATE INDEX IF NOT EXISTS idx_ocr_cache_accessed ON ocr_cache (accessed)"
+        )
+        self.disk.commit()
+
+        row = self.disk.execute("SELECT COALESCE(SUM(size), 0) FROM ocr_cache").fetchone()
+        self.disk_bytes = row[0]
+
+    def get(self, key):
+        """
+        Obtener resultado en caché
+
+        Returns:
+            dict | None: Copia del resultado o None si no está
+        """
+        with self.lock:
+            if key in self.memory:
+                self.memory.move_to_end(key)
+                self.memory_hits += 1
+                return dict(self.memory[key])
+
+            if self.disk is not None:
+                row = self.disk.execute(
+                    "SELECT value FROM ocr_cache WHERE cache_key = ?", (key,)
+                ).fetchone()
+                if row:
+                    self.disk.execute(
+                        "UPDATE ocr_cache SET accessed = ? WHERE cache_key = ?",
+                        (time.time(), key)
+                    )
+                    self.disk.commit()
+                    value = json.loads(row[0])
+                    self._put_memory(key, value)
+                    self.disk_hits += 1
+                    return dict(value)
+
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        """Guardar resultado en memoria y (si está activo) en disco"""
+        with self.lock:
+            self._put_memory(key, dict(value))
+
+            if self.disk is not None:
+                self._put_disk(key, value)
+
+    def _put_memory(self, key, value):
+        self.memory[key] = value
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.max_entries:
+            self.memory.popitem(last=False)
+
+    def _put_disk(self, key, value):
+        data = json.dumps(value, ensure_ascii=False)
+        size = len(data.encode('utf-8'))
+
+        row = self.disk.execute(
+            "SELECT size FROM ocr_cache WHERE cache_key = ?", (key,)
+        ).fetchone()
+        if row:
+            self.disk_bytes -= row[0]
+
+        self.disk.execute(
+            "INSERT OR REPLACE INTO ocr_cache (cache_key, value, size, accessed) "
+            "VALUES (?, ?, ?, ?)",
+            (key, data, size, time.time())
+        )
+        self.disk_bytes += size
+        self._evict_disk()
+        self.disk.commit()
+
+    def _evict_disk(self):
+        """Expulsar las entradas menos usadas hasta quedar bajo el tamaño máximo"""
+        while self.disk_bytes > self.max_disk_bytes:
+            rows = self.disk.execute(
+                "SELECT cache_key, size FROM ocr_cache ORDER BY accessed LIMIT 100"
+            ).fetchall()
+            if not rows:
+                self.disk_bytes = 0
+                break
+
+            for cache_key, size in rows:
+                self.disk.execute("DELETE FROM ocr_cache WHERE cache_key = ?", (cache_key,))
+                self.disk_bytes -= size
+                if self.disk_bytes <= self.max_disk_bytes:
+                    break
+
+    def clear(self):
+        """Vaciar ambos niveles (los contadores se conservan)"""
+        with self.lock:
+            self.memory.clear()
+            if self.disk is not None:
+                self.disk.execute("DELETE FROM ocr_cache")
+                self.disk.commit()
+                self.disk_bytes = 0
+
+    def stats(self):
+        """Obtener contadores de aciertos y fallos"""
+        with self.lock:
+            total = self.memory_hits + self.disk_hits + self.misses
+            hits = self.memory_hits + self.disk_hits
+            return {
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'hit_rate': hits / total if total else 0.0,
+                'memory_entries': len(self.memory),
+                'disk_bytes': self.disk_bytes if self.disk is not None else None
+            }
+
+    def close(self):
+        with self.lock:
+            if self.disk is not None:
+                self.disk.close()
+                self.disk = None
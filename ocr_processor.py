@@ -4,12 +4,28 @@ Soporta extracción de: tipo de documento, número, nombre, email, rol, área
 """
 
 import os
+import threading
+import time
 import pytesseract
 from PIL import Image
 import cv2
 import numpy as np
 import re
 
+from ocr_cache import OCRResultCache, compute_cache_key
+from form_templates import FormTemplateRegistry, crop_box
+from field_extractor import (
+    EMAIL_REGEX, extract_fields, normalize_area, normalize_doc_type, normalize_role
+)
+
+# tesserocr es opcional: mantiene la API de Tesseract cargada en el proceso
+try:
+    import tesserocr
+    TESSEROCR_AVAILABLE = True
+except ImportError:
+    tesserocr = None
+    TESSEROCR_AVAILABLE = False
+
 # ============================================
 # CONFIGURACIÓN DE TESSERACT PARA WINDOWS
 # ============================================
@@ -26,44 +42,335 @@ else:
     print(f"   Buscado en: {TESSERACT_PATH}")
     print("   Ajusta la variable TESSERACT_PATH en ocr_processor.py")
 
+# Carpeta tessdata para el motor en proceso (tesserocr).
+# Si es None se usa TESSDATA_PREFIX o la ruta por defecto de Tesseract.
+TESSDATA_PATH = os.getenv('TESSDATA_PATH')
+
 # ============================================
 
-class OCRProcessor:
-    def __init__(self):
-        """Inicializar procesador OCR"""
+# Configuración por defecto de Tesseract para español
+DEFAULT_LANG = 'spa'
+DEFAULT_OEM = 3
+DEFAULT_PSM = 6
+
+
+# ============================================
+# PREPROCESAMIENTO
+# ============================================
+# Presets del pipeline de preprocesamiento:
+# - target_dpi: resolución a la que se reduce la imagen (None = no reducir)
+# - denoise: 'never', 'auto' (solo zonas con ruido) o 'always'
+# - denoise_strength / search_window: parámetros de fastNlMeansDenoising
+PREPROCESS_PRESETS = {
+    'fast': {
+        'target_dpi': 200,
+        'denoise': 'never',
+        'denoise_strength': 10,
+        'search_window': 7,
+    },
+    'balanced': {
+        'target_dpi': 300,
+        'denoise': 'auto',
+        'denoise_strength': 10,
+        'search_window': 11,
+    },
+    'quality': {
+        'target_dpi': None,
+        'denoise': 'always',
+        'denoise_strength': 10,
+        'search_window': 21,
+    },
+}
+
+DEFAULT_PRESET = 'balanced'
+
+# Ruido estimado (sigma) a partir del cual una zona se considera ruidosa
+NOISE_THRESHOLD = float(os.getenv('OCR_NOISE_THRESHOLD', 4.0))
+
+# Tamaño (px) de las zonas en las que se evalúa el ruido con denoise='auto'
+DENOISE_TILE = 256
+
+# Ancho de página supuesto (pulgadas, carta) cuando la imagen no trae DPI
+ASSUMED_PAGE_WIDTH_IN = 8.5
+
+# Núcleo laplaciano para estimar ruido
+NOISE_KERNEL = np.array([[1, -2, 1], [-2, 4, -2], [1, -2, 1]], dtype=np.float32)
+
+
+class PreprocessingPipeline:
+    """
+    Pipeline de preprocesamiento configurable por preset
+    Etapas: cargar en gris → reducir a DPI objetivo → reducir ruido → umbralizar
+    Las etapas que no aplican (sin reducción, sin ruido) se omiten
+    """
+
+    def __init__(self, preset=None, **overrides):
+        """
+        Args:
+            preset (str): 'fast', 'balanced' o 'quality' (por defecto OCR_PRESET o 'balanced')
+            **overrides: Parámetros del preset a sobrescribir (ej: target_dpi=250)
+        """
+        preset = preset or os.getenv('OCR_PRESET', DEFAULT_PRESET)
+
+        if preset not in PREPROCESS_PRESETS:
+            raise ValueError(
+                f"Preset desconocido: {preset}. Opciones: {', '.join(PREPROCESS_PRESETS)}"
+            )
+
+        self.preset = preset
+        self.params = dict(PREPROCESS_PRESETS[preset])
+        self.params.update(overrides)
+
+    def signature(self):
+        """Firma del pipeline (forma parte de la clave de la caché OCR)"""
+        params = ','.join(f"{key}={value}" for key, value in sorted(self.params.items()))
+        return f"{self.preset}({params})|adaptive_gaussian:11:2"
+
+    def run(self, image_path, timings=None):
+        """
+        Preprocesar imagen
+
+        Args:
+            image_path (str): Ruta de la imagen
+            timings (dict): Si se pasa, se llena con el tiempo (ms) de cada etapa
+
+        Returns:
+            numpy.ndarray: Imagen binarizada lista para Tesseract
+        """
+        if timings is None:
+            timings = {}
+        start = time.perf_counter()
+
+        def lap(stage):
+            nonlocal start
+            now = time.perf_counter()
+            timings[stage] = (now - start) * 1000
+            start = now
+
+        # Cargar directamente en escala de grises
+        gray = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
+        if gray is None:
+            raise ValueError(f"No se pudo leer la imagen: {image_path}")
+        lap('cargar')
+
+        # Reducir a la resolución objetivo
+        scale = self._scale_factor(image_path, gray)
+        if scale < 1.0:
+            gray = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+            lap('redimensionar')
+
+        # Reducir ruido (antes de umbralizar, sobre la imagen ya reducida)
+        if self.params['denoise'] != 'never':
+            gray = self._denoise(gray)
+            lap('reducir_ruido')
+
+        # Aplicar umbralización adaptativa
+        thresh = cv2.adaptiveThreshold(
+            gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
+            cv2.THRESH_BINARY, 11, 2
+        )
+        lap('umbralizar')
+
+        return thresh
+
+    def _scale_factor(self, image_path, gray):
+        """Calcular factor de reducción para llegar al DPI objetivo"""
+        target_dpi = self.params['target_dpi']
+        if not target_dpi:
+            return 1.0
+
+        source_dpi = None
+        try:
+            with Image.open(image_path) as img:
+                dpi = img.info.get('dpi')
+            if dpi and dpi[0] > 1:
+                source_dpi = float(dpi[0])
+        except Exception:
+            pass
+
+        if source_dpi is None:
+            source_dpi = gray.shape[1] / ASSUMED_PAGE_WIDTH_IN
+
+        return min(1.0, target_dpi / source_dpi)
+
+    def _denoise(self, gray):
+        """Aplicar fastNlMeansDenoising a toda la imagen o solo a las zonas ruidosas"""
+        strength = self.params['denoise_strength']
+        search_window = self.params['search_window']
+
+        if self.params['denoise'] == 'always':
+            return cv2.fastNlMeansDenoising(gray, None, strength, 7, search_window)
+
+        # denoise='auto': estimar ruido una sola vez y procesar solo zonas ruidosas.
+        # Se usa la mediana de la respuesta laplaciana (robusta a los bordes del
+        # texto): para ruido gaussiano, sigma ≈ mediana / (0.6745 * 6)
+        noise = np.abs(cv2.filter2D(gray, cv2.CV_32F, NOISE_KERNEL))
+        factor = 1 / (0.6745 * 6)
+
+        height, width = gray.shape
+        result = None
+        for y in range(0, height, DENOISE_TILE):
+            for x in range(0, width, DENOISE_TILE):
+                tile_noise = noise[y:y + DENOISE_TILE, x:x + DENOISE_TILE]
+                if factor * float(np.median(tile_noise)) < NOISE_THRESHOLD:
+                    continue
+
+                if result is None:
+                    result = gray.copy()
+                tile = gray[y:y + DENOISE_TILE, x:x + DENOISE_TILE]
+                result[y:y + DENOISE_TILE, x:x + DENOISE_TILE] = cv2.fastNlMeansDenoising(
+                    tile, None, strength, 7, search_window
+                )
+
+        return gray if result is None else result
+
+
+class SubprocessTesseractEngine:
+    """
+    Motor OCR por subproceso (pytesseract)
+    Lanza un proceso `tesseract` nuevo por imagen: carga el modelo cada vez
+    """
+    name = 'subprocess'
+
+    def __init__(self, lang=DEFAULT_LANG, oem=DEFAULT_OEM, psm=DEFAULT_PSM):
+        self.lang = lang
+        self.oem = oem
+        self.psm = psm
+
         # Verificar que Tesseract esté disponible
         try:
-            pytesseract.get_tesseract_version()
+            self.version = str(pytesseract.get_tesseract_version())
         except Exception as e:
             raise FileNotFoundError(
                 f"Tesseract no encontrado. Error: {str(e)}\n"
                 f"Instala Tesseract o configura la ruta en TESSERACT_PATH"
             )
+
+    def image_to_string(self, image, psm=None, whitelist=None):
+        """Extraer texto de una imagen (array de numpy o PIL)"""
+        config = f'--oem {self.oem} --psm {psm or self.psm} -l {self.lang}'
+        if whitelist:
+            config += f' -c tessedit_char_whitelist={whitelist}'
+        return pytesseract.image_to_string(image, config=config)
+
+    def close(self):
+        pass
+
+
+class TesserocrEngine:
+    """
+    Motor OCR en proceso (tesserocr)
+    Carga el modelo de idioma una sola vez y reutiliza la API de Tesseract
+    en cada imagen, sin archivos temporales ni subprocesos
+    """
+    name = 'tesserocr'
+
+    def __init__(self, lang=DEFAULT_LANG, oem=DEFAULT_OEM, psm=DEFAULT_PSM):
+        if not TESSEROCR_AVAILABLE:
+            raise ImportError(
+                "tesserocr no está instalado. Instálalo con: pip install tesserocr"
+            )
+
+        self.lang = lang
+        self.oem = oem
+        self.psm = psm
+
+        kwargs = {'lang': lang, 'oem': tesserocr.OEM(oem), 'psm': tesserocr.PSM(psm)}
+        if TESSDATA_PATH:
+            kwargs['path'] = TESSDATA_PATH
+
+        try:
+            self.api = tesserocr.PyTessBaseAPI(**kwargs)
+        except RuntimeError as e:
+            raise FileNotFoundError(
+                f"No se pudo cargar el modelo '{lang}' de Tesseract. Error: {str(e)}\n"
+                f"Configura TESSDATA_PATH con la carpeta tessdata"
+            )
+
+        # Versión del binding y de la librería Tesseract que enlaza
+        library = tesserocr.tesseract_version().split()
+        self.version = f"{getattr(tesserocr, '__version__', '?')}/{library[1] if len(library) > 1 else '?'}"
+
+        # La API de Tesseract no es thread-safe
+        self.lock = threading.Lock()
+
+    def image_to_string(self, image, psm=None, whitelist=None):
+        """Extraer texto de una imagen (array de numpy o PIL)"""
+        if isinstance(image, np.ndarray):
+            image = Image.fromarray(image)
+
+        with self.lock:
+            self.api.SetPageSegMode(tesserocr.PSM(psm or self.psm))
+            self.api.SetVariable('tessedit_char_whitelist', whitelist or '')
+            self.api.SetImage(image)
+            return self.api.GetUTF8Text()
+
+    def close(self):
+        with self.lock:
+            if self.api is not None:
+                self.api.End()
+                self.api = None
+
+
+# Motores disponibles, seleccionables desde OCRProcessor
+OCR_ENGINES = {
+    SubprocessTesseractEngine.name: SubprocessTesseractEngine,
+    TesserocrEngine.name: TesserocrEngine,
+}
+
+
+def create_engine(engine=None):
+    """
+    Crear motor OCR por nombre
+
+    Args:
+        engine (str): 'subprocess', 'tesserocr' o 'auto' (por defecto, variable
+                      de entorno OCR_ENGINE o 'auto'). 'auto' usa tesserocr si
+                      está instalado y si no el subproceso
+    """
+    engine = engine or os.getenv('OCR_ENGINE', 'auto')
+
+    if engine == 'auto':
+        engine = TesserocrEngine.name if TESSEROCR_AVAILABLE else SubprocessTesseractEngine.name
+
+    if engine not in OCR_ENGINES:
+        raise ValueError(
+            f"Motor OCR desconocido: {engine}. Opciones: {', '.join(OCR_ENGINES)}"
+        )
+
+    return OCR_ENGINES[engine]()
+
+
+class OCRProcessor:
+    def __init__(self, engine=None, cache=True, preset=None, templates=None):
+        """
+        Inicializar procesador OCR
+
+        Args:
+            engine (str): Motor OCR ('subprocess', 'tesserocr' o 'auto')
+            cache (bool | OCRResultCache): True crea una caché con la configuración
+                                           de .env, False la desactiva
+            preset (str): Preset de preprocesamiento ('fast', 'balanced', 'quality')
+            templates (FormTemplateRegistry): Plantillas de formularios conocidos
+                                              (por defecto, las de OCR_TEMPLATES_DIR)
+        """
+        self.engine = create_engine(engine)
+        self.pipeline = PreprocessingPipeline(preset)
+
+        if templates is None:
+            templates = FormTemplateRegistry.from_directory()
+        self.templates = templates
+
+        if cache is True:
+            cache = OCRResultCache()
+        self.cache = cache or None
     
-    def preprocess_image(self, image_path):
+    def preprocess_image(self, image_path, timings=None):
         """
         Preprocesar imagen para mejorar calidad de OCR
+        Usa el pipeline del preset configurado (ver PREPROCESS_PRESETS)
         """
-        # Cargar imagen
-        img = cv2.imread(image_path)
-        
-        # Convertir a escala de grises
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-        
-        # Aplicar umbralización adaptativa
-        thresh = cv2.adaptiveThreshold(
-            gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, 
-            cv2.THRESH_BINARY, 11, 2
-        )
-        
-        # Reducir ruido
-        denoised = cv2.fastNlMeansDenoising(thresh, None, 10, 7, 21)
-        
-        # Aplicar dilatación para conectar letras
-        kernel = np.ones((1, 1), np.uint8)
-        dilated = cv2.dilate(denoised, kernel, iterations=1)
-        
-        return dilated
+        return self.pipeline.run(image_path, timings)
     
     def extract_text_from_image(self, image_path):
         """
@@ -73,11 +380,8 @@ class OCRProcessor:
             # Preprocesar imagen
             processed_img = self.preprocess_image(image_path)
             
-            # Configuración de Tesseract para español
-            custom_config = r'--oem 3 --psm 6 -l spa'
-            
-            # Extraer texto
-            text = pytesseract.image_to_string(processed_img, config=custom_config)
+            # Extraer texto (configuración --oem 3 --psm 6 -l spa)
+            text = self.engine.image_to_string(processed_img)
             
             return text
         
@@ -89,13 +393,53 @@ class OCRProcessor:
         Extraer datos estructurados del usuario desde la imagen
         Retorna diccionario con: tipo_documento, numero_documento, nombre_completo, email, rol, area
         """
-        # Extraer texto
-        text = self.extract_text_from_image(image_path)
+        cache_key = None
+        user_data = None
+        
+        try:
+            # Consultar caché por contenido de la imagen
+            if self.cache is not None:
+                with open(image_path, 'rb') as f:
+                    cache_key = compute_cache_key(f.read(), self.config_signature())
+                cached = self.cache.get(cache_key)
+                if cached is not None:
+                    return cached
+            
+            processed_img = self.preprocess_image(image_path)
+            
+            # Formularios conocidos: OCR solo de la caja de cada campo
+            if self.templates:
+                template = self.templates.match(processed_img, self.engine)
+                if template:
+                    user_data = self.extract_with_template(processed_img, template)
+                    # Sin número de documento se intenta la página completa
+                    if not user_data['numero_documento']:
+                        user_data = None
+            
+            # Formato desconocido: OCR de la página completa (--psm 6)
+            if user_data is None:
+                text = self.engine.image_to_string(processed_img)
+        
+        except Exception as e:
+            raise Exception(f"Error en extracción de texto: {str(e)}")
         
-        # Limpiar texto
-        text = text.strip()
+        if user_data is None:
+            user_data = self._extract_fields_from_text(text)
         
-        # Diccionario para almacenar datos
+        if cache_key is not None:
+            self.cache.put(cache_key, user_data)
+        
+        return user_data
+    
+    def _extract_fields_from_text(self, text):
+        """Buscar los campos en el texto de la página completa (una sola pasada)"""
+        return extract_fields(text)
+    
+    def extract_with_template(self, processed_img, template):
+        """
+        Extraer campos de un formulario conocido
+        Cada caja se procesa por separado con su PSM y lista de caracteres
+        """
         user_data = {
             'tipo_documento': '',
             'numero_documento': '',
@@ -105,149 +449,64 @@ class OCRProcessor:
             'area': ''
         }
         
-        # Extraer datos usando expresiones regulares y patrones
-        user_data['tipo_documento'] = self._extract_doc_type(text)
-        user_data['numero_documento'] = self._extract_doc_number(text)
-        user_data['nombre_completo'] = self._extract_name(text)
-        user_data['email'] = self._extract_email(text)
-        user_data['rol'] = self._extract_role(text)
-        user_data['area'] = self._extract_area(text)
+        for field, spec in template.fields.items():
+            region = crop_box(processed_img, spec['box'])
+            if region.size == 0:
+                continue
+            text = self.engine.image_to_string(
+                region, psm=spec['psm'], whitelist=spec['whitelist']
+            )
+            user_data[field] = self._normalize_field(field, text)
         
         return user_data
     
-    def _extract_doc_type(self, text):
-        """Extraer tipo de documento"""
-        # Patrones comunes
-        patterns = [
-            r'tipo\s*(?:de\s*)?documento[:\s]*([A-Z]{2,4})',
-            r'\b(CC|CE|TI|PA|DNI|RUC|NIT)\b',
-            r'(?:Cédula|Cedula|Pasaporte|Tarjeta)[:\s]*([A-Za-z\s]+)',
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                doc_type = match.group(1).strip().upper()
-                # Normalizar tipos comunes
-                type_mapping = {
-                    'CEDULA': 'CC',
-                    'CÉDULA': 'CC',
-                    'CEDULA DE CIUDADANIA': 'CC',
-                    'CÉDULA DE CIUDADANÍA': 'CC',
-                    'PASAPORTE': 'PA',
-                    'TARJETA DE IDENTIDAD': 'TI',
-                }
-                return type_mapping.get(doc_type, doc_type)
+    def _normalize_field(self, field, text):
+        """Normalizar el texto leído de la caja de un campo"""
+        text = ' '.join(text.split())
         
-        return ''
-    
-    def _extract_doc_number(self, text):
-        """Extraer número de documento"""
-        # Patrones para números de documento
-        patterns = [
-            r'(?:número|numero|n°|no\.?|#)[:\s]*([0-9]{6,15})',
-            r'documento[:\s]*([0-9]{6,15})',
-            r'\b([0-9]{8,12})\b',  # Números largos probables
-        ]
+        if field == 'tipo_documento':
+            return normalize_doc_type(text)
         
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                number = match.group(1).strip()
-                # Validar que sea numérico
-                if number.isdigit() and 6 <= len(number) <= 15:
-                    return number
+        if field == 'numero_documento':
+            number = re.sub(r'\D', '', text)
+            return number if 6 <= len(number) <= 15 else ''
         
-        return ''
-    
-    def _extract_name(self, text):
-        """Extraer nombre completo"""
-        # Patrones para nombre
-        patterns = [
-            r'nombre\s*(?:completo)?[:\s]*([A-ZÁÉÍÓÚÑ][a-záéíóúñ]+(?:\s+[A-ZÁÉÍÓÚÑ][a-záéíóúñ]+)+)',
-            r'(?:Sr\.|Sra\.|Srta\.)\s+([A-ZÁÉÍÓÚÑ][a-záéíóúñ]+(?:\s+[A-ZÁÉÍÓÚÑ][a-záéíóúñ]+)+)',
-            r'^([A-ZÁÉÍÓÚÑ][a-záéíóúñ]+(?:\s+[A-ZÁÉÍÓÚÑ][a-záéíóúñ]+){2,4})',  # Nombre al inicio
-        ]
+        if field == 'nombre_completo':
+            return text.title() if len(text.split()) >= 2 else ''
         
-        for pattern in patterns:
-            match = re.search(pattern, text, re.MULTILINE | re.IGNORECASE)
-            if match:
-                name = match.group(1).strip()
-                # Validar que tenga al menos 2 palabras
-                if len(name.split()) >= 2:
-                    return name.title()
+        if field == 'email':
+            match = EMAIL_REGEX.search(text.replace(' ', ''))
+            return match.group(1).lower() if match else ''
         
-        return ''
-    
-    def _extract_email(self, text):
-        """Extraer email"""
-        # Patrón estándar de email
-        pattern = r'\b([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})\b'
+        if field == 'rol':
+            return normalize_role(text)
         
-        match = re.search(pattern, text)
-        if match:
-            return match.group(1).lower()
+        if field == 'area':
+            return normalize_area(text)
         
-        return ''
+        return text
     
-    def _extract_role(self, text):
-        """Extraer rol o perfil"""
-        # Patrones para rol
-        patterns = [
-            r'(?:rol|perfil|cargo|puesto)[:\s]*([A-Za-záéíóúñÁÉÍÓÚÑ\s]+?)(?:\n|$|Área|Area)',
-            r'(?:administrador|usuario|operador|supervisor|gerente|analista|desarrollador)',
-        ]
-        
-        # Lista de roles comunes
-        common_roles = [
-            'Administrador', 'Usuario', 'Operador', 'Supervisor', 
-            'Gerente', 'Analista', 'Desarrollador', 'Coordinador',
-            'Asistente', 'Director', 'Jefe', 'Líder', 'Especialista'
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                role = match.group(0 if 'administrador' in pattern else 1).strip()
-                
-                # Buscar coincidencia con roles comunes
-                for common_role in common_roles:
-                    if common_role.lower() in role.lower():
-                        return common_role
-                
-                return role.title()
-        
-        return ''
+    def config_signature(self):
+        """Configuración de preprocesamiento, motor y Tesseract que afecta al resultado"""
+        templates = self.templates.signature() if self.templates else 'sin_plantillas'
+        return (
+            f"{self.pipeline.signature()}|"
+            f"motor:{self.engine.name} {self.engine.version}|"
+            f"--oem {self.engine.oem} --psm {self.engine.psm} -l {self.engine.lang}|"
+            f"plantillas:{templates}"
+        )
     
-    def _extract_area(self, text):
-        """Extraer área o departamento"""
-        # Patrones para área
-        patterns = [
-            r'(?:área|area|departamento|dpto\.?)[:\s]*([A-Za-záéíóúñÁÉÍÓÚÑ\s]+?)(?:\n|$)',
-            r'(?:Ventas|Marketing|TI|Sistemas|RRHH|Finanzas|Operaciones|Logística|Contabilidad)',
-        ]
-        
-        # Áreas comunes
-        common_areas = [
-            'Ventas', 'Marketing', 'TI', 'Sistemas', 'Tecnología',
-            'RRHH', 'Recursos Humanos', 'Finanzas', 'Contabilidad',
-            'Operaciones', 'Logística', 'Producción', 'Administración',
-            'Legal', 'Compras', 'Soporte'
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                area = match.group(0 if 'Ventas' in pattern else 1).strip()
-                
-                # Buscar coincidencia con áreas comunes
-                for common_area in common_areas:
-                    if common_area.lower() in area.lower():
-                        return common_area
-                
-                return area.title()
-        
-        return ''
+    def cache_stats(self):
+        """Obtener contadores de la caché OCR (None si está desactivada)"""
+        if self.cache is None:
+            return None
+        return self.cache.stats()
+    
+    def close(self):
+        """Liberar el motor OCR y la caché"""
+        self.engine.close()
+        if self.cache is not None:
+            self.cache.close()
 
 
 # Función de prueba
@@ -261,6 +520,7 @@ if __name__ == "__main__":
         ocr = OCRProcessor()
         print("✅ OCRProcessor inicializado correctamente")
         print(f"✅ Tesseract versión: {pytesseract.get_tesseract_version()}")
+        print(f"✅ Motor OCR: {ocr.engine.name}")
         
         # Simular texto extraído
         sample_text = """
@@ -278,13 +538,14 @@ if __name__ == "__main__":
         print(sample_text)
         print("\n" + "="*60 + "\n")
         
-        print("Datos que serían extraídos:")
-        print("- Tipo Doc: CC")
-        print("- Número: 1234567890")
-        print("- Nombre: Juan Carlos Pérez Rodríguez")
-        print("- Email: juan.perez@empresa.com")
-        print("- Rol: Administrador")
-        print("- Área: Tecnología")
+        print("Datos extraídos:")
+        extracted = extract_fields(sample_text)
+        print(f"- Tipo Doc: {extracted['tipo_documento']}")
+        print(f"- Número: {extracted['numero_documento']}")
+        print(f"- Nombre: {extracted['nombre_completo']}")
+        print(f"- Email: {extracted['email']}")
+        print(f"- Rol: {extracted['rol']}")
+        print(f"- Área: {extracted['area']}")
         
         print("\n✅ Todo funcionando correctamente")
         
@@ -0,0 +1,548 @@
+"""
+Réplica local de las pantallas de SAVIA para pruebas y benchmarks
+Servidor HTTP (solo biblioteca estándar) con las mismas pantallas y selectores
+que usa web_automation.py:
+
+- /savia/ y /savia/login.faces: login (Usuario, Contraseña, Ingresar)
+- /savia/admin/usuarios.faces: búsqueda (#search-user), tabla de usuarios
+  (.btn-edit, .btn-deactivate, .btn-activate), formulario de edición
+  (#user-role, #btn-save, #btn-cancel), modal de confirmación (#confirm-deactivate) y
+  mensaje .alert-success
+- Formularios con javax.faces.ViewState y sesión por cookie JSESSIONID que
+  vence por inactividad (vuelve a mostrar el login, como SAVIA)
+- Envíos del formulario de usuarios por AJAX (Faces-Request: partial/ajax,
+  respuesta <partial-response> que reemplaza el contenido), o con POST completo
+  usando --sin-ajax
+- Hoja de estilos, fuente e imagen en cada página
+
+Los usuarios viven en memoria; la latencia de cada respuesta es configurable.
+
+Uso:
+    python savia_standin.py                  # http://127.0.0.1:8090/savia
+    python savia_standin.py -p 8091 --latencia 100 --usuarios 500
+    python savia_standin.py --sin-ajax       # POST completos (sin JSF AJAX)
+
+    PLATFORM_URL=http://127.0.0.1:8090/savia python web_batch.py retiros.csv
+"""
+
+import argparse
+import html
+import secrets
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+BASE_PATH = '/savia'
+
+ROLES = [
+    'Analista',
+    'Auxiliar administrativo',
+    'Coordinador',
+    'Médico auditor',
+    'Administrador',
+]
+
+NOMBRES = ['JUAN', 'MARIA', 'ANDRES', 'LUISA', 'CARLOS', 'ANA', 'PEDRO', 'SOFIA']
+APELLIDOS = ['PEREZ', 'GOMEZ', 'RODRIGUEZ', 'TORRES', 'RAMIREZ', 'CASTRO', 'ROJAS']
+
+# ViewState válidos que se guardan por sesión (los más recientes)
+VIEW_STATES_PER_SESSION = 20
+
+STYLESHEET = """
+@font-face { font-family: 'Savia'; src: url('fuente.woff2') format('woff2'); }
+body { font-family: 'Savia', sans-serif; margin: 2em; }
+table { border-collapse: collapse; }
+td, th { border: 1px solid #ccc; padding: 4px 8px; }
+.alert-success { background: #dff0d8; padding: 8px; }
+.alert-error { background: #f2dede; padding: 8px; }
+#modal { position: fixed; top: 30%; left: 40%; background: #fff; border: 1px solid #333; padding: 1em; }
+"""
+
+# Funciones de la página de usuarios (el contenido se reemplaza por AJAX, los
+# scripts del documento se mantienen)
+PAGE_SCRIPT = """
+function confirmarDesactivar(documento) {
+  document.getElementById('confirm-deactivate').value = documento;
+  document.getElementById('modal').style.display = 'block';
+}
+"""
+
+# Envío del formulario de usuarios como petición JSF AJAX
+AJAX_SCRIPT = """
+document.addEventListener('submit', async function (event) {
+  const form = event.target;
+  if (form.id !== 'usuarios') return;
+  event.preventDefault();
+  const data = new URLSearchParams(new FormData(form));
+  if (event.submitter && event.submitter.name) {
+    data.append(event.submitter.name, event.submitter.value);
+  }
+  data.append('javax.faces.partial.ajax', 'true');
+  const response = await fetch(form.action, {
+    method: 'POST',
+    body: data,
+    headers: {'Faces-Request': 'partial/ajax'}
+  });
+  const xml = new DOMParser().parseFromString(await response.text(), 'application/xml');
+  const redirect = xml.querySelector('redirect');
+  if (redirect) {
+    window.location = redirect.getAttribute('url');
+    return;
+  }
+  const update = xml.querySelector('update');
+  if (!update) {
+    document.body.insertAdjacentHTML('afterbegin', '<div class="alert-error">Error ' + response.status + '</div>');
+    return;
+  }
+  const holder = document.createElement('div');
+  holder.innerHTML = update.textContent;
+  document.getElementById(update.getAttribute('id')).replaceWith(holder.firstElementChild);
+});
+"""
+
+# PNG de 1x1 (la imagen del encabezado)
+PIXEL_PNG = bytes.fromhex(
+    '89504e470d0a1a0a0000000d4948445200000001000000010806000000'
+    '1f15c4890000000d49444154789c6360000002000100e221bc330000000049454e44ae426082'
+)
+
+
+def generate_users(count):
+    """Usuarios de prueba: documento → usuario (documentos 1000001 en adelante)"""
+    users = {}
+    for idx in range(1, count + 1):
+        documento = str(1_000_000 + idx)
+        users[documento] = {
+            'documento': documento,
+            'nombre': f"{NOMBRES[idx % len(NOMBRES)]} {APELLIDOS[idx % len(APELLIDOS)]}",
+            'rol': ROLES[idx % len(ROLES)],
+            'activo': True,
+        }
+    return users
+
+
+class SaviaStandin:
+    def __init__(self, host='127.0.0.1', port=8090, latency=0.05, users=200,
+                 session_timeout=1800, resource_latency=None, ajax=True):
+        """
+        Args:
+            host (str): Interfaz donde escuchar
+            port (int): Puerto (0 = uno libre)
+            latency (float): Segundos de espera antes de cada página
+            users (int): Usuarios de prueba
+            session_timeout (float): Segundos de inactividad antes de vencer la sesión
+            resource_latency (float): Segundos de espera de estilos, fuentes e
+                                      imágenes (por defecto, la misma latencia)
+            ajax (bool): Enviar el formulario de usuarios por JSF AJAX
+        """
+        self.latency = latency
+        self.ajax = ajax
+        self.resource_latency = latency if resource_latency is None else resource_latency
+        self.session_timeout = session_timeout
+        self.users = generate_users(users)
+        self.lock = threading.Lock()
+
+        # JSESSIONID → {'last_seen': ..., 'view_states': [...]}
+        self.sessions = {}
+
+        # Contadores
+        self.requests = 0
+        self.page_requests = 0
+        self.resource_requests = 0
+        self.logins = 0
+        self.expired_views = 0
+
+        standin = self
+
+        class Handler(_Handler):
+            app = standin
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}{BASE_PATH}"
+
+    def start(self):
+        """Atender peticiones en un hilo en segundo plano"""
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def expire_sessions(self):
+        """Vencer todas las sesiones (para probar el re-login)"""
+        with self.lock:
+            self.sessions.clear()
+
+    def get_user(self, documento):
+        with self.lock:
+            user = self.users.get(documento)
+            return dict(user) if user else None
+
+    def stats(self):
+        """Peticiones atendidas y sesiones activas"""
+        with self.lock:
+            return {
+                'requests': self.requests,
+                'page_requests': self.page_requests,
+                'resource_requests': self.resource_requests,
+                'logins': self.logins,
+                'expired_views': self.expired_views,
+                'sessions': len(self.sessions)
+            }
+
+    # ============================================
+    # SESIONES Y VIEWSTATE
+    # ============================================
+    def session(self, session_id):
+        """Sesión vigente (None si no existe o venció)"""
+        with self.lock:
+            session = self.sessions.get(session_id)
+            if session is None:
+                return None
+            if time.monotonic() - session['last_seen'] > self.session_timeout:
+                del self.sessions[session_id]
+                return None
+            session['last_seen'] = time.monotonic()
+            return session
+
+    def create_session(self):
+        session_id = secrets.token_hex(16)
+        with self.lock:
+            self.sessions[session_id] = {'last_seen': time.monotonic(), 'view_states': []}
+            self.logins += 1
+        return session_id
+
+    def new_view_state(self, session):
+        token = secrets.token_urlsafe(24)
+        with self.lock:
+            session['view_states'].append(token)
+            del session['view_states'][:-VIEW_STATES_PER_SESSION]
+        return token
+
+    def check_view_state(self, session, token):
+        with self.lock:
+            if token in session['view_states']:
+                return True
+            self.expired_views += 1
+            return False
+
+
+class _Handler(BaseHTTPRequestHandler):
+    app = None
+
+    def log_message(self, format, *args):
+        pass
+
+    # ============================================
+    # PETICIONES
+    # ============================================
+    def do_GET(self):
+        self._count()
+        path = urlsplit(self.path).path
+
+        if path.startswith(f"{BASE_PATH}/recursos/"):
+            return self._resource(path.rsplit('/', 1)[-1])
+
+        self._page_delay()
+        if path in (BASE_PATH, f"{BASE_PATH}/", f"{BASE_PATH}/login.faces"):
+            return self._send_page(self._login_page())
+
+        session = self._session()
+        if session is None:
+            return self._send_page(self._login_page())
+
+        if path == f"{BASE_PATH}/inicio.faces":
+            return self._send_page(self._home_page())
+        if path == f"{BASE_PATH}/admin/usuarios.faces":
+            return self._send_page(self._layout('Usuarios', self._users_content(session)))
+        self._send(404, 'text/plain', b'No encontrado')
+
+    def do_POST(self):
+        self._count()
+        self._page_delay()
+        path = urlsplit(self.path).path
+        length = int(self.headers.get('Content-Length') or 0)
+        form = {
+            key: values[0]
+            for key, values in parse_qs(self.rfile.read(length).decode('utf-8')).items()
+        }
+
+        if path == f"{BASE_PATH}/login.faces":
+            if not form.get('login:usuario') or not form.get('login:clave'):
+                return self._send_page(self._login_page('Usuario o contraseña incorrectos'))
+            session_id = self.app.create_session()
+            self.send_response(303)
+            self.send_header('Location', f"{BASE_PATH}/inicio.faces")
+            self.send_header('Set-Cookie', f"JSESSIONID={session_id}; Path={BASE_PATH}; HttpOnly")
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        ajax = self.headers.get('Faces-Request') == 'partial/ajax'
+        session = self._session()
+        if session is None:
+            if ajax:
+                return self._send_partial(f'<redirect url="{BASE_PATH}/login.faces"/>')
+            return self._send_page(self._login_page())
+
+        if path == f"{BASE_PATH}/admin/usuarios.faces":
+            if not self.app.check_view_state(session, form.get('javax.faces.ViewState')):
+                return self._send_page(self._view_expired_page(), status=500)
+            content = self._users_action(session, form)
+            if ajax:
+                return self._send_partial(
+                    f'<changes><update id="contenido"><![CDATA[{content}]]></update></changes>'
+                )
+            return self._send_page(self._layout('Usuarios', content))
+        self._send(404, 'text/plain', b'No encontrado')
+
+    def _users_action(self, session, form):
+        """Atender el formulario de usuarios (búsqueda, edición y estado)"""
+        app = self.app
+        search = form.get('usuarios:buscar', '').strip()
+
+        if 'usuarios:editar' in form:
+            user = app.get_user(form['usuarios:editar'])
+            if user is None:
+                return self._users_content(session, search, error='Usuario no encontrado')
+            return self._edit_content(session, user)
+
+        if 'usuarios:guardar' in form:
+            documento = form['usuarios:guardar']
+            rol = form.get('usuarios:rol', '')
+            with app.lock:
+                user = app.users.get(documento)
+                if user is not None and rol in ROLES:
+                    user['rol'] = rol
+            if user is None or rol not in ROLES:
+                return self._users_content(session, documento, error='No se pudo guardar el rol')
+            return self._users_content(session, documento, message='Rol actualizado correctamente')
+
+        for field, activo, message in (
+            ('usuarios:desactivar', False, 'Usuario desactivado correctamente'),
+            ('usuarios:activar', True, 'Usuario activado correctamente'),
+        ):
+            if field in form:
+                documento = form[field]
+                with app.lock:
+                    user = app.users.get(documento)
+                    if user is not None:
+                        user['activo'] = activo
+                if user is None:
+                    return self._users_content(session, search, error='Usuario no encontrado')
+                return self._users_content(session, documento, message=message)
+
+        return self._users_content(session, search)
+
+    # ============================================
+    # PÁGINAS
+    # ============================================
+    def _layout(self, title, body):
+        return f"""<!DOCTYPE html>
+<html lang="es">
+<head>
+<meta charset="utf-8">
+<title>{title} - SAVIA</title>
+<link rel="stylesheet" href="{BASE_PATH}/recursos/estilo.css">
+</head>
+<body>
+<header><img src="{BASE_PATH}/recursos/logo.png" alt="SAVIA" width="120" height="40"></header>
+{body}
+<script>{PAGE_SCRIPT}{AJAX_SCRIPT if self.app.ajax else ''}</script>
+</body>
+</html>"""
+
+    def _login_page(self, error=''):
+        error_html = f'<div class="alert-error">{html.escape(error)}</div>' if error else ''
+        return self._layout('Ingreso', f"""
+<h1>Ingreso a SAVIA</h1>
+{error_html}
+<form id="login" method="post" action="{BASE_PATH}/login.faces">
+  <label for="login:usuario">Usuario</label>
+  <input type="text" id="login:usuario" name="login:usuario">
+  <label for="login:clave">Contraseña</label>
+  <input type="password" id="login:clave" name="login:clave">
+  <button type="submit">Ingresar</button>
+</form>""")
+
+    def _home_page(self):
+        return self._layout('Inicio', f"""
+<h1>Bienvenido</h1>
+<nav><a href="{BASE_PATH}/admin/usuarios.faces">Usuarios</a></nav>""")
+
+    def _view_expired_page(self):
+        return self._layout('Error', """
+<h1>javax.faces.application.ViewExpiredException</h1>
+<p>La vista ya no es válida. Vuelva a cargar la página.</p>""")
+
+    def _users_content(self, session, search='', message='', error=''):
+        rows = []
+        if search:
+            with self.app.lock:
+                found = [
+                    dict(user) for user in self.app.users.values()
+                    if search in user['documento'] or search.upper() in user['nombre']
+                ][:50]
+            for user in found:
+                documento = html.escape(user['documento'])
+                if user['activo']:
+                    state_button = (
+                        f'<button type="button" class="btn-deactivate" '
+                        f'onclick="confirmarDesactivar(\'{documento}\')">Desactivar</button>'
+                    )
+                else:
+                    state_button = (
+                        f'<button type="submit" class="btn-activate" '
+                        f'name="usuarios:activar" value="{documento}">Activar</button>'
+                    )
+                rows.append(
+                    f"<tr><td>{documento}</td><td>{html.escape(user['nombre'])}</td>"
+                    f"<td>{html.escape(user['rol'])}</td>"
+                    f"<td>{'Activo' if user['activo'] else 'Inactivo'}</td>"
+                    f'<td><button type="submit" class="btn-edit" name="usuarios:editar" '
+                    f'value="{documento}">Editar</button> {state_button}</td></tr>'
+                )
+            if not found:
+                rows.append('<tr class="sin-resultados"><td colspan="5">No se encontraron registros</td></tr>')
+
+        alerts = ''
+        if message:
+            alerts += f'<div class="alert-success">{html.escape(message)}</div>'
+        if error:
+            alerts += f'<div class="alert-error">{html.escape(error)}</div>'
+
+        view_state = self.app.new_view_state(session)
+        return f"""<main id="contenido">
+<h1>Gestión de usuarios</h1>
+{alerts}
+<form id="usuarios" method="post" action="{BASE_PATH}/admin/usuarios.faces">
+  <input type="hidden" name="javax.faces.ViewState" value="{view_state}">
+  <input type="text" id="search-user" name="usuarios:buscar" value="{html.escape(search)}"
+         placeholder="Buscar usuario">
+  <button type="submit" id="btn-search">Buscar</button>
+  <table id="tabla-usuarios">
+    <thead><tr><th>Documento</th><th>Nombre</th><th>Rol</th><th>Estado</th><th></th></tr></thead>
+    <tbody>{''.join(rows)}</tbody>
+  </table>
+  <div id="modal" style="display: none">
+    <p>¿Desactivar el usuario?</p>
+    <button type="submit" id="confirm-deactivate" name="usuarios:desactivar" value="">Confirmar</button>
+  </div>
+</form>
+</main>"""
+
+    def _edit_content(self, session, user):
+        options = ''.join(
+            f'<option{" selected" if rol == user["rol"] else ""}>{html.escape(rol)}</option>'
+            for rol in ROLES
+        )
+        view_state = self.app.new_view_state(session)
+        documento = html.escape(user['documento'])
+        return f"""<main id="contenido">
+<h1>Editar usuario {documento}</h1>
+<form id="usuarios" method="post" action="{BASE_PATH}/admin/usuarios.faces">
+  <input type="hidden" name="javax.faces.ViewState" value="{view_state}">
+  <p>{html.escape(user['nombre'])}</p>
+  <label for="user-role">Rol</label>
+  <select id="user-role" name="usuarios:rol">{options}</select>
+  <button type="submit" id="btn-save" name="usuarios:guardar" value="{documento}">Guardar</button>
+  <button type="submit" id="btn-cancel" name="usuarios:volver">Volver</button>
+</form>
+</main>"""
+
+    # ============================================
+    # RESPUESTAS
+    # ============================================
+    def _count(self):
+        with self.app.lock:
+            self.app.requests += 1
+
+    def _page_delay(self):
+        with self.app.lock:
+            self.app.page_requests += 1
+        if self.app.latency:
+            time.sleep(self.app.latency)
+
+    def _session(self):
+        for part in (self.headers.get('Cookie') or '').split(';'):
+            name, _, value = part.strip().partition('=')
+            if name == 'JSESSIONID':
+                return self.app.session(value)
+        return None
+
+    def _resource(self, name):
+        with self.app.lock:
+            self.app.resource_requests += 1
+        if self.app.resource_latency:
+            time.sleep(self.app.resource_latency)
+
+        if name == 'estilo.css':
+            return self._send(200, 'text/css', STYLESHEET.encode('utf-8'), cache=True)
+        if name == 'logo.png':
+            return self._send(200, 'image/png', PIXEL_PNG, cache=True)
+        if name == 'fuente.woff2':
+            return self._send(200, 'font/woff2', b'\0' * 2048, cache=True)
+        self._send(404, 'text/plain', b'No encontrado')
+
+    def _send_partial(self, changes):
+        """Respuesta JSF AJAX (partial-response)"""
+        body = f'<?xml version="1.0" encoding="UTF-8"?>\n<partial-response>{changes}</partial-response>'
+        self._send(200, 'text/xml; charset=utf-8', body.encode('utf-8'))
+
+    def _send_page(self, content, status=200):
+        self._send(status, 'text/html; charset=utf-8', content.encode('utf-8'))
+
+    def _send(self, status, content_type, body, cache=False):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Cache-Control', 'max-age=3600' if cache else 'no-store')
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Réplica local de las pantallas de SAVIA")
+    parser.add_argument('-p', '--puerto', type=int, default=8090, help="Puerto")
+    parser.add_argument('--latencia', type=float, default=50,
+                        help="Milisegundos de espera por página")
+    parser.add_argument('--usuarios', type=int, default=200, help="Usuarios de prueba")
+    parser.add_argument('--sesion', type=float, default=1800,
+                        help="Segundos de inactividad antes de vencer la sesión")
+    parser.add_argument('--sin-ajax', action='store_true',
+                        help="Enviar el formulario de usuarios con POST completos")
+    args = parser.parse_args(argv)
+
+    standin = SaviaStandin(port=args.puerto, latency=args.latencia / 1000,
+                           users=args.usuarios, session_timeout=args.sesion,
+                           ajax=not args.sin_ajax)
+    print(f"🌐 Réplica de SAVIA en {standin.url}")
+    print(f"👥 {len(standin.users)} usuarios (documentos 1000001 a {1_000_000 + len(standin.users)})")
+    print("   Ctrl+C para detener")
+    try:
+        standin.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        standin.server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
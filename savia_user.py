@@ -0,0 +1,150 @@
+"""
+Representación compacta de usuarios de SAVIA
+Para lecturas grandes (búsquedas masivas, recorridos de toda la tabla) un
+diccionario de 17 claves por usuario ocupa mucha memoria. SaviaUser guarda
+los mismos campos en __slots__ (sin diccionario por instancia) y
+SaviaUserBatch guarda un bloque de usuarios por columnas (una lista por campo).
+
+Ambos tienen to_dict() / to_dicts() con el mismo formato que
+DatabaseHandler._map_savia_user_to_standard, para la interfaz gráfica.
+"""
+
+# Campo del usuario → (columna de gn_usuarios, valor por defecto)
+# (mismo mapeo que DatabaseHandler._map_savia_user_to_standard)
+FIELD_SOURCES = {
+    'id': ('id', None),
+    'tipo_documento': ('mae_tipo_documento_codigo', ''),
+    'numero_documento': ('documento', ''),
+    'nombre_completo': ('nombre', ''),
+    'email': ('correo_electronico', ''),
+    'usuario': ('usuario', ''),
+    'rol': ('mae_cargo_valor', 'Sin cargo'),
+    'area': ('mae_area_valor', 'Sin área'),
+    'estado': ('activo', None),
+    'fecha_creacion': ('fecha_hora_crea', None),
+    'fecha_modificacion': ('fecha_hora_modifica', None),
+    'telefono': ('telefono', None),
+    'celular': ('celular', None),
+    'empresa_id': ('gn_empresas_id', None),
+    'grupo_id': ('au_grupos_id', None),
+    'bloqueado': ('bloqueado', None),
+    'fecha_ultimo_ingreso': ('fecha_ultimo_ingreso', None),
+}
+
+FIELDS = tuple(FIELD_SOURCES)
+
+# Campos que se copian tal cual (todos menos los bit(1))
+_PLAIN_SOURCES = tuple(
+    (field, column, default)
+    for field, (column, default) in FIELD_SOURCES.items()
+    if field not in ('estado', 'bloqueado')
+)
+
+_BIT_FALSE = (None, 0, b'\x00', bytearray(b'\x00'), False)
+
+
+def _bit(value):
+    """bit(1) de MySQL → bool (None se conserva)"""
+    if value is None:
+        return None
+    return value not in _BIT_FALSE
+
+
+def _estado(activo):
+    return 'inactivo' if activo in _BIT_FALSE else 'activo'
+
+
+class SaviaUser:
+    __slots__ = FIELDS
+
+    def __init__(self, *values, **fields):
+        """
+        SaviaUser(id, tipo_documento, ...) en el orden de FIELDS o por nombre
+        """
+        for field, value in zip(FIELDS, values):
+            setattr(self, field, value)
+        for field in FIELDS[len(values):]:
+            setattr(self, field, fields.get(field))
+
+    @classmethod
+    def from_row(cls, row):
+        """Crear desde una fila de gn_usuarios (dict del cursor)"""
+        # Asignaciones explícitas: un bucle con setattr es más lento que el dict
+        get = row.get
+        user = cls.__new__(cls)
+        user.id = get('id')
+        user.tipo_documento = get('mae_tipo_documento_codigo', '')
+        user.numero_documento = get('documento', '')
+        user.nombre_completo = get('nombre', '')
+        user.email = get('correo_electronico', '')
+        user.usuario = get('usuario', '')
+        user.rol = get('mae_cargo_valor', 'Sin cargo')
+        user.area = get('mae_area_valor', 'Sin área')
+        user.estado = 'inactivo' if get('activo') in _BIT_FALSE else 'activo'
+        user.fecha_creacion = get('fecha_hora_crea')
+        user.fecha_modificacion = get('fecha_hora_modifica')
+        user.telefono = get('telefono')
+        user.celular = get('celular')
+        user.empresa_id = get('gn_empresas_id')
+        user.grupo_id = get('au_grupos_id')
+        bloqueado = get('bloqueado')
+        user.bloqueado = None if bloqueado is None else bloqueado not in _BIT_FALSE
+        user.fecha_ultimo_ingreso = get('fecha_ultimo_ingreso')
+        return user
+
+    def to_dict(self):
+        """Formato de diccionario estándar (el de la interfaz gráfica)"""
+        return {field: getattr(self, field) for field in FIELDS}
+
+    def __eq__(self, other):
+        if not isinstance(other, SaviaUser):
+            return NotImplemented
+        return all(getattr(self, field) == getattr(other, field) for field in FIELDS)
+
+    def __repr__(self):
+        return f"SaviaUser(id={self.id!r}, numero_documento={self.numero_documento!r}, nombre_completo={self.nombre_completo!r})"
+
+
+class SaviaUserBatch:
+    def __init__(self, columns=None):
+        """
+        Bloque de usuarios por columnas
+
+        Args:
+            columns (dict): Campo → lista de valores (todas del mismo largo)
+        """
+        self.columns = columns or {field: [] for field in FIELDS}
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Crear desde filas de gn_usuarios (dicts del cursor)"""
+        if not isinstance(rows, list):
+            rows = list(rows)
+
+        columns = {
+            field: [row.get(column, default) for row in rows]
+            for field, column, default in _PLAIN_SOURCES
+        }
+        columns['estado'] = [_estado(row.get('activo')) for row in rows]
+        columns['bloqueado'] = [_bit(row.get('bloqueado')) for row in rows]
+        return cls(columns)
+
+    def column(self, field):
+        """Todos los valores de un campo"""
+        return self.columns[field]
+
+    def __len__(self):
+        return len(self.columns['id'])
+
+    def __getitem__(self, index):
+        """Usuario en una posición (como SaviaUser)"""
+        return SaviaUser(**{field: values[index] for field, values in self.columns.items()})
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def to_dicts(self):
+        """Lista de usuarios en formato de diccionario estándar"""
+        columns = [self.columns[field] for field in FIELDS]
+        return [dict(zip(FIELDS, values)) for values in zip(*columns)]
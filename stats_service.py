@@ -0,0 +1,355 @@
+"""
+Servicio de estadísticas de usuarios
+get_statistics recorre toda gn_usuarios en cada llamada. Este servicio guarda
+el resultado durante DB_STATS_TTL segundos y lo calcula con una sola consulta
+agrupada (área, cargo, activo), de la que salen los totales y los desgloses
+por área y por cargo.
+
+Modo incremental (DB_STATS_INCREMENTAL=true): guarda área, cargo y estado de
+cada usuario (id) y al vencer el TTL solo lee los usuarios modificados desde la
+última actualización (feed de cambios). Cada DB_STATS_FULL_REFRESH segundos se
+recalcula todo para reflejar usuarios borrados.
+
+Los grupos se arman como los arma MySQL con una collation *_ci: sin distinguir
+mayúsculas, tildes ni espacios al final ('Activo' y 'activo' son el mismo
+cargo). Cada grupo se muestra con el primer nombre leído.
+
+Cada actualización lee los datos actuales aunque la conexión de db sea la
+misma durante horas: las conexiones usan autocommit (db_pool.mysql_config).
+
+Uso:
+    python stats_service.py             # Estadísticas con desgloses
+    python stats_service.py -i 5 -n 10  # Consultar cada 5 s, 10 veces
+    python stats_service.py --replica   # Prueba sin MySQL (db_standin.py)
+"""
+
+import argparse
+import copy
+import os
+import sys
+import threading
+import time
+import unicodedata
+from collections import Counter
+from datetime import datetime
+
+from database_handler import CHANGE_MARK_START, STREAM_BATCH_SIZE
+
+# Nombre para los valores vacíos en los desgloses (como en el mapeo de usuarios)
+NO_AREA = 'Sin área'
+NO_CARGO = 'Sin cargo'
+
+
+def collation_key(value):
+    """Clave de comparación de un texto como la collation de MySQL (*_ci)"""
+    if value is None:
+        return None
+    text = unicodedata.normalize('NFD', str(value))
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return text.casefold().rstrip(' ')
+
+
+class StatisticsService:
+    def __init__(self, db, ttl=None, incremental=None, full_refresh_interval=None):
+        """
+        Args:
+            db (DatabaseHandler): Conexión a SAVIA
+            ttl (float): Segundos de validez del resultado (DB_STATS_TTL, 30)
+            incremental (bool): Actualizar solo con los usuarios modificados
+                                (DB_STATS_INCREMENTAL, false)
+            full_refresh_interval (float): Segundos entre recálculos completos en
+                                           modo incremental (DB_STATS_FULL_REFRESH, 3600)
+        """
+        if ttl is None:
+            ttl = float(os.getenv('DB_STATS_TTL', 30))
+        if incremental is None:
+            incremental = os.getenv('DB_STATS_INCREMENTAL', 'false').lower() in ('1', 'true', 'yes', 'si')
+        if full_refresh_interval is None:
+            full_refresh_interval = float(os.getenv('DB_STATS_FULL_REFRESH', 3600))
+
+        self.db = db
+        self.ttl = ttl
+        self.incremental = incremental
+        self.full_refresh_interval = full_refresh_interval
+        self.lock = threading.Lock()
+
+        # (clave de área, clave de cargo, activo) → número de usuarios
+        self.groups = Counter()
+        # ('area' | 'cargo', clave) → nombre a mostrar (el primero leído)
+        self.names = {}
+        self.result = None
+        self.updated_at = 0.0
+        self.full_at = 0.0
+
+        # Solo modo incremental: id → (área, cargo, activo) y marca del feed
+        self.index = {}
+        self.mark = None
+
+        # Contadores
+        self.hits = 0
+        self.full_refreshes = 0
+        self.incremental_refreshes = 0
+        self.rows_applied = 0
+
+    def get_statistics(self):
+        """
+        Estadísticas de usuarios (desde la caché si no venció el TTL)
+
+        Returns:
+            dict: Las claves de DatabaseHandler.get_statistics más
+                  'por_area' y 'por_cargo' (nombre → total, activos, inactivos).
+                  Es una copia: modificarla no afecta la caché
+        """
+        with self.lock:
+            now = time.monotonic()
+            if self.result is not None and now - self.updated_at < self.ttl:
+                self.hits += 1
+                return copy.deepcopy(self.result)
+
+            if (self.incremental and self.mark is not None
+                    and now - self.full_at < self.full_refresh_interval):
+                self._apply_changes()
+            else:
+                self._full_refresh()
+
+            self.result = self._summarize()
+            self.updated_at = time.monotonic()
+            return copy.deepcopy(self.result)
+
+    def invalidate(self):
+        """Forzar el recálculo en la siguiente consulta"""
+        with self.lock:
+            self.result = None
+
+    def _activo(self, value):
+        """bit(1) → 1/0 (None se conserva, como en activo = 1 / activo = 0)"""
+        activo = self.db._convert_bit_to_bool(value)
+        return None if activo is None else int(activo)
+
+    def _group_key(self, row):
+        """(área, cargo, activo) de una fila, con área y cargo como claves de collation"""
+        area = collation_key(row['mae_area_valor'])
+        cargo = collation_key(row['mae_cargo_valor'])
+        if area is not None:
+            self.names.setdefault(('area', area), row['mae_area_valor'])
+        if cargo is not None:
+            self.names.setdefault(('cargo', cargo), row['mae_cargo_valor'])
+        return area, cargo, self._activo(row['activo'])
+
+    def _full_refresh(self):
+        """Recalcular todo con una consulta agrupada (o cargar el índice)"""
+        self.groups = Counter()
+        self.names = {}
+
+        if self.incremental:
+            self._load_index()
+        else:
+            query = f"""
+                SELECT
+                    mae_area_valor,
+                    mae_cargo_valor,
+                    activo,
+                    COUNT(*) as total
+                FROM {self.db.tabla_usuarios}
+                GROUP BY mae_area_valor, mae_cargo_valor, activo
+            """
+            for row in self.db.execute_query(query):
+                self.groups[self._group_key(row)] += row['total']
+
+        self.full_at = time.monotonic()
+        self.full_refreshes += 1
+
+    def _load_index(self):
+        """Leer área, cargo y estado de cada usuario y la marca del feed"""
+        marca = (
+            f"COALESCE(fecha_hora_modifica, fecha_hora_crea, "
+            f"CAST('{CHANGE_MARK_START}' AS DATETIME))"
+        )
+        query = f"""
+            SELECT
+                id,
+                mae_area_valor,
+                mae_cargo_valor,
+                activo,
+                {marca} as marca
+            FROM {self.db.tabla_usuarios}
+        """
+
+        self.index = {}
+        self.mark = None
+        for row in self.db.stream_query(query, batch_size=STREAM_BATCH_SIZE):
+            key = self._group_key(row)
+            self.index[row['id']] = key
+            self.groups[key] += 1
+
+            mark = (row['marca'], row['id'])
+            if self.mark is None or mark > self.mark:
+                self.mark = mark
+
+        if self.mark is None:
+            self.mark = (CHANGE_MARK_START, 0)
+
+    def _apply_changes(self):
+        """Aplicar solo los usuarios modificados desde la última marca"""
+        for row in self.db.iter_changed_rows(self.mark):
+            key = self._group_key(row)
+            previous = self.index.get(row['id'])
+            if previous is not None:
+                self.groups[previous] -= 1
+                if not self.groups[previous]:
+                    del self.groups[previous]
+            self.groups[key] += 1
+            self.index[row['id']] = key
+
+            self.mark = (row['marca'], row['id'])
+            self.rows_applied += 1
+
+        self.incremental_refreshes += 1
+
+    def _summarize(self):
+        """Totales y desgloses a partir de los grupos"""
+        totals = {'total_usuarios': 0, 'usuarios_activos': 0, 'usuarios_inactivos': 0}
+        por_area = {}
+        por_cargo = {}
+
+        for (area, cargo, activo), count in self.groups.items():
+            area_name = (self.names.get(('area', area)) if area else None) or NO_AREA
+            cargo_name = (self.names.get(('cargo', cargo)) if cargo else None) or NO_CARGO
+            for breakdown, name in ((por_area, area_name), (por_cargo, cargo_name)):
+                entry = breakdown.setdefault(name, {'total': 0, 'activos': 0, 'inactivos': 0})
+                entry['total'] += count
+                if activo == 1:
+                    entry['activos'] += count
+                elif activo == 0:
+                    entry['inactivos'] += count
+
+            totals['total_usuarios'] += count
+            if activo == 1:
+                totals['usuarios_activos'] += count
+            elif activo == 0:
+                totals['usuarios_inactivos'] += count
+
+        # Igual que COUNT(DISTINCT ...): sin contar los vacíos (NULL)
+        totals['total_cargos'] = len({cargo for _, cargo, _ in self.groups if cargo is not None})
+        totals['total_areas'] = len({area for area, _, _ in self.groups if area is not None})
+
+        by_total = lambda item: (-item[1]['total'], item[0])
+        totals['por_area'] = dict(sorted(por_area.items(), key=by_total))
+        totals['por_cargo'] = dict(sorted(por_cargo.items(), key=by_total))
+        return totals
+
+    def stats(self):
+        """Aciertos de caché y actualizaciones realizadas"""
+        with self.lock:
+            return {
+                'hits': self.hits,
+                'full_refreshes': self.full_refreshes,
+                'incremental_refreshes': self.incremental_refreshes,
+                'rows_applied': self.rows_applied,
+                'indexed_users': len(self.index)
+            }
+
+
+# Prueba contra la réplica (db_standin.py): los datos cambian entre dos
+# actualizaciones y se leen con la misma conexión
+def _replica_test():
+    from database_handler import DatabaseHandler
+    from db_standin import StandinDatabase
+
+    failures = []
+
+    def check(name, condition):
+        print(f"   {'✅' if condition else '❌'} {name}")
+        if not condition:
+            failures.append(name)
+
+    database = StandinDatabase(users=40)
+    try:
+        active = [row for row in database.users if row['activo']]
+        for incremental in (False, True):
+            mode = 'incremental' if incremental else 'completo'
+            db = DatabaseHandler(cache=False, mirror=False, connector=database.connect)
+            service = StatisticsService(db, ttl=0, incremental=incremental)
+
+            first = service.get_statistics()
+            user = active[incremental]
+            database.update(user['documento'], activo=0, mae_cargo_valor='Auditor externo',
+                            fecha_hora_modifica=datetime.now())
+            second = service.get_statistics()
+
+            check(f"{mode}: la segunda actualización ve el usuario desactivado",
+                  second['usuarios_activos'] == first['usuarios_activos'] - 1
+                  and second['usuarios_inactivos'] == first['usuarios_inactivos'] + 1)
+            check(f"{mode}: y su cargo nuevo",
+                  second['por_cargo'].get('Auditor externo', {}).get('total') == 1 + incremental)
+
+            # Otro cambio: la conexión ya leyó en la actualización anterior
+            database.update(active[2 + incremental]['documento'], activo=0,
+                            fecha_hora_modifica=datetime.now())
+            third = service.get_statistics()
+            check(f"{mode}: la tercera actualización ve el segundo cambio",
+                  third['usuarios_activos'] == second['usuarios_activos'] - 1)
+            if incremental:
+                check(f"{mode}: las dos últimas fueron incrementales (1 fila cada una)",
+                      service.stats()['incremental_refreshes'] == 2
+                      and service.stats()['rows_applied'] == 2)
+            db.disconnect()
+    finally:
+        database.close()
+
+    return 1 if failures else 0
+
+
+def main(argv=None):
+    from database_handler import DatabaseHandler
+
+    parser = argparse.ArgumentParser(description="Estadísticas de usuarios de SAVIA")
+    parser.add_argument('-i', '--intervalo', type=float, default=0,
+                        help="Segundos entre consultas (0 = una sola)")
+    parser.add_argument('-n', '--veces', type=int, default=1,
+                        help="Número de consultas")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Actualizar solo con los usuarios modificados")
+    parser.add_argument('--replica', action='store_true',
+                        help="Probar contra una réplica local (sin MySQL)")
+    args = parser.parse_args(argv)
+
+    if args.replica:
+        return _replica_test()
+
+    db = DatabaseHandler(cache=False, mirror=False)
+    service = StatisticsService(db, incremental=args.incremental or None)
+
+    try:
+        for attempt in range(args.veces):
+            if attempt:
+                time.sleep(args.intervalo)
+
+            start = time.perf_counter()
+            stats = service.get_statistics()
+            elapsed = (time.perf_counter() - start) * 1000
+
+            print(f"\n📊 {stats['total_usuarios']} usuarios "
+                  f"({stats['usuarios_activos']} activos, {stats['usuarios_inactivos']} inactivos) "
+                  f"en {elapsed:.1f} ms")
+
+        print(f"\nCargos: {stats['total_cargos']}   Áreas: {stats['total_areas']}")
+        print("\nPor área:")
+        for area, entry in list(stats['por_area'].items())[:10]:
+            print(f"   {area:<35} {entry['total']:>6} ({entry['activos']} activos)")
+        print("\nPor cargo:")
+        for cargo, entry in list(stats['por_cargo'].items())[:10]:
+            print(f"   {cargo:<35} {entry['total']:>6} ({entry['activos']} activos)")
+        print(f"\n{service.stats()}")
+
+    except Exception as e:
+        print(f"❌ Error: {str(e)}")
+        return 1
+    finally:
+        db.disconnect()
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
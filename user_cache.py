@@ -0,0 +1,175 @@
+"""
+Caché de consultas de usuarios de SAVIA (lectura a través de la caché)
+SAVIA es de solo lectura desde esta aplicación, así que las consultas repetidas
+del mismo usuario se responden desde memoria durante DB_CACHE_TTL segundos.
+
+Cada usuario se guarda una vez y se indexa por todas sus claves (id,
+documento, correo y usuario): buscarlo por documento llena también la entrada
+por correo o usuario. Las búsquedas sin resultado también se guardan, solo
+con la clave consultada.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# Claves por las que se indexa cada usuario (campo del usuario mapeado)
+USER_KEYS = {
+    'id': 'id',
+    'documento': 'numero_documento',
+    'correo': 'email',
+    'usuario': 'usuario',
+}
+
+
+def _normalize(value):
+    """Las claves no distinguen mayúsculas ni espacios (como la collation)"""
+    return str(value).strip().lower()
+
+
+class UserCache:
+    def __init__(self, ttl=None, max_entries=None):
+        """
+        Inicializar caché de usuarios
+
+        Args:
+            ttl (float): Segundos de validez de cada entrada (DB_CACHE_TTL, 300)
+            max_entries (int): Usuarios máximos en memoria (DB_CACHE_MAX_ENTRIES, 1000)
+        """
+        if ttl is None:
+            ttl = float(os.getenv('DB_CACHE_TTL', 300))
+        if max_entries is None:
+            max_entries = int(os.getenv('DB_CACHE_MAX_ENTRIES', 1000))
+
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+
+        # Entrada → (vence, usuario, claves); clave → entrada
+        self.entries = OrderedDict()
+        self.index = {}
+        self.next_entry = 0
+
+        # Contadores
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, kind, value):
+        """
+        Buscar un usuario por una de sus claves
+
+        Args:
+            kind (str): 'id', 'documento', 'correo', 'usuario' o 'estado'
+
+        Returns:
+            tuple: (encontrado, usuario). usuario es None si se guardó una
+                   búsqueda sin resultado
+        """
+        key = (kind, _normalize(value))
+        with self.lock:
+            entry_id = self.index.get(key)
+            if entry_id is not None:
+                expires, user, _ = self.entries[entry_id]
+                if expires > time.monotonic():
+                    self.entries.move_to_end(entry_id)
+                    self.hits += 1
+                    return True, (dict(user) if isinstance(user, dict) else user)
+                self._remove(entry_id)
+
+            self.misses += 1
+            return False, None
+
+    def put(self, kind, value, user):
+        """
+        Guardar el resultado de una consulta
+
+        Un usuario (dict) se indexa por todas sus claves; cualquier otro valor
+        (None o el estado) solo por la clave consultada. Lo buscado por
+        documento también queda bajo 'estado', así get_user_status lo encuentra
+        con una sola consulta a la caché
+        """
+        keys = {(kind, _normalize(value))}
+        if kind == 'documento':
+            keys.add(('estado', _normalize(value)))
+        if isinstance(user, dict):
+            for key_kind, field in USER_KEYS.items():
+                if user.get(field) not in (None, ''):
+                    keys.add((key_kind, _normalize(user[field])))
+            if user.get('numero_documento') not in (None, ''):
+                keys.add(('estado', _normalize(user['numero_documento'])))
+            user = dict(user)
+
+        with self.lock:
+            # Reemplazar lo que hubiera guardado bajo estas claves
+            for key in keys:
+                if key in self.index:
+                    self._remove(self.index[key])
+
+            entry_id = self.next_entry
+            self.next_entry += 1
+            self.entries[entry_id] = (time.monotonic() + self.ttl, user, keys)
+            for key in keys:
+                self.index[key] = entry_id
+
+            while len(self.entries) > self.max_entries:
+                self._remove(next(iter(self.entries)))
+
+    def _remove(self, entry_id):
+        _, _, keys = self.entries.pop(entry_id)
+        for key in keys:
+            if self.index.get(key) == entry_id:
+                del self.index[key]
+
+    def invalidate(self, numero_documento=None, email=None, username=None):
+        """
+        Descartar un usuario (todas sus claves) después de modificarlo
+        """
+        lookups = [
+            ('documento', numero_documento),
+            ('estado', numero_documento),
+            ('correo', email),
+            ('usuario', username),
+        ]
+        with self.lock:
+            for kind, value in lookups:
+                if value in (None, ''):
+                    continue
+                entry_id = self.index.get((kind, _normalize(value)))
+                if entry_id is None:
+                    continue
+
+                # Quitar también las entradas de las otras claves del usuario
+                _, user, _ = self.entries[entry_id]
+                self._remove(entry_id)
+                self.invalidations += 1
+                if isinstance(user, dict):
+                    self._discard_related(user)
+
+    def _discard_related(self, user):
+        for key_kind, field in USER_KEYS.items():
+            if user.get(field) in (None, ''):
+                continue
+            for kind in (key_kind, 'estado') if key_kind == 'documento' else (key_kind,):
+                entry_id = self.index.get((kind, _normalize(user[field])))
+                if entry_id is not None:
+                    self._remove(entry_id)
+
+    def clear(self):
+        """Vaciar la caché (los contadores se conservan)"""
+        with self.lock:
+            self.entries.clear()
+            self.index.clear()
+
+    def stats(self):
+        """Obtener contadores de aciertos y fallos"""
+        with self.lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+                'invalidations': self.invalidations,
+                'entries': len(self.entries)
+            }
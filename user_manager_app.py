@@ -2,6 +2,7 @@ import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, scrolledtext
 from PIL import Image, ImageTk
 import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import os
 
@@ -9,6 +10,7 @@ import os
 from ocr_processor import OCRProcessor
 from database_handler import DatabaseHandler
 from web_automation import WebAutomation
+from web_preflight import WebActionPlanner
 
 class ModernButton(tk.Button):
     """Botón moderno con efectos hover"""
@@ -45,8 +47,11 @@ class UserManagerAppV2:
         
         # Inicializar procesadores
         self.ocr_processor = OCRProcessor()
-        self.db_handler = DatabaseHandler()
+        self.db_handler = DatabaseHandler(pooled=True)
         self.web_automation = None
+        # Playwright (API síncrona) solo puede usarse desde el hilo que lo creó:
+        # todas las acciones web corren en este único hilo y reutilizan la sesión
+        self.web_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='web')
         
         # Variables
         self.current_image_path = None
@@ -54,6 +59,7 @@ class UserManagerAppV2:
         self.processing = False
         
         self.create_widgets()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
         self.log_message("✨ Sistema iniciado correctamente", "SUCCESS")
         
     def setup_styles(self):
@@ -728,8 +734,27 @@ class UserManagerAppV2:
                     self.root.after(0, self.consult_database)
                     return
                 
+                # Comparar con la BD antes de abrir el navegador
+                params = {'rol': user_data['rol']} if action == 'cambiar_rol' else {}
+                actions = [(user_data['num_doc'], action, params)]
+                planner = WebActionPlanner(self.db_handler)
+                try:
+                    actions, skipped = planner.plan(actions)
+                except Exception as e:
+                    planner = None  # Sin BD: se verifica el mensaje de la página
+                    skipped = []
+                    warning = f"No se pudo consultar el estado en la BD: {str(e)}"
+                    self.root.after(0, lambda: self.log_message(warning, "WARNING"))
+                
+                if skipped:
+                    message = skipped[0]['message']
+                    self.root.after(0, lambda: self.log_message(message, "INFO"))
+                    self.root.after(0, lambda: messagebox.showinfo("ℹ️ Sin cambios", message))
+                    return
+                
                 if self.web_automation is None:
-                    self.web_automation = WebAutomation()
+                    self.web_automation = WebAutomation(persistent=True)
+                self.web_automation.check_success_message = planner is None
                 
                 if action == 'cambiar_rol':
                     result = self.web_automation.change_user_role(
@@ -741,6 +766,14 @@ class UserManagerAppV2:
                 else:
                     result = {'success': False, 'message': 'Acción no implementada'}
                 
+                # Confirmar el resultado en la BD
+                if planner is not None:
+                    result['documento'] = user_data['num_doc']
+                    try:
+                        planner.apply_confirmation([result], planner.confirm(actions, [result]))
+                    except Exception as e:
+                        result['message'] += f" (sin confirmar en la BD: {str(e)})"
+                
                 # Actualizar UI
                 if result['success']:
                     self.root.after(0, lambda: self.log_message(result['message'], "SUCCESS"))
@@ -754,9 +787,20 @@ class UserManagerAppV2:
                 self.root.after(0, lambda: self.log_message(error_msg, "ERROR"))
                 self.root.after(0, lambda: messagebox.showerror("❌ Error", error_msg))
             finally:
+                # El cambio pudo aplicarse aunque falle la confirmación:
+                # descartar el usuario de la caché para releerlo de la BD
+                if action != 'consultar':
+                    self.db_handler.invalidate_user(user_data['num_doc'])
                 self.root.after(0, lambda: self.execute_btn.config(state='normal', text="▶️  EJECUTAR ACCIÓN WEB"))
         
-        threading.Thread(target=action_thread, daemon=True).start()
+        self.web_executor.submit(action_thread)
+    
+    def on_close(self):
+        """Cerrar el navegador (en su hilo) y la ventana"""
+        if self.web_automation is not None:
+            self.web_executor.submit(self.web_automation.close)
+        self.web_executor.shutdown(wait=False)
+        self.root.destroy()
     
     def log_message(self, message, level="INFO"):
         """Agregar mensaje al log con colores"""
@@ -0,0 +1,339 @@
+"""
+Copia local de gn_usuarios para búsquedas instantáneas
+search_users en SAVIA hace LIKE '%texto%' sobre cuatro columnas (recorre toda
+la tabla en cada búsqueda). Con la copia local las búsquedas se resuelven en
+SQLite con un índice FTS5: resultados ordenados por relevancia, coincidencia
+por prefijo y sin distinguir tildes ni mayúsculas.
+
+La copia se construye con una lectura completa (una sola consulta) y luego se
+actualiza solo con los usuarios modificados (fecha_hora_modifica) o creados
+desde la última actualización.
+
+Las búsquedas no esperan a la actualización: si la copia está vencida se
+actualiza en un hilo aparte y, mientras tanto, se busca en la copia anterior.
+Solo la primera construcción (copia nunca cargada) bloquea la búsqueda.
+
+Configuración (.env):
+    DB_MIRROR_PATH=cache/usuarios.db   # Activa la copia local en search_users
+    DB_MIRROR_REFRESH=300              # Segundos entre actualizaciones
+
+Uso:
+    python user_mirror.py             # Construir o actualizar la copia
+    python user_mirror.py --completa  # Reconstruir desde cero
+    python user_mirror.py -b "perez"  # Buscar en la copia
+"""
+
+import argparse
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime
+
+# Columnas guardadas (las que usa DatabaseHandler._map_savia_user_to_standard)
+COLUMNS = [
+    'id', 'gn_empresas_id', 'au_grupos_id', 'nombre', 'usuario',
+    'correo_electronico', 'mae_tipo_documento_codigo', 'documento',
+    'mae_area_valor', 'mae_cargo_valor', 'telefono', 'celular', 'activo',
+    'bloqueado', 'fecha_ultimo_ingreso', 'fecha_hora_crea', 'fecha_hora_modifica',
+]
+DATE_COLUMNS = {'fecha_ultimo_ingreso', 'fecha_hora_crea', 'fecha_hora_modifica'}
+BIT_COLUMNS = {'activo', 'bloqueado'}
+
+# Columnas indexadas para la búsqueda (las mismas del LIKE de search_users)
+SEARCH_COLUMNS = ['nombre', 'correo_electronico', 'documento', 'usuario']
+
+SEARCH_LIMIT = 50
+
+SCHEMA = f"""
+    CREATE TABLE IF NOT EXISTS usuarios (
+        id INTEGER PRIMARY KEY,
+        {', '.join(f'{column} TEXT' for column in COLUMNS[1:])}
+    );
+    CREATE VIRTUAL TABLE IF NOT EXISTS usuarios_fts USING fts5(
+        {', '.join(SEARCH_COLUMNS)},
+        content='usuarios', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    );
+    CREATE TRIGGER IF NOT EXISTS usuarios_ai AFTER INSERT ON usuarios BEGIN
+        INSERT INTO usuarios_fts (rowid, {', '.join(SEARCH_COLUMNS)})
+        VALUES (new.id, {', '.join(f'new.{c}' for c in SEARCH_COLUMNS)});
+    END;
+    CREATE TRIGGER IF NOT EXISTS usuarios_ad AFTER DELETE ON usuarios BEGIN
+        INSERT INTO usuarios_fts (usuarios_fts, rowid, {', '.join(SEARCH_COLUMNS)})
+        VALUES ('delete', old.id, {', '.join(f'old.{c}' for c in SEARCH_COLUMNS)});
+    END;
+    CREATE TRIGGER IF NOT EXISTS usuarios_au AFTER UPDATE ON usuarios BEGIN
+        INSERT INTO usuarios_fts (usuarios_fts, rowid, {', '.join(SEARCH_COLUMNS)})
+        VALUES ('delete', old.id, {', '.join(f'old.{c}' for c in SEARCH_COLUMNS)});
+        INSERT INTO usuarios_fts (rowid, {', '.join(SEARCH_COLUMNS)})
+        VALUES (new.id, {', '.join(f'new.{c}' for c in SEARCH_COLUMNS)});
+    END;
+    CREATE TABLE IF NOT EXISTS meta (
+        key TEXT PRIMARY KEY,
+        value TEXT
+    );
+"""
+
+UPSERT = f"""
+    INSERT INTO usuarios ({', '.join(COLUMNS)})
+    VALUES ({', '.join(f':{column}' for column in COLUMNS)})
+    ON CONFLICT (id) DO UPDATE SET
+    {', '.join(f'{column} = excluded.{column}' for column in COLUMNS[1:])}
+"""
+
+
+def build_match_query(search_term):
+    """
+    Convertir el texto buscado en una consulta FTS5 por prefijo
+    ('juan per' → "juan"* "per"*: todas las palabras, cada una como prefijo)
+    """
+    tokens = re.findall(r'\w+', search_term)
+    return ' '.join(f'"{token}"*' for token in tokens)
+
+
+def _to_sqlite(column, value):
+    """Adaptar un valor de MySQL para guardarlo"""
+    if value is None:
+        return None
+    if column in BIT_COLUMNS:
+        if isinstance(value, (bytes, bytearray)):
+            return int(value != b'\x00')
+        return int(bool(value))
+    if isinstance(value, datetime):
+        return value.isoformat(sep=' ')
+    return value
+
+
+def _from_sqlite(row):
+    """Fila de SQLite → fila con los tipos de MySQL"""
+    savia_user = dict(row)
+    for column in DATE_COLUMNS:
+        if savia_user.get(column):
+            savia_user[column] = datetime.fromisoformat(savia_user[column])
+    return savia_user
+
+
+class UserMirror:
+    def __init__(self, path=None, refresh_interval=None):
+        """
+        Abrir (o crear) la copia local
+
+        Args:
+            path (str): Archivo SQLite (DB_MIRROR_PATH)
+            refresh_interval (float): Segundos entre actualizaciones
+                                      automáticas (DB_MIRROR_REFRESH, 300)
+        """
+        path = path or os.getenv('DB_MIRROR_PATH')
+        if not path:
+            raise ValueError("No se indicó archivo para la copia local (DB_MIRROR_PATH)")
+        if refresh_interval is None:
+            refresh_interval = float(os.getenv('DB_MIRROR_REFRESH', 300))
+
+        self.path = path
+        self.refresh_interval = refresh_interval
+        self.lock = threading.Lock()
+        self.last_refresh = 0.0
+
+        # Las actualizaciones escriben con su propia conexión: en modo WAL las
+        # búsquedas siguen leyendo la última versión confirmada mientras tanto
+        self.refresh_lock = threading.Lock()
+        self.refresh_thread = None
+        self.refresh_failures = 0
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+        self.writer = sqlite3.connect(path, timeout=30, check_same_thread=False)
+
+    def _get_meta(self, key, conn=None):
+        row = (conn or self.conn).execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key, value):
+        self.writer.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value)
+        )
+
+    def high_water_mark(self):
+        """Marca (fecha, id) del último cambio copiado (None si nunca se cargó)"""
+        with self.lock:
+            return self._high_water_mark()
+
+    def _high_water_mark(self, conn=None):
+        fecha = self._get_meta('high_water', conn)
+        if fecha is None:
+            return None
+        return fecha, int(self._get_meta('high_water_id', conn))
+
+    def refresh(self, db, full=False):
+        """
+        Actualizar la copia desde SAVIA
+
+        La primera vez (o con full=True) copia toda la tabla; después solo
+        los usuarios modificados desde el último cambio copiado. Los usuarios
+        borrados en SAVIA solo desaparecen con una reconstrucción completa
+
+        Args:
+            db (DatabaseHandler): Conexión a SAVIA
+
+        Returns:
+            int: Usuarios copiados
+        """
+        with self.refresh_lock:
+            since = None if full else self._high_water_mark(self.writer)
+            count = 0
+
+            try:
+                if since is None:
+                    self.writer.execute("DELETE FROM usuarios")
+
+                # La carga completa no llega ordenada: la nueva marca es la mayor
+                mark = None
+                for row in db.iter_changed_rows(since):
+                    self.writer.execute(
+                        UPSERT, {column: _to_sqlite(column, row.get(column)) for column in COLUMNS}
+                    )
+                    count += 1
+                    row_mark = (row['marca'], row['id'])
+                    if mark is None or row_mark > mark:
+                        mark = row_mark
+
+                if mark is None and since is None:
+                    # Tabla vacía: marcar igual la carga completa, si no cada
+                    # búsqueda la repetiría en vez de actualizar en segundo plano
+                    from database_handler import CHANGE_MARK_START
+                    mark = (CHANGE_MARK_START, 0)
+                if mark is not None:
+                    self._set_meta('high_water', _to_sqlite('marca', mark[0]))
+                    self._set_meta('high_water_id', mark[1])
+                self.writer.commit()
+            except Exception:
+                # La copia queda como estaba antes de actualizar
+                self.writer.rollback()
+                raise
+
+            self.last_refresh = time.monotonic()
+            return count
+
+    def refresh_if_stale(self, db):
+        """
+        Actualizar si pasó más de refresh_interval desde la última vez
+
+        Si la copia nunca se cargó la construye antes de volver; si no, la
+        actualización se hace en segundo plano (una a la vez) y se sigue
+        buscando en la copia actual
+        """
+        if self.high_water_mark() is None:
+            self.refresh(db)
+            return
+        if time.monotonic() - self.last_refresh < self.refresh_interval:
+            return
+
+        with self.lock:
+            if self.refresh_thread is not None and self.refresh_thread.is_alive():
+                return
+            self.refresh_thread = threading.Thread(
+                target=self._refresh_in_background, args=(db,), name='user-mirror', daemon=True
+            )
+            self.refresh_thread.start()
+
+    def _refresh_in_background(self, db):
+        # Sin pool, la conexión de db es de quien busca: usar una propia
+        own_db = None
+        if not getattr(db, 'pooled', True):
+            own_db = db = type(db)(pooled=False, cache=False, mirror=False)
+        try:
+            self.refresh(db)
+        except Exception as e:
+            self.refresh_failures += 1
+            # Reintentar en el próximo intervalo con la copia que hay
+            self.last_refresh = time.monotonic()
+            print(f"⚠️ No se pudo actualizar la copia local: {str(e)}")
+        finally:
+            if own_db is not None:
+                own_db.disconnect()
+
+    def search(self, search_term, limit=SEARCH_LIMIT):
+        """
+        Buscar usuarios por nombre, email, documento o usuario (por prefijo)
+
+        Returns:
+            list: Filas con las columnas de SAVIA, las más relevantes primero
+        """
+        match_query = build_match_query(search_term)
+        if not match_query:
+            return []
+
+        with self.lock:
+            rows = self.conn.execute(
+                f"""
+                SELECT u.*
+                FROM usuarios_fts
+                JOIN usuarios u ON u.id = usuarios_fts.rowid
+                WHERE usuarios_fts MATCH ?
+                ORDER BY bm25(usuarios_fts), u.nombre
+                LIMIT ?
+                """,
+                (match_query, limit)
+            ).fetchall()
+
+        return [_from_sqlite(row) for row in rows]
+
+    def __len__(self):
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM usuarios").fetchone()[0]
+
+    def close(self):
+        thread = self.refresh_thread
+        if thread is not None:
+            thread.join()
+        with self.lock:
+            self.conn.close()
+        with self.refresh_lock:
+            self.writer.close()
+
+
+def main(argv=None):
+    from database_handler import DatabaseHandler
+
+    parser = argparse.ArgumentParser(description="Copia local de gn_usuarios para búsquedas")
+    parser.add_argument('--ruta', default=None, help="Archivo SQLite (por defecto DB_MIRROR_PATH)")
+    parser.add_argument('--completa', action='store_true', help="Reconstruir la copia desde cero")
+    parser.add_argument('-b', '--buscar', default=None, help="Buscar en la copia después de actualizar")
+    args = parser.parse_args(argv)
+
+    mirror = UserMirror(args.ruta or os.getenv('DB_MIRROR_PATH', 'cache/usuarios.db'))
+    db = DatabaseHandler(cache=False)
+    try:
+        start = time.perf_counter()
+        count = mirror.refresh(db, full=args.completa)
+        elapsed = time.perf_counter() - start
+        print(f"✅ {count} usuarios copiados en {elapsed:.1f} s ({len(mirror)} en la copia)")
+        print(f"   Último cambio copiado (fecha, id): {mirror.high_water_mark()}")
+
+        if args.buscar:
+            start = time.perf_counter()
+            results = mirror.search(args.buscar)
+            elapsed = (time.perf_counter() - start) * 1000
+            print(f"\n🔍 {len(results)} resultados para '{args.buscar}' en {elapsed:.2f} ms")
+            for row in results[:10]:
+                print(f"   {row['documento']:<15} {row['nombre']} ({row['usuario']})")
+    except Exception as e:
+        print(f"❌ Error: {str(e)}")
+        return 1
+    finally:
+        mirror.close()
+        db.disconnect()
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
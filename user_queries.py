@@ -0,0 +1,415 @@
+"""
+Capa de consultas de usuarios con proyecciones de columnas y sentencias preparadas
+
+Proyecciones (columnas que trae cada búsqueda de un usuario):
+- status: solo activo (verificación de estado)
+- minimal: identificación básica (id, nombre, usuario, correo, documento, estado)
+- full: todas las columnas que usa la vista de detalle
+
+Cada consulta se prepara una sola vez en el servidor por conexión
+(cursor(prepared=True)) y se reutiliza en las llamadas siguientes: MySQL no
+vuelve a analizar ni planificar la consulta, solo recibe los parámetros.
+
+Las consultas de listados, búsquedas masivas y estadísticas, y el mapeo de
+filas de gn_usuarios, son funciones sin estado: las usan DatabaseHandler y
+AsyncDatabaseHandler (placeholders %s de mysql.connector y aiomysql).
+"""
+
+import os
+import threading
+from collections import OrderedDict
+
+from mysql.connector import Error
+
+PROJECTIONS = {
+    'status': ['activo'],
+    'minimal': [
+        'id', 'nombre', 'usuario', 'correo_electronico',
+        'mae_tipo_documento_codigo', 'documento', 'activo',
+    ],
+    'full': [
+        'id', 'gn_empresas_id', 'au_grupos_id', 'nombre', 'usuario',
+        'correo_electronico', 'mae_tipo_documento_codigo', 'documento',
+        'mae_area_valor', 'mae_cargo_valor', 'telefono', 'celular', 'activo',
+        'bloqueado', 'fecha_ultimo_ingreso', 'fecha_hora_crea', 'fecha_hora_modifica',
+    ],
+}
+
+DEFAULT_PROJECTION = 'full'
+
+# Campo del usuario mapeado → columna de gn_usuarios de la que sale
+STANDARD_FIELDS = {
+    'id': 'id',
+    'tipo_documento': 'mae_tipo_documento_codigo',
+    'numero_documento': 'documento',
+    'nombre_completo': 'nombre',
+    'email': 'correo_electronico',
+    'usuario': 'usuario',
+    'rol': 'mae_cargo_valor',
+    'area': 'mae_area_valor',
+    'estado': 'activo',
+    'fecha_creacion': 'fecha_hora_crea',
+    'fecha_modificacion': 'fecha_hora_modifica',
+    'telefono': 'telefono',
+    'celular': 'celular',
+    'empresa_id': 'gn_empresas_id',
+    'grupo_id': 'au_grupos_id',
+    'bloqueado': 'bloqueado',
+    'fecha_ultimo_ingreso': 'fecha_ultimo_ingreso',
+}
+
+
+def projection_columns(projection):
+    """Columnas de una proyección (error si no existe)"""
+    try:
+        return PROJECTIONS[projection]
+    except KeyError:
+        raise ValueError(
+            f"Proyección desconocida: {projection} (usar {', '.join(PROJECTIONS)})"
+        )
+
+
+def projection_sql(projection):
+    """Lista de columnas para el SELECT"""
+    return ',\n    '.join(projection_columns(projection))
+
+
+def select_user_sql(table, projection, column, placeholder='?'):
+    """
+    Consulta de un usuario por una columna con la proyección dada
+    (placeholder '?' para sentencias preparadas, '%s' para consultas normales)
+    """
+    return (
+        f"SELECT {', '.join(projection_columns(projection))} "
+        f"FROM {table} WHERE {column} = {placeholder} LIMIT 1"
+    )
+
+
+def restrict_to_projection(user, projection):
+    """
+    Dejar en el usuario mapeado solo los campos que trae la proyección
+    (así no aparecen valores por defecto de columnas que no se consultaron)
+    """
+    if user is None or projection == 'full':
+        return user
+    columns = set(projection_columns(projection))
+    return {
+        field: value
+        for field, value in user.items()
+        if STANDARD_FIELDS.get(field) in columns
+    }
+
+
+# Columnas de las búsquedas completas de usuarios
+USER_COLUMNS = projection_sql('full')
+
+# Valores máximos por consulta IN en las búsquedas masivas
+BULK_CHUNK_SIZE = int(os.getenv('DB_BULK_CHUNK_SIZE', 1000))
+
+
+def bit_to_bool(bit_value):
+    """Convertir bit(1) a booleano"""
+    if bit_value is None:
+        return None
+    if isinstance(bit_value, (bytes, bytearray)):
+        return bit_value != b'\x00'
+    return bool(bit_value)
+
+
+def map_user(savia_user):
+    """
+    Mapear usuario de SAVIA al formato estándar del sistema
+
+    Mapeo:
+    - documento → numero_documento
+    - mae_tipo_documento_codigo → tipo_documento
+    - nombre → nombre_completo
+    - correo_electronico → email
+    - mae_cargo_valor → rol
+    - mae_area_valor → area
+    - activo (bit) → estado (texto)
+    """
+    if not savia_user:
+        return None
+
+    # Convertir activo de bit a booleano
+    activo = bit_to_bool(savia_user.get('activo'))
+
+    return {
+        'id': savia_user.get('id'),
+        'tipo_documento': savia_user.get('mae_tipo_documento_codigo', ''),
+        'numero_documento': savia_user.get('documento', ''),
+        'nombre_completo': savia_user.get('nombre', ''),
+        'email': savia_user.get('correo_electronico', ''),
+        'usuario': savia_user.get('usuario', ''),
+        'rol': savia_user.get('mae_cargo_valor', 'Sin cargo'),
+        'area': savia_user.get('mae_area_valor', 'Sin área'),
+        'estado': 'activo' if activo else 'inactivo',
+        'fecha_creacion': savia_user.get('fecha_hora_crea'),
+        'fecha_modificacion': savia_user.get('fecha_hora_modifica'),
+        # Campos adicionales de SAVIA
+        'telefono': savia_user.get('telefono'),
+        'celular': savia_user.get('celular'),
+        'empresa_id': savia_user.get('gn_empresas_id'),
+        'grupo_id': savia_user.get('au_grupos_id'),
+        'bloqueado': bit_to_bool(savia_user.get('bloqueado')),
+        'fecha_ultimo_ingreso': savia_user.get('fecha_ultimo_ingreso')
+    }
+
+
+# ============================================
+# BÚSQUEDAS MASIVAS
+# ============================================
+def bulk_chunks(values, chunk_size=None):
+    """
+    Preparar los valores de una búsqueda masiva
+
+    Returns:
+        tuple: (valor normalizado → valor pedido, bloques de BULK_CHUNK_SIZE)
+    """
+    chunk_size = chunk_size or BULK_CHUNK_SIZE
+
+    # Sin vacíos ni repetidos
+    requested = {}
+    for value in values:
+        if value is None or not str(value).strip():
+            continue
+        requested.setdefault(str(value).strip().lower(), value)
+
+    keys = [str(value).strip() for value in requested.values()]
+    chunks = [keys[start:start + chunk_size] for start in range(0, len(keys), chunk_size)]
+    return requested, chunks
+
+
+def bulk_users_sql(table, column, chunk):
+    """Consulta IN de un bloque de valores (consulta, parámetros)"""
+    placeholders = ', '.join(['%s'] * len(chunk))
+    query = f"""
+        SELECT {USER_COLUMNS}
+        FROM {table}
+        WHERE {column} IN ({placeholders})
+        ORDER BY id
+    """
+    return query, tuple(chunk)
+
+
+def match_bulk_rows(column, requested, rows, found):
+    """Filas con su clave pedida (igual que LIMIT 1: si hay repetidos, la primera)"""
+    for row in rows:
+        key = requested.get(str(row[column]).strip().lower())
+        if key is not None and key not in found:
+            yield key, row
+
+
+# ============================================
+# LISTADOS Y ESTADÍSTICAS
+# ============================================
+def search_users_sql(table, search_term):
+    """Búsqueda por nombre, email, documento o usuario (consulta, parámetros)"""
+    query = f"""
+        SELECT 
+            id,
+            nombre,
+            usuario,
+            correo_electronico,
+            mae_tipo_documento_codigo,
+            documento,
+            mae_area_valor,
+            mae_cargo_valor,
+            activo
+        FROM {table}
+        WHERE 
+            nombre LIKE %s
+            OR correo_electronico LIKE %s
+            OR documento LIKE %s
+            OR usuario LIKE %s
+        ORDER BY nombre
+        LIMIT 50
+    """
+    search_pattern = f"%{search_term}%"
+    return query, (search_pattern, search_pattern, search_pattern, search_pattern)
+
+
+def users_by_role_sql(table, rol):
+    """Usuarios de un cargo (consulta, parámetros)"""
+    query = f"""
+        SELECT 
+            id,
+            nombre,
+            usuario,
+            correo_electronico,
+            documento,
+            mae_area_valor,
+            mae_cargo_valor,
+            activo
+        FROM {table}
+        WHERE mae_cargo_valor = %s
+        ORDER BY nombre
+    """
+    return query, (rol,)
+
+
+def users_by_area_sql(table, area):
+    """Usuarios de un área (consulta, parámetros)"""
+    query = f"""
+        SELECT 
+            id,
+            nombre,
+            usuario,
+            correo_electronico,
+            documento,
+            mae_area_valor,
+            mae_cargo_valor,
+            activo
+        FROM {table}
+        WHERE mae_area_valor = %s
+        ORDER BY nombre
+    """
+    return query, (area,)
+
+
+def active_users_sql(table):
+    return f"""
+        SELECT 
+            id,
+            nombre,
+            usuario,
+            correo_electronico,
+            mae_tipo_documento_codigo,
+            documento,
+            mae_area_valor,
+            mae_cargo_valor
+        FROM {table}
+        WHERE activo = 1
+        ORDER BY nombre
+    """
+
+
+def inactive_users_sql(table):
+    return f"""
+        SELECT 
+            id,
+            nombre,
+            usuario,
+            correo_electronico,
+            documento,
+            mae_area_valor,
+            mae_cargo_valor,
+            fecha_hora_modifica
+        FROM {table}
+        WHERE activo = 0
+        ORDER BY fecha_hora_modifica DESC
+    """
+
+
+def statistics_sql(table):
+    return f"""
+        SELECT 
+            COUNT(*) as total_usuarios,
+            SUM(CASE WHEN activo = 1 THEN 1 ELSE 0 END) as usuarios_activos,
+            SUM(CASE WHEN activo = 0 THEN 1 ELSE 0 END) as usuarios_inactivos,
+            COUNT(DISTINCT mae_cargo_valor) as total_cargos,
+            COUNT(DISTINCT mae_area_valor) as total_areas
+        FROM {table}
+    """
+
+
+class PreparedStatements:
+    def __init__(self, max_connections=1):
+        """
+        Cursores preparados por conexión y consulta, reutilizados entre llamadas
+
+        Args:
+            max_connections (int): Conexiones cuyos cursores se conservan (las del
+                                   pool, o 1 sin pool). Una conexión nueva (por
+                                   ejemplo, tras una reconexión) descarta los
+                                   cursores de la usada hace más tiempo
+        """
+        self.max_connections = max(1, max_connections)
+        # id de conexión del servidor → {consulta: cursor}, de la menos a la más usada
+        self.cursors = OrderedDict()
+        self.lock = threading.Lock()
+
+        # Contadores
+        self.prepares = 0
+        self.executions = 0
+        self.evictions = 0
+
+    def execute(self, connection, statement, params):
+        """
+        Ejecutar una consulta preparada y obtener todas las filas
+
+        Si la sentencia ya no es válida en el servidor (por ejemplo, tras una
+        reconexión) se prepara de nuevo una vez
+        """
+        for attempt in range(2):
+            cursor = self._cursor(connection, statement)
+            try:
+                cursor.execute(statement, params)
+                rows = cursor.fetchall()
+                with self.lock:
+                    self.executions += 1
+                return rows
+            except Error:
+                self._discard(connection, statement)
+                if attempt:
+                    raise
+
+    def _cursor(self, connection, statement):
+        stale = []
+        with self.lock:
+            statements = self.cursors.get(connection.connection_id)
+            if statements is None:
+                statements = self.cursors[connection.connection_id] = {}
+                while len(self.cursors) > self.max_connections:
+                    _, old = self.cursors.popitem(last=False)
+                    stale.extend(old.values())
+                    self.evictions += 1
+            self.cursors.move_to_end(connection.connection_id)
+
+            cursor = statements.get(statement)
+            if cursor is None:
+                cursor = statements[statement] = connection.cursor(prepared=True, dictionary=True)
+                self.prepares += 1
+
+        self._close(stale)
+        return cursor
+
+    def _discard(self, connection, statement):
+        with self.lock:
+            cursor = self.cursors.get(connection.connection_id, {}).pop(statement, None)
+        self._close([cursor] if cursor is not None else [])
+
+    def forget(self, connection_id):
+        """Descartar los cursores de una conexión que se cerró o se reconectó"""
+        with self.lock:
+            statements = self.cursors.pop(connection_id, None)
+            if statements is not None:
+                self.evictions += 1
+        self._close(list((statements or {}).values()))
+
+    @staticmethod
+    def _close(cursors):
+        for cursor in cursors:
+            try:
+                cursor.close()
+            except Error:
+                pass  # La conexión ya no existe
+
+    def stats(self):
+        """Sentencias preparadas, ejecuciones y conexiones descartadas"""
+        with self.lock:
+            return {
+                'prepared_statements': sum(len(statements) for statements in self.cursors.values()),
+                'connections': len(self.cursors),
+                'prepares': self.prepares,
+                'executions': self.executions,
+                'evictions': self.evictions
+            }
+
+    def clear(self):
+        """Cerrar todos los cursores preparados (antes de cerrar las conexiones)"""
+        with self.lock:
+            cursors = [cursor for statements in self.cursors.values() for cursor in statements.values()]
+            self.cursors.clear()
+        self._close(cursors)
@@ -1,31 +1,216 @@
 
 
 from playwright.sync_api import sync_playwright, Page, Browser, Playwright
+from playwright.sync_api import Error as PlaywrightError, TimeoutError as PlaywrightTimeoutError
 import time
 import os
+import re
+import threading
+from collections import OrderedDict
 from dotenv import load_dotenv
 
+from jsf_http import JsfUserClient, SubmittedActionError, REQUESTS_AVAILABLE
+
 load_dotenv()
 
+# Selectores que usan las esperas (AJUSTA según tu plataforma)
+# Tabla de resultados del módulo de usuarios (la respuesta JSF la vuelve a dibujar)
+USERS_TABLE_SELECTOR = "#tabla-usuarios, .ui-datatable"
+# Mensaje de búsqueda sin resultados
+EMPTY_RESULTS_SELECTOR = ".sin-resultados, .ui-datatable-empty-message"
+# Elemento que indica que cada módulo terminó de cargar (operación → selector)
+MODULE_READY_SELECTORS = {
+    'usuarios': "#search-user",
+}
+# Formulario de login (la plataforma lo muestra en lugar del módulo si la sesión venció)
+LOGIN_FORM_SELECTOR = "input[type=password]"
+# Botón para volver del formulario de edición al listado sin recargar la página
+BACK_BUTTON_SELECTOR = "#btn-cancel, .btn-volver"
+
+# Perfil liviano: tamaño de ventana y recursos que no se descargan
+LEAN_VIEWPORT = {'width': 1280, 'height': 720}
+FULL_VIEWPORT = {'width': 1920, 'height': 1080}
+# Tipos de recurso que se guardan en memoria y se comparten entre navegadores
+CACHED_RESOURCE_TYPES = ('stylesheet', 'script')
+
+MAX_AGE_PATTERN = re.compile(r'max-age=(\d+)')
+# Cabeceras que no se reenvían al servir un recurso (el cuerpo ya viene
+# descomprimido; las hop-by-hop son de la conexión original)
+HOP_BY_HOP_HEADERS = {
+    'content-encoding', 'content-length', 'connection', 'keep-alive', 'proxy-authenticate',
+    'proxy-authorization', 'te', 'trailer', 'transfer-encoding', 'upgrade'
+}
+# Cabeceras que además no se guardan en la caché compartida (son de la sesión
+# que descargó el recurso, no de los demás contextos)
+SESSION_HEADERS = {'set-cookie'}
+
+
+class ResourceCache:
+    """
+    Estilos y scripts descargados por el perfil liviano (interceptar las
+    peticiones desactiva la caché HTTP del navegador)
+
+    LRU limitada en bytes y protegida con un lock: una misma instancia se puede
+    compartir entre los WebAutomation de varios hilos (web_pool.py).
+    """
+
+    def __init__(self, max_bytes=None):
+        """
+        Args:
+            max_bytes (int): Tamaño máximo de los cuerpos guardados
+                             (WEB_RESOURCE_CACHE_MB, 16 MB)
+        """
+        if max_bytes is None:
+            max_bytes = int(float(os.getenv('WEB_RESOURCE_CACHE_MB', 16)) * 1024 * 1024)
+
+        self.max_bytes = max_bytes
+        self.size = 0
+        # url → (vence, status, headers, cuerpo)
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+        # Contadores
+        self.evictions = 0
+
+    def get(self, url):
+        """
+        Returns:
+            tuple | None: (status, headers, cuerpo), o None si no está o venció
+        """
+        with self.lock:
+            entry = self.entries.get(url)
+            if entry is None:
+                return None
+            if entry[0] <= time.time():
+                self._remove(url)
+                return None
+            self.entries.move_to_end(url)
+            return entry[1:]
+
+    def put(self, url, max_age, status, headers, body):
+        """Guardar un recurso por max_age segundos (no se guarda si supera max_bytes)"""
+        if len(body) > self.max_bytes:
+            return
+        with self.lock:
+            if url in self.entries:
+                self._remove(url)
+            self.entries[url] = (time.time() + max_age, status, headers, body)
+            self.size += len(body)
+            while self.size > self.max_bytes:
+                self._remove(next(iter(self.entries)))
+                self.evictions += 1
+
+    def _remove(self, url):
+        entry = self.entries.pop(url)
+        self.size -= len(entry[3])
+
+    def stats(self):
+        with self.lock:
+            return {
+                'entries': len(self.entries),
+                'bytes': self.size,
+                'max_bytes': self.max_bytes,
+                'evictions': self.evictions
+            }
+
+
 class WebAutomation:
-    def __init__(self, headless=False):
+    def __init__(self, headless=False, persistent=None, storage_state_path=None, slow_mo=None,
+                 http_fast_path=None, lean=None, check_success_message=True, resource_cache=None):
         """
         Inicializar automatización web con Playwright
         
         Args:
             headless (bool): Si True, ejecuta el navegador sin interfaz gráfica
+            persistent (bool): Mantener el navegador y la sesión abiertos entre
+                               acciones (WEB_SESSION_PERSISTENT, false)
+            storage_state_path (str): Archivo donde se guardan las cookies de la
+                                      sesión (WEB_STORAGE_STATE, cache/savia_session.json)
+            slow_mo (int): Milisegundos de pausa entre operaciones del navegador,
+                           solo para depurar (WEB_SLOW_MO, 0)
+            http_fast_path (bool): Repetir las acciones como envíos HTTP del
+                                   formulario JSF con las cookies del navegador, y
+                                   usar el navegador solo si fallan (WEB_HTTP_FAST_PATH, false)
+            lean (bool): Perfil liviano: ventana pequeña, sin imágenes, fuentes ni
+                         multimedia, estilos y scripts en caché, y esperas por
+                         selectores en lugar de networkidle (WEB_LEAN_PROFILE, true).
+                         Desactivar para depurar con la página completa
+            check_success_message (bool): Esperar el mensaje de éxito de la página
+                                          después de cada acción. False cuando el
+                                          resultado se confirma en la BD (web_preflight.py)
+            resource_cache (ResourceCache): Caché de estilos y scripts del perfil
+                                            liviano; si es None se crea una propia
         """
         self.playwright = None
         self.browser = None
+        self.context = None
         self.page = None
         self.headless = headless
-        self.wait_time = 10000  # milisegundos
+        
+        # Vista actual (módulo, operación) y locators ya creados de la página
+        self.current_view = None
+        self._locators = {}
+        
+        # La acción en curso ya envió el cambio (no se repite tras un re-login)
+        self.change_submitted = False
+        
+        # Tiempos de espera máximos (milisegundos); no hay pausas fijas
+        self.wait_time = int(os.getenv('WEB_TIMEOUT', 10000))  # Elementos
+        self.navigation_timeout = int(os.getenv('WEB_NAVIGATION_TIMEOUT', 30000))  # Páginas y respuestas JSF
+        self.result_timeout = int(os.getenv('WEB_RESULT_TIMEOUT', 5000))  # Resultado después de una respuesta
+        self.modal_timeout = int(os.getenv('WEB_MODAL_TIMEOUT', 2000))  # Modal de confirmación (opcional)
+        
+        if slow_mo is None:
+            slow_mo = int(os.getenv('WEB_SLOW_MO', 0))
+        self.slow_mo = slow_mo
+        
+        # Perfil liviano
+        if lean is None:
+            lean = os.getenv('WEB_LEAN_PROFILE', 'true').lower() in ('1', 'true', 'yes', 'si')
+        self.lean = lean
+        self.check_success_message = check_success_message
+        self.blocked_resources = {
+            kind.strip() for kind in os.getenv('WEB_BLOCK_RESOURCES', 'image,font,media').split(',')
+            if kind.strip()
+        }
+        self.resource_cache = resource_cache if resource_cache is not None else ResourceCache()
         
         # Configuración de la plataforma (cargar desde .env)
         self.platform_url = os.getenv('PLATFORM_URL', 'http://10.250.3.66:8080/savia')
         self.username = os.getenv('PLATFORM_USER', 'dpiedrar')
         self.password = os.getenv('PLATFORM_PASSWORD', 'i0BnXmZr')
         
+        # Sesión persistente
+        if persistent is None:
+            persistent = os.getenv('WEB_SESSION_PERSISTENT', 'false').lower() in ('1', 'true', 'yes', 'si')
+        if storage_state_path is None:
+            storage_state_path = os.getenv('WEB_STORAGE_STATE', os.path.join('cache', 'savia_session.json'))
+        self.persistent = persistent
+        self.storage_state_path = storage_state_path
+        
+        # Ruta rápida HTTP (jsf_http.py, requiere requests)
+        if http_fast_path is None:
+            http_fast_path = os.getenv('WEB_HTTP_FAST_PATH', 'false').lower() in ('1', 'true', 'yes', 'si')
+        self.http_client = None
+        if http_fast_path:
+            if REQUESTS_AVAILABLE:
+                self.http_client = JsfUserClient(self.platform_url)
+            else:
+                print("⚠️ requests no está instalado, la ruta rápida HTTP queda desactivada")
+        
+        # Contadores
+        self.browser_launches = 0
+        self.logins = 0
+        self.reused_sessions = 0
+        self.http_actions = 0
+        self.http_fallbacks = 0
+        self.blocked_requests = 0
+        self.cached_responses = 0
+        self.resource_fetch_errors = 0
+        self.navigations = 0
+        self.skipped_navigations = 0
+        self.form_resets = 0
+        
         self.initialize_browser()
     
     def initialize_browser(self):
@@ -36,20 +221,37 @@ class WebAutomation:
             # Configurar y lanzar navegador
             self.browser = self.playwright.chromium.launch(
                 headless=self.headless,
-                slow_mo=50  # Ralentizar para debugging (milisegundos)
+                slow_mo=self.slow_mo  # Ralentizar para debugging (milisegundos)
             )
             
-            # Crear contexto con viewport
-            context = self.browser.new_context(
-                viewport={'width': 1920, 'height': 1080}
-            )
+            # Crear contexto con viewport (y la sesión guardada, si existe)
+            context_options = {'viewport': LEAN_VIEWPORT if self.lean else FULL_VIEWPORT}
+            if self.persistent and os.path.exists(self.storage_state_path):
+                context_options['storage_state'] = self.storage_state_path
+            self.context = self.browser.new_context(**context_options)
+            self.context.set_default_timeout(self.wait_time)
+            self.context.set_default_navigation_timeout(self.navigation_timeout)
+            if self.lean:
+                self.context.route("**/*", self._route_resource)
             
             # Crear página
-            self.page = context.new_page()
+            self.page = self.context.new_page()
+            self.current_view = None
+            self._locators = {}
+            self.browser_launches += 1
             
         except Exception as e:
             raise Exception(f"Error al inicializar navegador: {str(e)}")
     
+    def is_browser_open(self):
+        """True si el navegador y la página siguen abiertos"""
+        return (
+            self.page is not None
+            and not self.page.is_closed()
+            and self.browser is not None
+            and self.browser.is_connected()
+        )
+    
     def login(self):
         """
         Realizar login en la plataforma SAVIA
@@ -73,7 +275,22 @@ class WebAutomation:
             self.page.get_by_role("button", name="Ingresar").click()
             
             # Esperar a que cargue la página principal
-            self.page.wait_for_load_state("networkidle")
+            if self.lean:
+                self.page.get_by_role("textbox", name="Contraseña").wait_for(state="detached")
+                self.page.wait_for_load_state("domcontentloaded")
+            else:
+                self.page.wait_for_load_state("networkidle")
+            self.logins += 1
+            
+            # El login deja la página en el inicio
+            self.current_view = None
+            
+            # Sesión nueva: la ruta HTTP debe tomar las cookies nuevas
+            if self.http_client is not None:
+                self.http_client.has_cookies = False
+            
+            if self.persistent:
+                self.save_session()
             
             print("✅ Login exitoso")
             return {'success': True, 'message': 'Login exitoso'}
@@ -82,6 +299,304 @@ class WebAutomation:
             print(f"❌ Error en login: {str(e)}")
             return {'success': False, 'message': f'Error en login: {str(e)}'}
     
+    def save_session(self):
+        """Guardar cookies y almacenamiento de la sesión en disco (storage_state)"""
+        try:
+            folder = os.path.dirname(self.storage_state_path)
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+            # Escribir a un temporal y reemplazar: otros navegadores pueden estar leyéndolo
+            temp_path = f"{self.storage_state_path}.tmp"
+            self.context.storage_state(path=temp_path)
+            os.replace(temp_path, self.storage_state_path)
+        except Exception as e:
+            print(f"⚠️ No se pudo guardar la sesión: {str(e)}")
+    
+    def is_login_page(self):
+        """True si la página actual es el formulario de login (sesión vencida)"""
+        try:
+            return self.page.get_by_role("textbox", name="Contraseña").is_visible()
+        except Exception:
+            return False
+    
+    def ensure_session(self, nombre_modulo="admin", operacion="usuarios"):
+        """
+        Dejar la página en un módulo con la sesión iniciada
+        
+        Sin sesión persistente hace login y navega (como antes). Con sesión
+        persistente navega directamente (nada, si la página ya está en el
+        módulo) y solo hace login si la plataforma muestra el formulario de
+        login (primera vez o sesión vencida).
+        
+        Returns:
+            dict: {'success': bool, 'message': str}
+        """
+        if not self.is_browser_open():
+            self.close()
+            self.initialize_browser()
+        
+        if not self.persistent:
+            login_result = self.login()
+            if not login_result['success']:
+                return login_result
+            self.navegar_a_modulo_url(nombre_modulo, operacion)
+            return login_result
+        
+        self.ir_a_modulo(nombre_modulo, operacion)
+        if not self.is_login_page():
+            self.reused_sessions += 1
+            return {'success': True, 'message': 'Sesión reutilizada'}
+        
+        print("🔑 Sesión vencida o inexistente")
+        login_result = self.login()
+        if not login_result['success']:
+            return login_result
+        
+        self.navegar_a_modulo_url(nombre_modulo, operacion)
+        if self.is_login_page():
+            return {'success': False, 'message': 'Error en login: la plataforma volvió a pedir credenciales'}
+        return login_result
+    
+    def finish_action(self):
+        """Cerrar el navegador al terminar una acción (salvo con sesión persistente)"""
+        if not self.persistent:
+            self.close()
+    
+    def stats(self):
+        """Navegadores lanzados, logins, sesiones reutilizadas y acciones por HTTP"""
+        return {
+            'persistent': self.persistent,
+            'browser_launches': self.browser_launches,
+            'logins': self.logins,
+            'reused_sessions': self.reused_sessions,
+            'http_fast_path': self.http_client is not None,
+            'http_actions': self.http_actions,
+            'http_fallbacks': self.http_fallbacks,
+            'lean': self.lean,
+            'blocked_requests': self.blocked_requests,
+            'cached_responses': self.cached_responses,
+            'resource_fetch_errors': self.resource_fetch_errors,
+            'resource_cache': self.resource_cache.stats(),
+            'navigations': self.navigations,
+            'skipped_navigations': self.skipped_navigations,
+            'form_resets': self.form_resets
+        }
+    
+    # ============================================
+    # PERFIL LIVIANO
+    # ============================================
+    def _route_resource(self, route):
+        """Bloquear imágenes, fuentes y multimedia; servir estilos y scripts desde la caché"""
+        request = route.request
+        if request.resource_type in self.blocked_resources:
+            self.blocked_requests += 1
+            route.abort()
+            return
+        if request.resource_type not in CACHED_RESOURCE_TYPES or request.method != 'GET':
+            route.continue_()
+            return
+        
+        cached = self.resource_cache.get(request.url)
+        if cached is not None:
+            self.cached_responses += 1
+            status, headers, body = cached
+            route.fulfill(status=status, headers=headers, body=body)
+            return
+        
+        try:
+            response = route.fetch()
+            body = response.body()
+        except PlaywrightError:
+            # Error de red o tiempo agotado: que el navegador haga la petición
+            # (si no, la página queda esperando hasta el timeout de navegación)
+            self.resource_fetch_errors += 1
+            route.continue_()
+            return
+        
+        headers = {
+            name: value for name, value in response.headers.items()
+            if name.lower() not in HOP_BY_HOP_HEADERS
+        }
+        cache_control = headers.get('cache-control', '')
+        max_age = MAX_AGE_PATTERN.search(cache_control)
+        if response.ok and max_age and 'no-store' not in cache_control:
+            shared_headers = {
+                name: value for name, value in headers.items()
+                if name.lower() not in SESSION_HEADERS
+            }
+            self.resource_cache.put(
+                request.url, int(max_age.group(1)), response.status, shared_headers, body
+            )
+        route.fulfill(status=response.status, headers=headers, body=body)
+    
+    def wait_module_ready(self, operacion):
+        """
+        Esperar a que el módulo se pueda usar
+        
+        Con el perfil liviano: DOM cargado y el elemento del módulo (o el
+        formulario de login, si la sesión venció); sin él: networkidle.
+        """
+        if not self.lean:
+            self.page.wait_for_load_state("networkidle")
+            return
+        self.page.wait_for_load_state("domcontentloaded")
+        ready = MODULE_READY_SELECTORS.get(operacion, "form")
+        self.page.locator(f"{ready}, {LOGIN_FORM_SELECTOR}").first.wait_for(state="visible")
+    
+    # ============================================
+    # RUTA RÁPIDA HTTP
+    # ============================================
+    def _try_http(self, accion, documento, params=None):
+        """
+        Intentar la acción con envíos HTTP del formulario JSF (sin navegador)
+        
+        Solo se pasa al navegador si la ruta HTTP falló antes del envío que
+        modifica al usuario; si falló después, se informa el error (con
+        check_success_message=False lo decide la confirmación en la BD)
+        
+        Returns:
+            dict: Resultado de la acción, o None si hay que hacerla con el navegador
+        """
+        if self.http_client is None:
+            return None
+        try:
+            if not self.http_client.has_cookies:
+                # Cookies de la sesión del navegador o, si está cerrado, del storage_state
+                if self.is_browser_open():
+                    cookies = self.context.cookies()
+                    if not cookies:
+                        return None  # Aún no hay sesión: la abre el navegador
+                    self.http_client.set_cookies(cookies)
+                elif os.path.exists(self.storage_state_path):
+                    self.http_client.load_storage_state(self.storage_state_path)
+                else:
+                    return None
+            
+            result = self.http_client.run(accion, documento, params)
+            self.http_actions += 1
+            return result
+        
+        except SubmittedActionError as e:
+            print(f"⚠️ Ruta HTTP falló después del envío ({accion} {documento}): {str(e)}")
+            self.http_actions += 1
+            self.http_client.has_cookies = False
+            return {
+                'success': False,
+                'message': f"Sin confirmación de la plataforma: {str(e)}",
+                'enviado': True
+            }
+        
+        except Exception as e:
+            print(f"⚠️ Ruta HTTP falló ({accion} {documento}): {str(e)}. Se usa el navegador")
+            self.http_fallbacks += 1
+            # La sesión del navegador puede renovarse: volver a tomar sus cookies
+            self.http_client.has_cookies = False
+            return None
+    
+    # ============================================
+    # ESPERAS
+    # ============================================
+    def _is_jsf_response(self, response):
+        """Respuesta a un envío de formulario JSF (POST completo o AJAX parcial)"""
+        return response.request.method == 'POST' and 'faces' in response.url
+    
+    def submit_and_wait(self, trigger, rerendered=None):
+        """
+        Enviar un formulario JSF (click o Enter) y esperar a que termine
+        
+        Espera la respuesta del servidor (POST completo o AJAX) y después a que
+        `rerendered` sea reemplazado por el contenido nuevo. Así no se leen
+        resultados de la página anterior y no hace falta una pausa fija.
+        
+        Args:
+            trigger (callable): Acción que envía el formulario
+            rerendered (Locator): Elemento que la respuesta vuelve a dibujar
+        
+        Returns:
+            Response: Respuesta del servidor
+        """
+        old = None
+        if rerendered is not None and rerendered.count() > 0:
+            old = rerendered.first.element_handle()
+        
+        with self.page.expect_response(self._is_jsf_response, timeout=self.navigation_timeout) as response_info:
+            trigger()
+        response = response_info.value
+        if response.status >= 400:
+            raise Exception(f"La plataforma respondió {response.status} {response.status_text}")
+        
+        if old is not None:
+            try:
+                self.page.wait_for_function(
+                    "element => !element.isConnected", arg=old, timeout=self.result_timeout
+                )
+            except PlaywrightError:
+                # Vencido: la respuesta no volvió a dibujar el elemento.
+                # Otro error: hubo navegación completa y el documento anterior ya no existe
+                pass
+        
+        self.page.wait_for_load_state("domcontentloaded")
+        return response
+    
+    # ============================================
+    # NAVEGACIÓN
+    # ============================================
+    def locator(self, selector):
+        """
+        Locator de la página actual, creado una sola vez por selector
+        (un Locator se vuelve a resolver en cada uso: sirve después de cada
+        respuesta JSF mientras la página sea la misma)
+        """
+        locator = self._locators.get(selector)
+        if locator is None:
+            locator = self._locators[selector] = self.page.locator(selector)
+        return locator
+    
+    def en_modulo(self, nombre_modulo, operacion):
+        """
+        True si la página ya está en el módulo y se puede usar sin navegar
+        
+        Si la página quedó en otra vista del módulo (formulario de edición), vuelve
+        al listado con el formulario (botón Volver) en lugar de recargar.
+        """
+        if self.current_view != (nombre_modulo, operacion) or not self.is_browser_open():
+            return False
+        if not self.page.url.split('?')[0].endswith(f"/{nombre_modulo}/{operacion}.faces"):
+            self.current_view = None
+            return False
+        
+        ready = self.locator(MODULE_READY_SELECTORS.get(operacion, "form"))
+        if ready.is_visible():
+            return True
+        if self.volver_al_listado() and ready.is_visible():
+            return True
+        self.current_view = None
+        return False
+    
+    def ir_a_modulo(self, nombre_modulo, operacion):
+        """Navegar al módulo solo si la página no está ya en él"""
+        if self.en_modulo(nombre_modulo, operacion):
+            self.skipped_navigations += 1
+            return True
+        return self.navegar_a_modulo_url(nombre_modulo, operacion)
+    
+    def volver_al_listado(self):
+        """
+        Volver del formulario de edición al listado con su botón (sin recargar)
+        
+        Returns:
+            bool: False si la página no tiene botón para volver
+        """
+        back_button = self.locator(BACK_BUTTON_SELECTOR).first
+        try:
+            if not back_button.is_visible():
+                return False
+            self.submit_and_wait(back_button.click, rerendered=back_button)
+            self.form_resets += 1
+            return True
+        except PlaywrightError:
+            return False
+    
     def navegar_a_modulo(self, nombre_modulo, operacion):
         """
         Navegar a un módulo específico usando la interfaz
@@ -100,7 +615,9 @@ class WebAutomation:
             self.page.get_by_title(operacion, exact=True).click()
             
             # Esperar a que cargue
-            self.page.wait_for_load_state("networkidle")
+            self.wait_module_ready(operacion)
+            self.navigations += 1
+            self.current_view = None  # Sin la ruta del módulo no se puede reconocer la vista
             
             print(f"✅ Módulo {nombre_modulo} cargado correctamente")
             return True
@@ -121,8 +638,10 @@ class WebAutomation:
             url = f"{self.platform_url}/{nombre_modulo}/{operacion}.faces"
             print(f"🔗 Navegando a: {url}")
             
-            self.page.goto(url)
-            self.page.wait_for_load_state("networkidle")
+            self.page.goto(url, wait_until="domcontentloaded" if self.lean else "load")
+            self.wait_module_ready(operacion)
+            self.navigations += 1
+            self.current_view = None if self.is_login_page() else (nombre_modulo, operacion)
             
             print(f"✅ Módulo {nombre_modulo} cargado correctamente")
             return True
@@ -143,7 +662,7 @@ class WebAutomation:
             
             # Opción 1: Buscar por campo de búsqueda
             # Ajusta el selector según tu interfaz
-            search_field = self.page.locator("#search-user")  # Cambiar según tu plataforma
+            search_field = self.locator("#search-user")  # Cambiar según tu plataforma
             # Alternativas:
             # search_field = self.page.locator("input[name='search']")
             # search_field = self.page.locator("input[placeholder*='Buscar']")
@@ -151,20 +670,27 @@ class WebAutomation:
             
             search_field.fill(numero_documento)
             
-            # Click en botón de búsqueda o presionar Enter
+            # Click en botón de búsqueda o presionar Enter, esperando la respuesta
             # Opción A: Botón específico
-            # self.page.locator("#btn-search").click()
+            # search = lambda: self.locator("#btn-search").click()
             
             # Opción B: Presionar Enter
-            search_field.press("Enter")
+            search = lambda: search_field.press("Enter")
             
-            # Esperar a que carguen los resultados
-            time.sleep(1)
+            self.submit_and_wait(search, rerendered=self.locator(USERS_TABLE_SELECTOR))
             
             # Verificar que se encontró el usuario
             # Ajusta el selector según tu tabla
             user_row = self.page.locator(f"tr:has-text('{numero_documento}')")
             
+            # Esperar la fila del usuario o el mensaje de "sin resultados"
+            try:
+                user_row.or_(self.locator(EMPTY_RESULTS_SELECTOR)).first.wait_for(
+                    state="visible", timeout=self.result_timeout
+                )
+            except PlaywrightTimeoutError:
+                pass
+            
             if user_row.count() > 0:
                 print(f"✅ Usuario encontrado")
                 return user_row.first
@@ -182,85 +708,78 @@ class WebAutomation:
             numero_documento (str): Número de documento del usuario
             nuevo_rol (str): Nuevo rol a asignar
         """
+        result = self._try_http('cambiar_rol', numero_documento, {'rol': nuevo_rol})
+        if result is not None:
+            return result
+        
         try:
-            # Login
-            login_result = self.login()
-            if not login_result['success']:
-                return login_result
-            
-            # Navegar al módulo de usuarios
+            # Login (si hace falta) y navegación al módulo de usuarios
             # AJUSTA ESTOS VALORES según tu plataforma
             # Opción 1: Usar interfaz
             # self.navegar_a_modulo("Administración", "Gestión de Usuarios")
             
             # Opción 2: Usar URL directa (recomendado)
-            self.navegar_a_modulo_url("admin", "usuarios")  # Ajustar ruta
-            
-            # Buscar usuario
-            user_row = self.search_user(numero_documento)
-            
-            # Click en botón de editar
-            # AJUSTA EL SELECTOR según tu interfaz
-            # Opción 1: Por clase
-            edit_button = user_row.locator(".btn-edit")
-            # Opción 2: Por texto
-            # edit_button = user_row.get_by_role("button", name="Editar")
-            # Opción 3: Por título o aria-label
-            # edit_button = user_row.get_by_title("Editar")
-            
-            edit_button.click()
-            
-            # Esperar a que cargue el formulario
-            time.sleep(1)
-            
-            # Seleccionar nuevo rol
-            # AJUSTA EL SELECTOR según tu select de roles
-            # Opción 1: Por ID
-            role_select = self.page.locator("#user-role")
-            # Opción 2: Por nombre
-            # role_select = self.page.locator("select[name='rol']")
-            # Opción 3: Por label
-            # role_select = self.page.get_by_label("Rol")
-            
-            role_select.select_option(label=nuevo_rol)
-            
-            # Guardar cambios
-            # AJUSTA EL SELECTOR del botón guardar
-            save_button = self.page.locator("#btn-save")
-            # Alternativas:
-            # save_button = self.page.get_by_role("button", name="Guardar")
-            # save_button = self.page.locator("button:has-text('Guardar')")
-            
-            save_button.click()
-            
-            # Esperar confirmación
-            time.sleep(2)
+            session = self.ensure_session("admin", "usuarios")  # Ajustar ruta
+            if not session['success']:
+                return session
             
-            # Verificar mensaje de éxito
-            try:
-                success_msg = self.page.locator(".alert-success, .mensaje-exito")
-                if success_msg.is_visible(timeout=5000):
-                    return {
-                        'success': True,
-                        'message': f'Rol cambiado a "{nuevo_rol}" exitosamente'
-                    }
-                else:
-                    return {
-                        'success': False,
-                        'message': 'No se pudo verificar el cambio de rol'
-                    }
-            except:
-                # Asumir éxito si no hay error visible
-                return {
-                    'success': True,
-                    'message': f'Rol cambiado a "{nuevo_rol}" exitosamente'
-                }
+            return self._run_in_module(lambda: self._change_user_role(numero_documento, nuevo_rol))
         
         except Exception as e:
             return {'success': False, 'message': str(e)}
         
         finally:
-            self.close()
+            self.finish_action()
+    
+    def _change_user_role(self, numero_documento, nuevo_rol):
+        """Cambiar el rol con el módulo de usuarios ya abierto"""
+        # Buscar usuario
+        user_row = self.search_user(numero_documento)
+        
+        # Click en botón de editar
+        # AJUSTA EL SELECTOR según tu interfaz
+        # Opción 1: Por clase
+        edit_button = user_row.locator(".btn-edit")
+        # Opción 2: Por texto
+        # edit_button = user_row.get_by_role("button", name="Editar")
+        # Opción 3: Por título o aria-label
+        # edit_button = user_row.get_by_title("Editar")
+        
+        edit_button.click()
+        
+        # Seleccionar nuevo rol
+        # AJUSTA EL SELECTOR según tu select de roles
+        # Opción 1: Por ID
+        role_select = self.locator("#user-role")
+        # Opción 2: Por nombre
+        # role_select = self.page.locator("select[name='rol']")
+        # Opción 3: Por label
+        # role_select = self.page.get_by_label("Rol")
+        
+        # Esperar a que cargue el formulario
+        role_select.wait_for(state="visible")
+        role_select.select_option(label=nuevo_rol)
+        
+        # Guardar cambios
+        # AJUSTA EL SELECTOR del botón guardar
+        save_button = self.locator("#btn-save")
+        # Alternativas:
+        # save_button = self.page.get_by_role("button", name="Guardar")
+        # save_button = self.page.locator("button:has-text('Guardar')")
+        
+        # Guardar y esperar la respuesta (el formulario se vuelve a dibujar)
+        self.submit_change(save_button.click, rerendered=role_select)
+        
+        # Verificar mensaje de éxito
+        if self._wait_success_message():
+            return {
+                'success': True,
+                'message': f'Rol cambiado a "{nuevo_rol}" exitosamente'
+            }
+        return {
+            'success': False,
+            'message': 'No se pudo verificar el cambio de rol'
+        }
     
     def deactivate_user(self, numero_documento):
         """
@@ -269,69 +788,67 @@ class WebAutomation:
         Args:
             numero_documento (str): Número de documento del usuario
         """
+        result = self._try_http('desactivar', numero_documento)
+        if result is not None:
+            return result
+        
         try:
-            # Login
-            login_result = self.login()
-            if not login_result['success']:
-                return login_result
-            
-            # Navegar al módulo de usuarios
-            self.navegar_a_modulo_url("admin", "usuarios")  # Ajustar ruta
-            
-            # Buscar usuario
-            user_row = self.search_user(numero_documento)
-            
-            # Click en botón de desactivar
-            # AJUSTA EL SELECTOR según tu interfaz
-            deactivate_button = user_row.locator(".btn-deactivate")
-            # Alternativas:
-            # deactivate_button = user_row.get_by_role("button", name="Desactivar")
-            # deactivate_button = user_row.locator("button:has-text('Desactivar')")
-            
-            deactivate_button.click()
+            # Login (si hace falta) y navegación al módulo de usuarios
+            session = self.ensure_session("admin", "usuarios")  # Ajustar ruta
+            if not session['success']:
+                return session
             
-            # Esperar modal de confirmación (si existe)
-            time.sleep(1)
-            
-            try:
-                # Confirmar desactivación
-                confirm_button = self.page.locator("#confirm-deactivate")
-                # Alternativas:
-                # confirm_button = self.page.get_by_role("button", name="Confirmar")
-                # confirm_button = self.page.locator(".modal button:has-text('Confirmar')")
-                
-                if confirm_button.is_visible(timeout=3000):
-                    confirm_button.click()
-            except:
-                pass  # No hay modal de confirmación
-            
-            # Esperar confirmación
-            time.sleep(2)
-            
-            # Verificar mensaje de éxito
-            try:
-                success_msg = self.page.locator(".alert-success, .mensaje-exito")
-                if success_msg.is_visible(timeout=5000):
-                    return {
-                        'success': True,
-                        'message': 'Usuario desactivado exitosamente'
-                    }
-                else:
-                    return {
-                        'success': False,
-                        'message': 'No se pudo verificar la desactivación'
-                    }
-            except:
-                return {
-                    'success': True,
-                    'message': 'Usuario desactivado exitosamente'
-                }
+            return self._run_in_module(lambda: self._deactivate_user(numero_documento))
         
         except Exception as e:
             return {'success': False, 'message': str(e)}
         
         finally:
-            self.close()
+            self.finish_action()
+    
+    def _deactivate_user(self, numero_documento):
+        """Desactivar con el módulo de usuarios ya abierto"""
+        # Buscar usuario
+        user_row = self.search_user(numero_documento)
+        
+        # Click en botón de desactivar
+        # AJUSTA EL SELECTOR según tu interfaz
+        deactivate_button = user_row.locator(".btn-deactivate")
+        # Alternativas:
+        # deactivate_button = user_row.get_by_role("button", name="Desactivar")
+        # deactivate_button = user_row.locator("button:has-text('Desactivar')")
+        
+        deactivate_button.click()
+        
+        # Confirmar desactivación
+        confirm_button = self.locator("#confirm-deactivate")
+        # Alternativas:
+        # confirm_button = self.page.get_by_role("button", name="Confirmar")
+        # confirm_button = self.page.locator(".modal button:has-text('Confirmar')")
+        
+        # Esperar modal de confirmación (si existe)
+        try:
+            confirm_button.wait_for(state="visible", timeout=self.modal_timeout)
+            has_modal = True
+        except PlaywrightTimeoutError:
+            has_modal = False  # No hay modal de confirmación
+        
+        if has_modal:
+            self.submit_change(confirm_button.click, rerendered=self.locator(USERS_TABLE_SELECTOR))
+        else:
+            # Sin modal de confirmación, el click de desactivar ya envió el cambio
+            self.change_submitted = True
+        
+        # Verificar mensaje de éxito
+        if self._wait_success_message():
+            return {
+                'success': True,
+                'message': 'Usuario desactivado exitosamente'
+            }
+        return {
+            'success': False,
+            'message': 'No se pudo verificar la desactivación'
+        }
     
     def activate_user(self, numero_documento):
         """
@@ -340,32 +857,194 @@ class WebAutomation:
         Args:
             numero_documento (str): Número de documento del usuario
         """
+        result = self._try_http('activar', numero_documento)
+        if result is not None:
+            return result
+        
         try:
-            login_result = self.login()
-            if not login_result['success']:
-                return login_result
+            session = self.ensure_session("admin", "usuarios")
+            if not session['success']:
+                return session
             
-            self.navegar_a_modulo_url("admin", "usuarios")
+            return self._run_in_module(lambda: self._activate_user(numero_documento))
+        
+        except Exception as e:
+            return {'success': False, 'message': str(e)}
+        
+        finally:
+            self.finish_action()
+    
+    def _activate_user(self, numero_documento):
+        """Activar con el módulo de usuarios ya abierto"""
+        user_row = self.search_user(numero_documento)
+        
+        activate_button = user_row.locator(".btn-activate")
+        # Alternativas:
+        # activate_button = user_row.get_by_role("button", name="Activar")
+        
+        self.submit_change(activate_button.click, rerendered=self.locator(USERS_TABLE_SELECTOR))
+        
+        return {
+            'success': True,
+            'message': 'Usuario activado exitosamente'
+        }
+    
+    def _wait_success_message(self):
+        """Esperar el mensaje de éxito de la plataforma (False si no aparece)"""
+        if not self.check_success_message:
+            return True  # El resultado se confirma en la BD
+        
+        # AJUSTA EL SELECTOR del mensaje de éxito
+        success_msg = self.locator(".alert-success, .mensaje-exito")
+        try:
+            success_msg.first.wait_for(state="visible", timeout=self.result_timeout)
+            return True
+        except PlaywrightTimeoutError:
+            return False
+    
+    def run_action(self, documento, accion, params=None):
+        """
+        Ejecutar una acción sin cerrar el navegador (para lotes y workers)
+        
+        Solo navega al módulo de usuarios si la página no está en el listado
+        (primera acción o sesión vencida; del formulario de edición vuelve con
+        el botón Volver). Con la ruta rápida HTTP activa, primero intenta la
+        acción sin el navegador.
+        
+        Args:
+            documento (str): Número de documento del usuario
+            accion (str): 'cambiar_rol' (params {'rol': ...}), 'desactivar' o 'activar'
+            params (dict): Parámetros de la acción
+        
+        Returns:
+            dict: success, message, documento, accion y duracion_ms (nunca lanza)
+        """
+        handlers = {
+            'cambiar_rol': lambda params: self._change_user_role(documento, params['rol']),
+            'desactivar': lambda params: self._deactivate_user(documento),
+            'activar': lambda params: self._activate_user(documento),
+        }
+        start = time.perf_counter()
+        try:
+            handler = handlers.get(accion)
+            if handler is None:
+                raise Exception(f"Acción no soportada: {accion}")
             
-            user_row = self.search_user(numero_documento)
+            result = self._try_http(accion, documento, params)
+            if result is not None:
+                result['via'] = 'http'
+                return self._with_timing(result, documento, accion, start)
             
-            activate_button = user_row.locator(".btn-activate")
-            # Alternativas:
-            # activate_button = user_row.get_by_role("button", name="Activar")
+            if not self.en_modulo("admin", "usuarios"):
+                session = self.ensure_session("admin", "usuarios")
+                if not session['success']:
+                    raise Exception(session['message'])
+            else:
+                self.skipped_navigations += 1
             
-            activate_button.click()
-            time.sleep(2)
+            result = self._run_in_module(lambda: handler(params or {}))
+            result['via'] = 'navegador'
+        except Exception as e:
+            result = {'success': False, 'message': str(e)}
+        
+        return self._with_timing(result, documento, accion, start)
+    
+    def submit_change(self, trigger, rerendered=None):
+        """
+        submit_and_wait del envío que modifica al usuario (guardar, confirmar, activar)
+        
+        change_submitted se marca recién cuando trigger se ejecutó sin error: si
+        el click falla el cambio no se envió y se puede reintentar.
+        """
+        def fire():
+            trigger()
+            self.change_submitted = True
+        
+        self.submit_and_wait(fire, rerendered)
+    
+    def _run_in_module(self, step):
+        """
+        Ejecutar un paso en el módulo de usuarios sin navegar antes
+        
+        Como no se recarga la página antes de cada acción, una sesión vencida
+        se nota recién al enviar el formulario: si fue en la búsqueda o antes,
+        se vuelve a entrar y se repite el paso una vez. Si el cambio ya se había
+        enviado no se repite (la plataforma pudo aplicarlo): el resultado es un
+        error con enviado=True y, con check_success_message=False, lo decide la
+        confirmación en la BD.
+        """
+        self.change_submitted = False
+        try:
+            return step()
+        except Exception:
+            if not self.is_login_page():
+                raise
+            if self.change_submitted:
+                self.current_view = None
+                return {
+                    'success': False,
+                    'message': "La sesión venció después de enviar el cambio; no se repite la acción",
+                    'enviado': True
+                }
+        
+        print("🔑 Sesión vencida durante la acción")
+        self.current_view = None
+        session = self.ensure_session("admin", "usuarios")
+        if not session['success']:
+            raise Exception(session['message'])
+        return step()
+    
+    def _with_timing(self, result, documento, accion, start):
+        result.update({
+            'documento': documento,
+            'accion': accion,
+            'duracion_ms': round((time.perf_counter() - start) * 1000, 1)
+        })
+        return result
+    
+    def run_batch(self, actions):
+        """
+        Ejecutar varias acciones con un solo login y una sola navegación
+        
+        Args:
+            actions (list): Tuplas (documento, acción, params); ver run_action
+        
+        Returns:
+            dict: {'success': bool, 'message': str, 'results': [...],
+                   'setup_ms': float, 'total_ms': float}. Cada resultado tiene
+                   documento, accion, success, message y duracion_ms; un error en
+                   un usuario no detiene el lote
+        """
+        results = []
+        batch_start = time.perf_counter()
+        
+        try:
+            session = self.ensure_session("admin", "usuarios")
+            setup_ms = (time.perf_counter() - batch_start) * 1000
+            if not session['success']:
+                return {**session, 'results': results, 'setup_ms': setup_ms, 'total_ms': setup_ms}
             
-            return {
-                'success': True,
-                'message': 'Usuario activado exitosamente'
-            }
+            for documento, accion, params in actions:
+                result = self.run_action(documento, accion, params)
+                results.append(result)
+                print(f"{'✅' if result['success'] else '❌'} {accion} {documento}: {result['message']}")
         
         except Exception as e:
-            return {'success': False, 'message': str(e)}
+            setup_ms = (time.perf_counter() - batch_start) * 1000
+            return {'success': False, 'message': str(e), 'results': results,
+                    'setup_ms': setup_ms, 'total_ms': setup_ms}
         
         finally:
-            self.close()
+            self.finish_action()
+        
+        failed = sum(1 for result in results if not result['success'])
+        return {
+            'success': failed == 0,
+            'message': f"{len(results) - failed} de {len(results)} acciones exitosas",
+            'results': results,
+            'setup_ms': setup_ms,
+            'total_ms': (time.perf_counter() - batch_start) * 1000
+        }
     
     
     def take_screenshot(self, filename="screenshot.png"):
@@ -387,6 +1066,13 @@ class WebAutomation:
                 self.playwright.stop()
         except Exception as e:
             print(f"Error al cerrar navegador: {str(e)}")
+        finally:
+            self.page = None
+            self.context = None
+            self.browser = None
+            self.playwright = None
+            self.current_view = None
+            self._locators = {}
     
     def __del__(self):
         """Destructor - cerrar navegador"""
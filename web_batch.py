@@ -0,0 +1,112 @@
+"""
+Acciones web por lotes
+Aplica una lista de acciones (por ejemplo, un listado de retiros) con un solo
+login y una sola navegación al módulo de usuarios, y guarda el resultado de
+cada usuario con su duración en JSON Lines.
+
+El archivo de entrada es un CSV con las columnas documento, accion y rol
+(rol solo para cambiar_rol). Acciones: cambiar_rol, desactivar, activar.
+
+Con --bd, antes de abrir el navegador se consulta el estado de todos los
+usuarios en la BD y se omiten las acciones que no cambiarían nada; al terminar,
+el resultado de cada usuario se confirma en la BD (web_preflight.py).
+
+Uso:
+    python web_batch.py retiros.csv
+    python web_batch.py cambios.csv -o resultados_web.jsonl --headless
+    python web_batch.py retiros.csv --bd
+"""
+
+import argparse
+import csv
+import json
+import sys
+
+from web_automation import WebAutomation
+from web_preflight import WebActionPlanner
+
+
+def read_actions(path):
+    """Leer las acciones del CSV como tuplas (documento, accion, params)"""
+    actions = []
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        for row in csv.DictReader(f):
+            documento = (row.get('documento') or '').strip()
+            if not documento:
+                continue
+            accion = (row.get('accion') or '').strip().lower()
+            params = {'rol': row['rol'].strip()} if row.get('rol') else {}
+            actions.append((documento, accion, params))
+    return actions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Acciones web por lotes sobre SAVIA")
+    parser.add_argument('source', help="CSV con las columnas documento, accion, rol")
+    parser.add_argument('-o', '--output', default='resultados_web.jsonl',
+                        help="Archivo de resultados (JSON Lines)")
+    parser.add_argument('--headless', action='store_true',
+                        help="Ejecutar el navegador sin interfaz gráfica")
+    parser.add_argument('--bd', action='store_true',
+                        help="Omitir las acciones sin cambios según la BD y confirmar en la BD")
+    args = parser.parse_args(argv)
+
+    try:
+        actions = read_actions(args.source)
+    except (OSError, csv.Error) as e:
+        print(f"❌ Error al leer {args.source}: {str(e)}")
+        return 1
+
+    if not actions:
+        print("⚠️ No hay acciones en el archivo")
+        return 1
+
+    print(f"📋 {len(actions)} acciones")
+
+    planner = None
+    skipped = []
+    if args.bd:
+        from database_handler import DatabaseHandler
+        planner = WebActionPlanner(DatabaseHandler())
+        try:
+            actions, skipped = planner.plan(actions)
+        except Exception as e:
+            print(f"❌ Error al consultar la BD: {str(e)}")
+            return 1
+        print(f"🗄️ {len(skipped)} acciones omitidas (sin cambios según la BD)")
+
+    results = []
+    if actions:
+        automation = WebAutomation(headless=args.headless, check_success_message=planner is None)
+        try:
+            batch = automation.run_batch(actions)
+        finally:
+            automation.close()
+        results = batch['results']
+        if not results:
+            print(f"❌ {batch['message']}")
+
+        if planner is not None:
+            try:
+                planner.apply_confirmation(results, planner.confirm(actions, results))
+            except Exception as e:
+                print(f"⚠️ No se pudo confirmar en la BD: {str(e)}")
+
+        print(f"   Login y navegación: {batch['setup_ms']:8.0f} ms")
+        print(f"   Total:              {batch['total_ms']:8.0f} ms")
+
+    results += skipped
+    with open(args.output, 'w', encoding='utf-8') as f:
+        for result in results:
+            f.write(json.dumps(result, ensure_ascii=False) + '\n')
+
+    failed = sum(1 for result in results if not result['success'])
+    print(f"\n{'✅' if not failed else '⚠️'} {len(results) - failed} de {len(results)} acciones exitosas")
+    if planner is not None:
+        print(f"   {planner.stats()}")
+    print(f"💾 Resultados en {args.output}")
+    return 0 if not failed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,362 @@
+"""
+Pool de navegadores para acciones web en paralelo
+N workers, cada uno con su propio contexto de navegador (aislado: cookies,
+página y estado propios), toman acciones de una cola compartida. Solo el
+primer worker pasa por el formulario de login: los demás cargan la sesión
+guardada (storage_state) y la reutilizan.
+
+- Nunca se ejecutan dos acciones sobre el mismo documento a la vez (las
+  acciones de un mismo usuario se aplican en el orden en que llegaron)
+- Antes de cada acción se verifica el navegador del worker; si estuvo
+  inactivo más de WEB_POOL_HEALTH_CHECK segundos o su última acción falló,
+  también que la página responda. Un contexto caído se vuelve a crear.
+
+La API síncrona de Playwright solo puede usarse desde el hilo que la creó, por
+eso cada worker es un hilo con su propia instancia de WebAutomation.
+
+Uso:
+    python web_pool.py retiros.csv -w 4
+    python web_pool.py --replica -w 4     # demostración contra savia_standin.py
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+from web_automation import ResourceCache, WebAutomation
+
+
+class WebWorkerPool:
+    def __init__(self, workers=None, headless=True, storage_state_path=None,
+                 health_check_interval=None):
+        """
+        Args:
+            workers (int): Contextos de navegador en paralelo (WEB_POOL_WORKERS, 3)
+            headless (bool): Ejecutar los navegadores sin interfaz gráfica
+            storage_state_path (str): Sesión compartida entre workers
+                                      (WEB_STORAGE_STATE, cache/savia_session.json)
+            health_check_interval (float): Segundos de inactividad antes de
+                                           verificar la página (WEB_POOL_HEALTH_CHECK, 60)
+        """
+        if workers is None:
+            workers = int(os.getenv('WEB_POOL_WORKERS', 3))
+        if storage_state_path is None:
+            storage_state_path = os.getenv('WEB_STORAGE_STATE', os.path.join('cache', 'savia_session.json'))
+        if health_check_interval is None:
+            health_check_interval = float(os.getenv('WEB_POOL_HEALTH_CHECK', 60))
+
+        self.workers = max(1, workers)
+        self.headless = headless
+        self.storage_state_path = storage_state_path
+        self.health_check_interval = health_check_interval
+
+        # Cola de acciones (documento, accion, params, future) y documentos en curso
+        self.condition = threading.Condition()
+        self.pending = deque()
+        self.busy_documents = set()
+        self.closed = False
+        self.threads = []
+
+        # Un worker a la vez abre su sesión: el primero hace login y guarda el
+        # storage_state, los siguientes lo cargan
+        self.login_lock = threading.Lock()
+
+        # Estilos y scripts del perfil liviano, compartidos por los workers
+        self.resource_cache = ResourceCache()
+
+        # Contadores
+        self.completed = 0
+        self.failed = 0
+        self.health_checks = 0
+        self.restarts = 0
+        self.actions_per_worker = [0] * self.workers
+
+    def start(self):
+        """Lanzar los workers (cada uno abre su navegador con la primera acción)"""
+        for index in range(self.workers):
+            thread = threading.Thread(
+                target=self._worker, args=(index,), name=f'web-{index}', daemon=True
+            )
+            thread.start()
+            self.threads.append(thread)
+        return self
+
+    def submit(self, documento, accion, params=None):
+        """
+        Encolar una acción
+
+        Returns:
+            Future: Resultado de WebAutomation.run_action
+        """
+        future = Future()
+        with self.condition:
+            if self.closed:
+                raise Exception("El pool de navegadores está cerrado")
+            self.pending.append((str(documento).strip(), accion, params, future))
+            self.condition.notify()
+        return future
+
+    def run(self, actions):
+        """
+        Ejecutar una lista de acciones (documento, accion, params) y esperar
+
+        Returns:
+            list: Resultados en el mismo orden que las acciones
+        """
+        futures = [self.submit(documento, accion, params) for documento, accion, params in actions]
+        return [future.result() for future in futures]
+
+    def close(self):
+        """Terminar las acciones pendientes y cerrar los navegadores"""
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+        for thread in self.threads:
+            thread.join()
+        self.threads = []
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def stats(self):
+        """Acciones completadas y fallidas, verificaciones y reinicios de contextos"""
+        with self.condition:
+            return {
+                'workers': self.workers,
+                'pending': len(self.pending),
+                'in_progress': len(self.busy_documents),
+                'completed': self.completed,
+                'failed': self.failed,
+                'health_checks': self.health_checks,
+                'restarts': self.restarts,
+                'actions_per_worker': list(self.actions_per_worker)
+            }
+
+    # ============================================
+    # WORKERS
+    # ============================================
+    def _next_job(self):
+        """
+        Siguiente acción cuyo documento no esté en curso en otro worker
+        (None cuando el pool se cerró y no quedan acciones)
+        """
+        with self.condition:
+            while True:
+                for job in self.pending:
+                    if job[0] not in self.busy_documents:
+                        self.pending.remove(job)
+                        self.busy_documents.add(job[0])
+                        return job
+                if self.closed and not self.pending:
+                    return None
+                self.condition.wait()
+
+    def _worker(self, index):
+        automation = None
+        last_used = 0.0
+        try:
+            while True:
+                job = self._next_job()
+                if job is None:
+                    return
+                documento, accion, params, future = job
+
+                result = None
+                if future.set_running_or_notify_cancel():
+                    try:
+                        automation = self._healthy(automation, last_used)
+                        result = automation.run_action(documento, accion, params)
+                    except Exception as e:
+                        result = {
+                            'success': False,
+                            'message': str(e),
+                            'documento': documento,
+                            'accion': accion,
+                            'duracion_ms': 0.0
+                        }
+
+                # Un fallo fuerza la verificación de la página antes de la siguiente acción
+                last_used = time.monotonic() if result and result['success'] else 0.0
+
+                with self.condition:
+                    self.busy_documents.discard(documento)
+                    if result is not None:
+                        self.actions_per_worker[index] += 1
+                        if result['success']:
+                            self.completed += 1
+                        else:
+                            self.failed += 1
+                    self.condition.notify_all()
+
+                if result is not None:
+                    result['worker'] = index
+                    future.set_result(result)
+        finally:
+            if automation is not None:
+                automation.close()
+
+    def _healthy(self, automation, last_used):
+        """Contexto del worker listo para una acción (lo crea o recrea si hace falta)"""
+        if automation is not None:
+            healthy = automation.is_browser_open()
+            if healthy and time.monotonic() - last_used > self.health_check_interval:
+                with self.condition:
+                    self.health_checks += 1
+                try:
+                    healthy = automation.page.evaluate("1 + 1") == 2
+                except Exception:
+                    healthy = False
+
+            if not healthy:
+                print(f"⚠️ [{threading.current_thread().name}] Navegador sin respuesta, reiniciando")
+                automation.close()
+                automation = None
+                with self.condition:
+                    self.restarts += 1
+
+        if automation is None:
+            with self.login_lock:
+                automation = WebAutomation(
+                    headless=self.headless,
+                    persistent=True,
+                    storage_state_path=self.storage_state_path,
+                    resource_cache=self.resource_cache
+                )
+                session = automation.ensure_session("admin", "usuarios")
+                if not session['success']:
+                    automation.close()
+                    raise Exception(session['message'])
+        return automation
+
+
+# ============================================
+# DEMOSTRACIÓN CON LA RÉPLICA LOCAL
+# ============================================
+def demo_actions(count, seed=7):
+    """
+    Acciones de prueba sobre los usuarios de savia_standin.py
+    Algunos documentos se repiten para ejercitar el orden por usuario
+
+    Returns:
+        tuple: (acciones, estado final esperado documento → (rol, activo))
+    """
+    from savia_standin import ROLES, generate_users
+
+    rng = random.Random(seed)
+    users = generate_users(max(count, 10))
+    documentos = list(users)[:max(2, count * 2 // 3)]
+    actions = []
+    expected = {}
+
+    for _ in range(count):
+        documento = rng.choice(documentos)
+        rol, activo = expected.get(documento, (users[documento]['rol'], True))
+        choice = rng.random()
+        if choice < 0.5:
+            rol = rng.choice(ROLES)
+            actions.append((documento, 'cambiar_rol', {'rol': rol}))
+        elif activo:
+            activo = False
+            actions.append((documento, 'desactivar', {}))
+        else:
+            activo = True
+            actions.append((documento, 'activar', {}))
+        expected[documento] = (rol, activo)
+
+    return actions, expected
+
+
+def run_demo(workers, count, headless=True):
+    """Aplicar acciones de prueba con 1 y con N workers y verificar el resultado"""
+    from savia_standin import SaviaStandin
+
+    actions, expected = demo_actions(count)
+    timings = {}
+
+    for label, pool_workers in (('1 worker', 1), (f'{workers} workers', workers)):
+        with SaviaStandin(port=0, users=max(count, 10)) as standin:
+            os.environ['PLATFORM_URL'] = standin.url
+            state_path = os.path.join(tempfile.mkdtemp(prefix='savia_'), 'session.json')
+
+            start = time.perf_counter()
+            with WebWorkerPool(pool_workers, headless=headless,
+                               storage_state_path=state_path) as pool:
+                results = pool.run(actions)
+                stats = pool.stats()
+            timings[label] = time.perf_counter() - start
+
+            mismatches = [
+                documento for documento, (rol, activo) in expected.items()
+                if (standin.get_user(documento)['rol'], standin.get_user(documento)['activo']) != (rol, activo)
+            ]
+            failed = sum(1 for result in results if not result['success'])
+
+            print(f"\n📦 {label}")
+            print(f"   Tiempo total:   {timings[label] * 1000:8.0f} ms")
+            print(f"   Por acción:     {timings[label] * 1000 / len(actions):8.0f} ms")
+            print(f"   Fallidas:       {failed}")
+            print(f"   Logins:         {standin.stats()['logins']}")
+            print(f"   {stats}")
+            if mismatches:
+                print(f"❌ Estado final distinto al esperado en {len(mismatches)} usuarios: {mismatches[:5]}")
+                return 1
+
+    base, parallel = timings.values()
+    print(f"\n🚀 {workers} workers: {base / parallel:.1f}x más rápido")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Acciones web en paralelo sobre SAVIA")
+    parser.add_argument('source', nargs='?', help="CSV con las columnas documento, accion, rol")
+    parser.add_argument('-o', '--output', default='resultados_web.jsonl',
+                        help="Archivo de resultados (JSON Lines)")
+    parser.add_argument('-w', '--workers', type=int, default=None,
+                        help="Navegadores en paralelo (WEB_POOL_WORKERS)")
+    parser.add_argument('--ventana', action='store_true',
+                        help="Mostrar los navegadores (por defecto sin interfaz)")
+    parser.add_argument('--replica', action='store_true',
+                        help="Demostración contra una réplica local de SAVIA")
+    parser.add_argument('-n', '--acciones', type=int, default=30,
+                        help="Acciones de la demostración")
+    args = parser.parse_args(argv)
+
+    if args.replica:
+        return run_demo(args.workers or 3, args.acciones, headless=not args.ventana)
+
+    if not args.source:
+        parser.error("indica el CSV de acciones o --replica")
+
+    from web_batch import read_actions
+    actions = read_actions(args.source)
+    print(f"📋 {len(actions)} acciones")
+
+    start = time.perf_counter()
+    with WebWorkerPool(args.workers, headless=not args.ventana) as pool:
+        results = pool.run(actions)
+        stats = pool.stats()
+    elapsed = time.perf_counter() - start
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        for result in results:
+            f.write(json.dumps(result, ensure_ascii=False) + '\n')
+
+    failed = sum(1 for result in results if not result['success'])
+    print(f"\n{'✅' if not failed else '⚠️'} {len(results) - failed} de {len(results)} acciones exitosas "
+          f"en {elapsed:.1f} s con {stats['workers']} navegadores")
+    print(f"💾 Resultados en {args.output}")
+    return 0 if not failed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,328 @@
+"""
+Verificación de las acciones web con la base de datos
+Antes de abrir el navegador, cada acción se compara con el estado del usuario
+en SAVIA (una consulta IN por bloque para todo el lote) y se descartan las que
+no cambiarían nada:
+- desactivar un usuario que ya está inactivo
+- activar uno que ya está activo
+- asignar el cargo (mae_cargo_valor) que ya tiene
+
+Después de las acciones, el resultado se confirma releyendo los usuarios de la
+BD (sin pasar por la caché) en lugar de buscar el mensaje de éxito en la página.
+
+Uso:
+    planner = WebActionPlanner(db_handler)
+    acciones, omitidas = planner.plan(acciones)
+    ... ejecutar acciones con WebAutomation(check_success_message=False) ...
+    planner.apply_confirmation(resultados, planner.confirm(acciones, resultados))
+
+La confirmación necesita que cada lectura vea los cambios de otras sesiones
+(conexiones con autocommit, ver db_pool.mysql_config). Prueba contra una
+réplica (db_standin.py, nunca la BD del .env):
+    python web_preflight.py --replica
+"""
+
+import os
+import sys
+import time
+
+
+def _normalize(value):
+    """Los cargos no distinguen mayúsculas ni espacios (como la collation)"""
+    return str(value or '').strip().lower()
+
+
+def expected_state(accion, params, state):
+    """
+    Estado del usuario después de la acción
+
+    Args:
+        state (tuple): (rol, activo) antes de la acción
+    """
+    rol, activo = state
+    if accion == 'cambiar_rol':
+        return params.get('rol'), activo
+    if accion == 'desactivar':
+        return rol, False
+    if accion == 'activar':
+        return rol, True
+    return state
+
+
+def action_target(accion, params):
+    """
+    Campo del estado que deja la acción
+
+    Returns:
+        tuple | None: (posición en (rol, activo), valor)
+    """
+    if accion == 'cambiar_rol':
+        return 0, params.get('rol')
+    if accion == 'desactivar':
+        return 1, False
+    if accion == 'activar':
+        return 1, True
+    return None
+
+
+def has_value(state, target):
+    position, value = target
+    if position == 0:
+        return _normalize(state[0]) == _normalize(value)
+    return state[1] == value
+
+
+class WebActionPlanner:
+    def __init__(self, db_handler, confirm_timeout=None, confirm_interval=None):
+        """
+        Args:
+            db_handler (DatabaseHandler): Conexión a la BD de SAVIA
+            confirm_timeout (float): Segundos máximos esperando que la BD refleje
+                                     las acciones (WEB_DB_CONFIRM_TIMEOUT, 10)
+            confirm_interval (float): Segundos entre lecturas de la BD
+                                      (WEB_DB_CONFIRM_INTERVAL, 0.5)
+        """
+        if confirm_timeout is None:
+            confirm_timeout = float(os.getenv('WEB_DB_CONFIRM_TIMEOUT', 10))
+        if confirm_interval is None:
+            confirm_interval = float(os.getenv('WEB_DB_CONFIRM_INTERVAL', 0.5))
+
+        self.db_handler = db_handler
+        self.confirm_timeout = confirm_timeout
+        self.confirm_interval = confirm_interval
+
+        # Estado (rol, activo) de cada documento cuando se planificó
+        self.states = {}
+
+        # Contadores
+        self.planned = 0
+        self.skipped = 0
+        self.confirmed = 0
+        self.unconfirmed = 0
+
+    def current_states(self, documentos):
+        """
+        Estado actual de varios usuarios en la BD (consulta masiva, sin caché)
+
+        Returns:
+            dict: Documento → (rol, activo); los no encontrados no aparecen
+        """
+        users = self.db_handler.get_users_by_documents(documentos)
+        return {
+            documento: (user['rol'], user['estado'] == 'activo')
+            for documento, user in users.items()
+        }
+
+    def plan(self, actions):
+        """
+        Descartar las acciones que no cambian nada según la BD
+
+        Las acciones de un mismo documento se evalúan en orden, sobre el estado
+        que dejarían las anteriores. Los usuarios que no están en la BD se dejan
+        para la plataforma (ella informa si no existen).
+
+        Args:
+            actions (list): Tuplas (documento, accion, params)
+
+        Returns:
+            tuple: (acciones a ejecutar, resultados de las omitidas con
+                    success=True, omitida=True y el motivo en message)
+        """
+        self.states = self.current_states([documento for documento, _, _ in actions])
+        states = dict(self.states)
+        to_run = []
+        skipped = []
+
+        for documento, accion, params in actions:
+            params = params or {}
+            state = states.get(documento)
+            reason = None if state is None else self._no_op_reason(accion, params, state)
+
+            if reason:
+                skipped.append({
+                    'success': True,
+                    'message': reason,
+                    'omitida': True,
+                    'documento': documento,
+                    'accion': accion,
+                    'duracion_ms': 0.0
+                })
+                continue
+
+            to_run.append((documento, accion, params))
+            if state is not None:
+                states[documento] = expected_state(accion, params, state)
+
+        self.planned += len(to_run)
+        self.skipped += len(skipped)
+        return to_run, skipped
+
+    def _no_op_reason(self, accion, params, state):
+        rol, activo = state
+        if accion == 'desactivar' and not activo:
+            return "Sin cambios: el usuario ya está inactivo"
+        if accion == 'activar' and activo:
+            return "Sin cambios: el usuario ya está activo"
+        if accion == 'cambiar_rol' and _normalize(params.get('rol')) == _normalize(rol):
+            return f'Sin cambios: el usuario ya tiene el rol "{rol}"'
+        return None
+
+    def confirm(self, actions, results):
+        """
+        Comprobar en la BD el resultado de cada acción ejecutada
+
+        Cada acción se compara con el campo que modifica (rol o estado). No se
+        confirman las que fallaron sin llegar a enviar el cambio (las que tienen
+        'enviado' sí, la plataforma pudo aplicarlas), ni las de documentos que
+        no estaban en la BD, ni las que una acción posterior del mismo documento
+        vuelve a cambiar en el mismo campo. Descarta esos usuarios de la caché y
+        relee la BD hasta que todas tengan su valor o pase confirm_timeout; si
+        no queda ninguna por confirmar no consulta la BD.
+
+        Args:
+            actions (list): Tuplas (documento, accion, params) ejecutadas, en orden
+            results (list): Resultado de cada acción (en el mismo orden)
+
+        Returns:
+            list: Por acción, True si la BD tiene el valor que dejó, False si no,
+                  None si no se confirma
+        """
+        targets = [None] * len(actions)
+        last = {}
+        for index, ((documento, accion, params), result) in enumerate(zip(actions, results)):
+            if documento not in self.states:
+                continue
+            if not result['success'] and not result.get('enviado'):
+                continue
+            target = action_target(accion, params or {})
+            if target is None:
+                continue
+            previous = last.get((documento, target[0]))
+            if previous is not None:
+                targets[previous] = None
+            last[(documento, target[0])] = index
+            targets[index] = target
+
+        confirmations = [None] * len(actions)
+        pending = {index for index, target in enumerate(targets) if target is not None}
+        documentos = {actions[index][0] for index in pending}
+        for documento in documentos:
+            self.db_handler.invalidate_user(documento)
+
+        deadline = time.monotonic() + self.confirm_timeout
+        while pending:
+            current = self.current_states(list({actions[index][0] for index in pending}))
+            for index in list(pending):
+                state = current.get(actions[index][0])
+                if state is not None and has_value(state, targets[index]):
+                    confirmations[index] = True
+                    pending.discard(index)
+            if not pending or time.monotonic() >= deadline:
+                break
+            time.sleep(self.confirm_interval)
+
+        for index in pending:
+            confirmations[index] = False
+
+        self.confirmed += sum(1 for value in confirmations if value)
+        self.unconfirmed += len(pending)
+        return confirmations
+
+    @staticmethod
+    def apply_confirmation(results, confirmations):
+        """
+        Ajustar los resultados de las acciones con la confirmación de la BD
+        (agrega 'confirmado_bd'; la BD decide si la acción fue exitosa)
+        """
+        for result, value in zip(results, confirmations):
+            if value is None:
+                continue
+            result['confirmado_bd'] = value
+            if value and not result['success']:
+                result['success'] = True
+                result['message'] = f"Confirmado en la BD ({result['message']})"
+            elif not value and result['success']:
+                result['success'] = False
+                result['message'] = "La BD no refleja el cambio"
+        return results
+
+    def stats(self):
+        """Acciones ejecutadas y omitidas, y usuarios confirmados en la BD"""
+        return {
+            'planned': self.planned,
+            'skipped': self.skipped,
+            'confirmed': self.confirmed,
+            'unconfirmed': self.unconfirmed
+        }
+
+
+# Prueba contra la réplica (db_standin.py): la plataforma cambia los usuarios
+# desde otra sesión entre plan() y confirm()
+def _replica_test():
+    from database_handler import DatabaseHandler
+    from db_standin import StandinDatabase
+
+    failures = []
+
+    def check(name, condition):
+        print(f"   {'✅' if condition else '❌'} {name}")
+        if not condition:
+            failures.append(name)
+
+    database = StandinDatabase(users=20)
+    try:
+        # La réplica reproduce el problema: sin autocommit no se ve el cambio
+        user = next(row for row in database.users if row['activo'])
+        conn = database.connect(autocommit=False)
+        cursor = conn.cursor(dictionary=True)
+        query = "SELECT activo FROM gn_usuarios WHERE documento = %s"
+        cursor.execute(query, (user['documento'],))
+        cursor.fetchall()
+        database.update(user['documento'], activo=0)
+        cursor.execute(query, (user['documento'],))
+        check("sin autocommit la conexión sigue viendo su instantánea",
+              cursor.fetchall() == [{'activo': 1}])
+        conn.close()
+
+        for pooled in (False, True):
+            mode = 'pool' if pooled else 'conexión única'
+            db_handler = DatabaseHandler(pooled=pooled, mirror=False, connector=database.connect)
+            planner = WebActionPlanner(db_handler, confirm_timeout=2, confirm_interval=0.05)
+
+            active = [row for row in database.users if row['activo']]
+            applied, missing, renamed = active[1 + 3 * pooled:4 + 3 * pooled]
+            actions = [
+                (applied['documento'], 'desactivar', {}),
+                (missing['documento'], 'desactivar', {}),
+                (renamed['documento'], 'cambiar_rol', {'rol': 'Gerente'}),
+            ]
+            to_run, skipped = planner.plan(actions)
+            check(f"{mode}: plan() no omite acciones que cambian algo",
+                  len(to_run) == 3 and not skipped)
+
+            # La plataforma aplica dos de las tres acciones
+            database.update(applied['documento'], activo=0)
+            database.update(renamed['documento'], mae_cargo_valor='Gerente')
+            results = [{'success': True, 'message': 'Acción enviada'} for _ in to_run]
+
+            start = time.monotonic()
+            planner.confirm_timeout = 0.5
+            confirmations = planner.confirm(to_run, results)
+            elapsed = time.monotonic() - start
+            planner.apply_confirmation(results, confirmations)
+            check(f"{mode}: confirm() ve los cambios de otra sesión",
+                  confirmations == [True, False, True])
+            check(f"{mode}: solo la acción no aplicada queda fallida",
+                  [result['success'] for result in results] == [True, False, True])
+            check(f"{mode}: la espera es solo por la acción no aplicada ({elapsed:.2f} s)",
+                  elapsed < 1.5)
+            db_handler.disconnect()
+    finally:
+        database.close()
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    if '--replica' in sys.argv[1:]:
+        sys.exit(_replica_test())